@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold start webtest/python/processor.py.
+
+Go server menjalankan satu proses Python per request, jadi biaya start
+(import + validasi) dibayar di setiap job. Tiap skenario dijalankan di
+proses baru beberapa kali; dilaporkan min & median wall-clock:
+
+    help           processor.py --help
+    file_hilang    file input tidak ada (ditolak sebelum pandas dimuat)
+    layout_salah   file JISDOR dipakai sebagai trade (ditolak oleh sniff)
+    impor_penuh    muat_modul() + openpyxl + xlsxwriter (batas bawah job Excel)
+    job_ringkasan  job kecil end-to-end dengan --summary-json
+
+Pemakaian:
+    python bench_startup.py
+    python bench_startup.py --simpan hasil.json
+    python bench_startup.py --banding hasil.json --toleransi 0.25
+Exit code 1 jika median skenario mana pun melebihi baseline * (1 + toleransi).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+FOLDER_PROCESSOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'webtest', 'python')
+PROCESSOR = os.path.join(FOLDER_PROCESSOR, 'processor.py')
+
+
+# === Data uji kecil (layout sama dengan upload asli) === #
+def tulis_jisdor(path):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Kurs Transaksi Bank Indonesia'])
+    ws.append(['JISDOR'])
+    ws.append([])
+    ws.append([])
+    ws.append(['NO', 'Tanggal', 'Kurs'])
+    for i in range(1, 61):
+        ws.append([i, f"2025-{10 + (i - 1) // 30}-{(i - 1) % 30 + 1:02d}", 16000 + i])
+    wb.save(path)
+
+
+def tulis_trade(path, n=200):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Trade History'])
+    ws.append(['DateTrade', 'Trade ID', 'Contract', 'Acc', 'Buy Sell', 'Trade Vol',
+               'Price', 'Close Vol', 'Close Settle', 'Fee Trade', 'Overnight'])
+    produk = ['CPOID-DEC25', 'OLEIN-NOV25', 'RBDPO-JAN26', 'COCOA-DEC25']
+    for i in range(n):
+        ws.append([f"2025-10-{i % 28 + 1:02d} 10:00:00", 1000 + i, produk[i % 4], f"AK{i % 17:03d}",
+                   'B' if i % 2 else 'S', i % 9 + 1, 12000 + i, 0, 12000 + i, 1000, 'N'])
+    wb.save(path)
+
+
+def skenario(folder):
+    jisdor = os.path.join(folder, 'jisdor.xlsx')
+    trade = os.path.join(folder, 'trade.xlsx')
+    tulis_jisdor(jisdor)
+    tulis_trade(trade)
+    py = [sys.executable, PROCESSOR]
+    # nama → (perintah, exit code yang diharapkan)
+    return {
+        'help': (py + ['--help'], 0),
+        'file_hilang': (py + ['--jisdor', jisdor, '--trade-file', os.path.join(folder, 'tidak_ada.xlsx'),
+                              '--output', os.path.join(folder, 'out.xlsx')], 1),
+        'layout_salah': (py + ['--jisdor', jisdor, '--trade-file', jisdor,
+                               '--output', os.path.join(folder, 'out.xlsx')], 1),
+        'impor_penuh': ([sys.executable, '-c',
+                         "import processor; processor.muat_modul('openpyxl', 'xlsxwriter')"], 0),
+        'job_ringkasan': (py + ['--jisdor', jisdor, '--trade-file', trade,
+                                '--summary-json', os.path.join(folder, 'ringkasan.json')], 0),
+    }
+
+
+def ukur(cmd, exit_code, ulang):
+    """Wall-clock (ms) per run; proses baru tiap run, output dibuang."""
+    hasil = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        proses = subprocess.run(cmd, cwd=FOLDER_PROCESSOR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        hasil.append((time.perf_counter() - mulai) * 1000)
+        if proses.returncode != exit_code:
+            raise RuntimeError(f"exit code {proses.returncode}, diharapkan {exit_code}: "
+                               f"{proses.stderr.decode(errors='replace')[-500:]}")
+    return hasil
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start processor.py')
+    parser.add_argument('--ulang', type=int, default=7, help='Jumlah run per skenario')
+    parser.add_argument('--simpan', help='Simpan hasil (median per skenario) ke file JSON')
+    parser.add_argument('--banding', help='Bandingkan dengan hasil --simpan sebelumnya')
+    parser.add_argument('--toleransi', type=float, default=0.25,
+                        help='Regresi median yang diizinkan terhadap baseline (default: 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.banding:
+        with open(args.banding, encoding='utf-8') as f:
+            baseline = json.load(f)['median_ms']
+
+    median = {}
+    regresi = []
+    with tempfile.TemporaryDirectory() as folder:
+        for nama, (cmd, exit_code) in skenario(folder).items():
+            ukur(cmd, exit_code, 1)  # pemanasan page cache
+            waktu = ukur(cmd, exit_code, args.ulang)
+            median[nama] = round(statistics.median(waktu), 1)
+            catatan = ''
+            if nama in baseline:
+                rasio = median[nama] / baseline[nama]
+                catatan = f"  ({rasio:.2f}x baseline {baseline[nama]:.1f} ms)"
+                if rasio > 1 + args.toleransi:
+                    regresi.append(nama)
+                    catatan += '  ❌ regresi'
+            print(f"{nama:<14} min {min(waktu):8.1f} ms   median {median[nama]:8.1f} ms{catatan}")
+
+    if args.simpan:
+        with open(args.simpan, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'ulang': args.ulang,
+                       'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'median_ms': median}, f, indent=2)
+        print(f"Hasil disimpan: {args.simpan}")
+
+    if regresi:
+        print(f"❌ Regresi cold start: {', '.join(regresi)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+"""
+Harness ekuivalensi (golden output) untuk dashboard_v6_dengan_jenis_produk.
+
+Jalur teroptimasi (hitung_kolom_turunan, _tambah_kolom_kurs, builder buat_*,
+partisi_bulanan, perbarui_rekap_harian) dibandingkan dengan implementasi
+referensi per baris yang dibekukan di file ini: salinan fungsi row-wise
+modul baseline (hitung_NV, hitung_contract_size, hitung_margin,
+ekstrak_jenis_produk) dan versi loop Python polos. Referensi tidak memanggil
+fungsi perhitungan modul yang diuji, jadi regresi di modul tidak ikut
+mengubah referensinya. Data uji: data acak + kasus tepi (lot NaN,
+contract tidak bisa diparsing, rollover kontrak Januari, transaksi sebelum
+tanggal JISDOR pertama).
+
+Pemakaian:
+    python cek_ekuivalensi.py
+    python cek_ekuivalensi.py --modul webtest/python/dashboard_v6_dengan_jenis_produk.py
+Exit code 1 jika ada tabel/kolom yang berbeda di luar toleransi.
+"""
+
+import argparse
+import bisect
+import importlib.util
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+RTOL = 1e-9
+ATOL = 1e-6
+RATE_SPOT = 5_000_000
+RATE_REMOTE = 3_500_000
+
+PRODUK = ['CPOID', 'OLEIN', 'RBDPO', 'COCOA', 'gold']
+CONTRACT_RUSAK = ['CPOID', 'CPOID-XYZ25', 'CPOID-JAN', 'CPOID-JANAB', '-FEB25',
+                  '', 'OLEIN-FEB 25', 'cpoid-jan25', np.nan]
+MATA_UANG = ['IDR', 'USD', 'MYR', ' usd', np.nan, 'XXX', 'Rp', 'Rp.', 'rupiah', 'US$']
+AKUN = [f"AK{i:03d}" for i in range(40)] + [np.nan]
+MEMBER = [f"MB{i:02d}" for i in range(12)] + [np.nan]
+
+
+# === Data uji === #
+def muat_modul(path):
+    spec = importlib.util.spec_from_file_location('modul_dashboard', path)
+    modul = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modul)
+    return modul
+
+
+def skema_root(m):
+    return m.KOLOM_LOT == 'Vol(LOT)'
+
+
+def buat_kurs():
+    """Seri kurs USD mulai 2024-01-02 (ada Kurs kosong, di-ffill seperti load_jisdor) dan MYR."""
+    tanggal = pd.bdate_range('2024-01-02', '2026-01-30')
+    rng = np.random.default_rng(7)
+    usd = pd.DataFrame({'Tanggal': tanggal, 'Kurs': 15000 + rng.normal(0, 300, len(tanggal)).cumsum() / 10})
+    usd.loc[usd.index % 37 == 5, 'Kurs'] = np.nan
+    usd['Kurs'] = usd['Kurs'].ffill()
+    myr = pd.DataFrame({'Tanggal': tanggal[40:], 'Kurs': 3300 + rng.normal(0, 20, len(tanggal) - 40)})
+    return {'USD': usd, 'MYR': myr}
+
+
+def _lengkapi_skema(m, df, rng):
+    n = len(df)
+    if skema_root(m):
+        df['Acc.Buy'] = rng.choice(np.array(AKUN, dtype=object), n)
+        df['Mbr.Buy'] = rng.choice(np.array(MEMBER, dtype=object), n)
+        df['Acc.Sell'] = rng.choice(np.array(AKUN, dtype=object), n)
+        df['Mbr.Sell'] = rng.choice(np.array(MEMBER, dtype=object), n)
+        df['Currency'] = rng.choice(np.array(MATA_UANG, dtype=object), n)
+    else:
+        df['Acc'] = rng.choice(np.array(AKUN, dtype=object), n)
+        df['Buy Sell'] = rng.choice(np.array(['B', 'S', 'Buy', 'sell ', np.nan, '', 'X'], dtype=object), n)
+        df['Close Vol'] = df[m.KOLOM_LOT].where(rng.random(n) > 0.1, rng.integers(0, 5, n))
+    return df
+
+
+def buat_data_acak(m, n, seed):
+    rng = np.random.default_rng(seed)
+    detik = rng.integers(0, 760 * 86400, n)
+    detik[rng.random(n) < 0.2] //= 86400 * 86400  # sebagian tepat tengah malam
+    tanggal = pd.Timestamp('2023-12-01') + pd.to_timedelta(detik, unit='s')
+
+    bulan_ke = (tanggal.year * 12 + tanggal.month - 1).to_numpy() + rng.integers(-1, 4, n)
+    contract = np.array([
+        f"{PRODUK[p]}-{m.MONTH_REV[b % 12 + 1]}{(b // 12) % 100:02d}"
+        for p, b in zip(rng.integers(0, len(PRODUK), n), bulan_ke)
+    ], dtype=object)
+    rusak = rng.random(n) < 0.03
+    contract[rusak] = rng.choice(np.array(CONTRACT_RUSAK, dtype=object), rusak.sum())
+
+    lot = rng.integers(1, 50, n).astype(float)
+    lot[rng.random(n) < 0.02] = np.nan
+    harga = rng.uniform(8000, 15000, n).round(0)
+    harga[rng.random(n) < 0.01] = np.nan
+
+    df = pd.DataFrame({
+        'DateTrade': tanggal,
+        'Trade ID': np.arange(n),
+        'Contract': contract,
+        'Price': harga,
+        m.KOLOM_LOT: lot,
+    })
+    return _lengkapi_skema(m, df, rng)
+
+
+def buat_kasus_tepi(m):
+    t = pd.Timestamp
+    baris = [
+        # Rollover Januari: spot 16 Des s.d. 15 Jan 00:00
+        (t('2024-12-15 23:59:59'), 'CPOID-JAN25', 10),
+        (t('2024-12-16 00:00:00'), 'CPOID-JAN25', 10),
+        (t('2025-01-15 00:00:00'), 'CPOID-JAN25', 10),
+        (t('2025-01-15 00:00:01'), 'CPOID-JAN25', 10),
+        (t('2025-12-16 09:00:00'), 'OLEIN-JAN26', 7),
+        (t('2026-01-10 09:00:00'), 'OLEIN-JAN26', 7),
+        (t('2026-01-20 09:00:00'), 'OLEIN-JAN26', 7),
+        # Sebelum tanggal JISDOR pertama (2024-01-02) dan tepat di tanggalnya
+        (t('2023-12-20 10:00:00'), 'CPOID-JAN24', 5),
+        (t('2024-01-01 23:00:00'), 'CPOID-JAN24', 5),
+        (t('2024-01-02 00:00:00'), 'CPOID-FEB24', 5),
+        # Lot NaN & lot negatif (koreksi)
+        (t('2024-06-03 10:00:00'), 'RBDPO-JUL24', np.nan),
+        (t('2024-06-04 10:00:00'), 'RBDPO-JUL24', np.nan),
+        (t('2024-06-05 10:00:00'), 'RBDPO-JUL24', -2),
+        # Contract tidak bisa diparsing
+        *[(t('2024-07-01 10:00:00') + pd.Timedelta(days=i), c, 3) for i, c in enumerate(CONTRACT_RUSAK)],
+        # Contract jatuh tempo lalu masih ditransaksikan
+        (t('2024-08-05 10:00:00'), 'COCOA-AUG24', 4),
+        (t('2024-09-05 10:00:00'), 'COCOA-AUG24', 4),
+    ]
+    df = pd.DataFrame(baris, columns=['DateTrade', 'Contract', m.KOLOM_LOT])
+    df.insert(1, 'Trade ID', np.arange(len(df)) + 1_000_000)
+    df['Price'] = 10000.0
+    df.loc[3, 'Price'] = np.nan
+    return _lengkapi_skema(m, df, np.random.default_rng(11))
+
+
+# === Referensi per baris (dibekukan) === #
+# Salinan fungsi row-wise modul baseline. Kolom lot & jumlah sisi margin
+# berbeda per layout: root memakai Vol(LOT) dan margin dua sisi; webtest
+# menghitung Notional_Value dari Close Vol, ukuran kontrak & margin dari
+# Trade Vol, margin satu sisi.
+MONTH_MAP = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+}
+CONTRACT_SIZE_PER_LOT = 25000  # kg
+LAYOUT_REF = {
+    'root': {'lot': 'Vol(LOT)', 'lot_nv': 'Vol(LOT)', 'sisi': 2},
+    'webtest': {'lot': 'Trade Vol', 'lot_nv': 'Close Vol', 'sisi': 1},
+}
+
+
+def layout_ref(m):
+    return LAYOUT_REF['root' if skema_root(m) else 'webtest']
+
+
+def ekstrak_jenis_produk(contract_name):
+    if pd.isna(contract_name):
+        return 'Unknown'
+    try:
+        jenis = str(contract_name).split('-')[0].strip().upper()
+        return jenis if jenis else 'Unknown'
+    except:
+        return 'Unknown'
+
+
+def hitung_NV(row, layout):
+    price = row['Price']
+    lot = row[layout['lot_nv']]
+    if pd.isna(price) or pd.isna(lot):
+        return np.nan
+    return float(lot) * CONTRACT_SIZE_PER_LOT * float(price)
+
+
+def hitung_contract_size(row, layout):
+    lot = row[layout['lot']]
+    if pd.isna(lot):
+        return np.nan
+    return float(lot) * CONTRACT_SIZE_PER_LOT
+
+
+def hitung_margin(row, rate_spot, rate_remote, layout):
+    lot = row[layout['lot']]
+    date_trade = row['DateTrade']
+    contract_suffix = str(row['Contract']).split('-')[-1]
+
+    try:
+        bulan_kontrak = MONTH_MAP[contract_suffix[:3].upper()]
+        tahun_kontrak = 2000 + int(contract_suffix[3:])
+
+        if bulan_kontrak == 1:
+            bulan_sebelum = 12
+            tahun_sebelum = tahun_kontrak - 1
+        else:
+            bulan_sebelum = bulan_kontrak - 1
+            tahun_sebelum = tahun_kontrak
+
+        start_spot = datetime(tahun_sebelum, bulan_sebelum, 16)
+        end_spot = datetime(tahun_kontrak, bulan_kontrak, 15)
+
+        if start_spot <= date_trade <= end_spot:
+            margin_per_sisi = lot * rate_spot
+        else:
+            margin_per_sisi = lot * rate_remote
+
+        return margin_per_sisi * layout['sisi']
+
+    except Exception:
+        return lot * rate_remote * layout['sisi']
+
+
+ALIAS_MATA_UANG = {'RP': 'IDR', 'RUPIAH': 'IDR', 'INDONESIANRUPIAH': 'IDR', 'US$': 'USD', 'USDOLLAR': 'USD'}
+
+
+def _norm_mata_uang(nilai):
+    if pd.isna(nilai) or not str(nilai).strip():
+        return 'IDR'
+    kode = ''.join(c for c in str(nilai).upper() if not c.isspace() and c != '.')
+    return ALIAS_MATA_UANG.get(kode, kode)
+
+
+def _kurs_asof(seri, mata_uang, waktu):
+    if mata_uang == 'IDR':
+        return 1.0, None
+    if mata_uang not in seri or pd.isna(waktu):
+        return np.nan, None
+    tanggal, kurs = seri[mata_uang]
+    posisi = bisect.bisect_right(tanggal, waktu) - 1
+    if posisi < 0:
+        return np.nan, None
+    return kurs[posisi], tanggal[posisi]
+
+
+def _ref_bulan_kontrak(m, contract):
+    """Parsing suffix contract persis seperti hitung_margin → tanggal 1 bulan kontrak."""
+    suffix = str(contract).split('-')[-1]
+    try:
+        return pd.Timestamp(datetime(2000 + int(suffix[3:]), MONTH_MAP[suffix[:3].upper()], 1))
+    except Exception:
+        return pd.NaT
+
+
+def ref_kolom_turunan(m, df):
+    hasil = pd.DataFrame(index=df.index)
+    layout = layout_ref(m)
+    hasil['Jenis_Produk'] = df['Contract'].apply(ekstrak_jenis_produk)
+    hasil['Bulan_Kontrak'] = pd.to_datetime(df['Contract'].map(partial(_ref_bulan_kontrak, m)))
+    hasil['Contract_Size_KG'] = df.apply(hitung_contract_size, axis=1, args=(layout,))
+    hasil['Notional_Value'] = df.apply(hitung_NV, axis=1, args=(layout,))
+    hasil['Margin'] = df.apply(hitung_margin, axis=1, args=(RATE_SPOT, RATE_REMOTE, layout))
+    return hasil
+
+
+def ref_kolom_kurs(df, kurs):
+    seri = {k: (list(v['Tanggal']), list(v['Kurs'])) for k, v in kurs.items()}
+    hasil = {k: [] for k in ['Tanggal_Kurs', 'Kurs_Jisdor', 'Kurs_Mata_Uang',
+                             'Notional_Value_IDR', 'Notional_Value_USD']}
+    ada_currency = 'Currency' in df.columns
+
+    for row in df.itertuples(index=False):
+        kurs_usd, tanggal_usd = _kurs_asof(seri, 'USD', row.DateTrade)
+        hasil['Tanggal_Kurs'].append(pd.NaT if tanggal_usd is None else tanggal_usd)
+        hasil['Kurs_Jisdor'].append(kurs_usd)
+        if not ada_currency:
+            hasil['Notional_Value_USD'].append(row.Notional_Value / kurs_usd)
+            continue
+        mata_uang = _norm_mata_uang(row.Currency)
+        kurs_asal, _ = _kurs_asof(seri, mata_uang, row.DateTrade)
+        nilai_rp = row.Notional_Value * kurs_asal
+        hasil['Kurs_Mata_Uang'].append(kurs_asal)
+        hasil['Notional_Value_IDR'].append(nilai_rp)
+        hasil['Notional_Value_USD'].append(row.Notional_Value if mata_uang == 'USD' else nilai_rp / kurs_usd)
+
+    return pd.DataFrame({k: v for k, v in hasil.items() if v}, index=df.index)
+
+
+def ref_tabel_bulanan(m, df, kolom, nama_nilai):
+    total = defaultdict(float)
+    for waktu, nilai in zip(df['DateTrade'], df[kolom]):
+        total[waktu.month] += 0.0 if pd.isna(nilai) else nilai
+    bulan = sorted(total)
+    hasil = pd.DataFrame({'Bulan': [m.MONTH_NAME_ID[b] for b in bulan],
+                          nama_nilai: [total[b] for b in bulan]})
+    return pd.concat([hasil, pd.DataFrame({'Bulan': ['Total'], nama_nilai: [sum(total.values())]})],
+                     ignore_index=True)
+
+
+def ref_breakdown(m, df):
+    total = defaultdict(float)
+    for produk, waktu, lot in zip(df['Jenis_Produk'], df['DateTrade'], df[m.KOLOM_LOT]):
+        total[(produk, waktu.year)] += 0.0 if pd.isna(lot) else lot
+    list_produk = sorted({p for p, _ in total})
+    list_tahun = sorted({t for _, t in total})
+
+    baris = []
+    for produk in list_produk + ['Total Lot']:
+        if produk == 'Total Lot':
+            nilai = [sum(total.get((p, t), 0.0) for p in list_produk) for t in list_tahun]
+        else:
+            nilai = [total.get((produk, t), 0.0) for t in list_tahun]
+        yoy = [(b - a) / a * 100 if a > 0 else 0.0 for a, b in zip(nilai[:-1], nilai[1:])]
+        periode = len(list_tahun) - 1
+        cagr = ((nilai[-1] / nilai[0]) ** (1 / periode) - 1) * 100 if periode > 0 and nilai[0] > 0 else 0.0
+        baris.append([produk, *nilai, *yoy, cagr])
+
+    kolom = (['Jenis_Produk', *list_tahun]
+             + [f"Perubahan {a}-{b} (%)" for a, b in zip(list_tahun[:-1], list_tahun[1:])]
+             + ['CAGR (%)'])
+    return pd.DataFrame(baris, columns=kolom)
+
+
+def ref_nilai_per_mata_uang(m, df):
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in df.columns else 'Notional_Value'
+    grup = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for row in df[['DateTrade', 'Currency', 'Notional_Value', kolom_rp, 'Notional_Value_USD']].itertuples(index=False):
+        g = grup[(row[0].month, _norm_mata_uang(row[1]))]
+        g[0] += 1
+        for i, nilai in enumerate(row[2:], start=1):
+            g[i] += 0.0 if pd.isna(nilai) else nilai
+
+    baris = [[m.MONTH_NAME_ID[b], mu, *grup[(b, mu)]] for b, mu in sorted(grup)]
+    baris.append(['Total', '', sum(g[0] for g in grup.values()), np.nan,
+                  sum(g[2] for g in grup.values()), sum(g[3] for g in grup.values())])
+    return pd.DataFrame(baris, columns=['Bulan', 'Mata_Uang', 'Jumlah_Transaksi', 'Nilai_Asli',
+                                        'Nilai_Transaksi_RP', 'Nilai_Transaksi_USD'])
+
+
+def _ref_beli(buy_sell):
+    """Buy Sell → True (B…) / False (S…) / None (kosong / tidak dikenal)."""
+    if pd.isna(buy_sell):
+        return None
+    sisi = str(buy_sell).strip().upper()
+    return True if sisi.startswith('B') else False if sisi.startswith('S') else None
+
+
+def _sisi_transaksi(m, df):
+    """
+    Satu entri per sisi transaksi, urutan: semua sisi beli lalu semua sisi
+    jual (root). Webtest: baris tanpa sisi yang dikenal dilewati.
+    """
+    bersih = lambda v: 0.0 if pd.isna(v) else float(v)
+    # Nilai Rupiah: notional terkonversi kurs jika ada kolom Currency
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in df.columns else 'Notional_Value'
+    if skema_root(m):
+        pasangan = [(True, 'Acc.Buy', 'Mbr.Buy', 0.5), (False, 'Acc.Sell', 'Mbr.Sell', 0.5)]
+    else:
+        pasangan = [(None, 'Acc', 'Acc', 1.0)]
+
+    sisi = []
+    for beli, akun, member, bobot in pasangan:
+        for r in df.to_dict('records'):
+            beli_baris = _ref_beli(r['Buy Sell']) if beli is None else beli
+            if beli_baris is None:
+                continue
+            sisi.append({
+                'beli': beli_baris,
+                'akun': r[akun], 'member': r[member], 'waktu': r['DateTrade'], 'contract': r['Contract'],
+                'lot': bersih(r[m.KOLOM_LOT]), 'nv': bersih(r[kolom_rp]),
+                'margin': bersih(r['Margin']) * bobot,
+            })
+    return sisi
+
+
+def _urutan_muncul(nilai):
+    urutan = {}
+    for v in nilai:
+        if not pd.isna(v) and v not in urutan:
+            urutan[v] = len(urutan)
+    return urutan
+
+
+def ref_member_teratas(m, sisi, top_n):
+    urutan = _urutan_muncul(s['member'] for s in sisi)
+    total = defaultdict(lambda: [0.0, 0.0, 0.0])
+    for s in sisi:
+        if pd.isna(s['member']):
+            continue
+        g = total[((s['waktu'].year, s['waktu'].month), s['member'])]
+        g[0] += s['lot']; g[1] += s['nv']; g[2] += s['margin']
+
+    baris = []
+    for bulan in sorted({b for b, _ in total}):
+        anggota = sorted(((mb, v) for (b, mb), v in total.items() if b == bulan),
+                         key=lambda x: (-x[1][0], urutan[x[0]]))
+        for peringkat, (mb, v) in enumerate(anggota[:top_n], start=1):
+            if v[0] > 0:
+                label = f"{m.MONTH_NAME_ID[bulan[1]]} {bulan[0]}"
+                baris.append([label, peringkat, mb, *v])
+    return pd.DataFrame(baris, columns=['Bulan', 'Peringkat', 'Member', 'Volume_Lot',
+                                        'Nilai_Transaksi_RP', 'Margin'])
+
+
+def ref_member_beli_jual(sisi):
+    urutan = _urutan_muncul(s['member'] for s in sisi)
+    total = {mb: [0.0, 0.0] for mb in urutan}
+    for s in sisi:
+        if not pd.isna(s['member']):
+            total[s['member']][0 if s['beli'] else 1] += s['lot']
+    baris = [[mb, b, j, b - j, b + j] for mb, (b, j) in total.items() if b + j > 0]
+    baris.sort(key=lambda x: (-x[4], urutan[x[0]]))
+    return pd.DataFrame(baris, columns=['Member', 'Lot_Beli', 'Lot_Jual', 'Lot_Net', 'Total_Lot'])
+
+
+def ref_akun_teratas(m, sisi, top_n):
+    urutan = _urutan_muncul(s['akun'] for s in sisi)
+    total = {a: [0.0, 0.0, 0.0, 0.0] for a in urutan}
+    member = {}
+    for s in sisi:
+        if pd.isna(s['akun']):
+            continue
+        g = total[s['akun']]
+        g[0 if s['beli'] else 1] += s['lot']
+        g[2] += s['nv']; g[3] += s['margin']
+        if not pd.isna(s['member']):
+            member[s['akun']] = s['member']
+
+    baris = []
+    for akun in sorted(total, key=lambda a: (-(total[a][0] + total[a][1]), urutan[a]))[:top_n]:
+        b, j, nv, margin = total[akun]
+        if b + j > 0:
+            awal = [akun, member.get(akun)] if skema_root(m) else [akun]
+            baris.append([*awal, b, j, b + j, nv, margin])
+    kolom = ['Akun', 'Member'] if skema_root(m) else ['Akun']
+    return pd.DataFrame(baris, columns=kolom + ['Lot_Beli', 'Lot_Jual', 'Total_Lot',
+                                                'Nilai_Transaksi_RP', 'Margin'])
+
+
+def ref_open_interest(m, sisi):
+    valid = [s for s in sisi if not pd.isna(s['akun']) and not pd.isna(s['contract']) and not pd.isna(s['waktu'])]
+    if not valid:
+        return pd.DataFrame({'Bulan': []})
+    kode_bulan = lambda w: w.year * 12 + w.month - 1
+    tempo = {}
+    for c in {s['contract'] for s in valid}:
+        kontrak = _ref_bulan_kontrak(m, c)
+        tempo[c] = np.nan if pd.isna(kontrak) else kode_bulan(kontrak)
+
+    aktif = [s for s in valid if np.isnan(tempo[s['contract']]) or kode_bulan(s['waktu']) <= tempo[s['contract']]]
+    rentang = range(min(kode_bulan(s['waktu']) for s in valid), max(kode_bulan(s['waktu']) for s in valid) + 1)
+    produk = sorted({ekstrak_jenis_produk(s['contract']) for s in aktif})
+
+    baris = []
+    for bulan in rentang:
+        posisi = defaultdict(float)
+        for s in aktif:
+            if kode_bulan(s['waktu']) <= bulan:
+                posisi[(s['akun'], s['contract'])] += s['lot'] if s['beli'] else -s['lot']
+        oi = dict.fromkeys(produk, 0.0)
+        for (akun, contract), pos in posisi.items():
+            if np.isnan(tempo[contract]) or bulan <= tempo[contract]:
+                oi[ekstrak_jenis_produk(contract)] += max(pos, 0.0)
+        baris.append([f"{m.MONTH_NAME_ID[bulan % 12 + 1]} {bulan // 12}", *oi.values(), sum(oi.values())])
+    return pd.DataFrame(baris, columns=['Bulan', *produk, 'Total'])
+
+
+def ref_rekap_harian(m, df):
+    metrik = {k: v for k, v in m.METRIK_HARIAN.items() if k in df.columns}
+    total = defaultdict(lambda: dict.fromkeys(metrik.values(), 0.0))
+    for row in df[['DateTrade', 'Jenis_Produk', *metrik]].itertuples(index=False):
+        g = total[(row[0].normalize(), row[1])]
+        for nama, nilai in zip(metrik.values(), row[2:]):
+            g[nama] += 0.0 if pd.isna(nilai) else nilai
+
+    list_tanggal = sorted({t for t, _ in total})
+    list_produk = sorted({p for _, p in total})
+    baris = []
+    riwayat = {p: [] for p in list_produk}
+    for tanggal in list_tanggal:
+        for produk in list_produk:
+            hari_ini = total.get((tanggal, produk), dict.fromkeys(metrik.values(), 0.0))
+            riwayat[produk].append(hari_ini)
+            isi = {'Tanggal': tanggal, 'Jenis_Produk': produk}
+            for nama in metrik.values():
+                isi[nama] = hari_ini[nama]
+                for window in m.ROLLING_WINDOWS:
+                    isi[f"{nama}_{window}H"] = sum(h[nama] for h in riwayat[produk][-window:])
+            if any(v != 0 for k, v in isi.items() if k not in ('Tanggal', 'Jenis_Produk')):
+                baris.append(isi)
+    return pd.DataFrame(baris)
+
+
+def ref_struktur_tenor(m, df):
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in df else 'Notional_Value'
+    layout = layout_ref(m)
+    sel = {}
+    for row in df[['DateTrade', 'Contract', 'Jenis_Produk', m.KOLOM_LOT, kolom_rp]].itertuples(index=False):
+        waktu, contract, produk, lot, nilai = row
+        if pd.isna(waktu):
+            continue
+        kontrak = _ref_bulan_kontrak(m, contract)
+        bulan_trade = waktu.year * 12 + waktu.month - 1
+        bulan_kontrak = np.nan if pd.isna(kontrak) else kontrak.year * 12 + kontrak.month - 1
+        # Spot ⇔ hitung_margin memakai rate spot
+        spot = hitung_margin({layout['lot']: 1, 'DateTrade': waktu, 'Contract': contract}, 1, 0, layout) != 0
+        isi = sel.setdefault((bulan_trade, bulan_kontrak, produk), [0.0, 0.0, 0.0])
+        if not pd.isna(lot):
+            isi[0] += lot
+            isi[1] += lot if spot else 0.0
+        if not pd.isna(nilai):
+            isi[2] += nilai
+    baris = []
+    for (bulan_trade, bulan_kontrak, produk), (volume, lot_spot, nilai) in sorted(
+            sel.items(), key=lambda kv: (kv[0][0], np.inf if pd.isna(kv[0][1]) else kv[0][1], kv[0][2])):
+        porsi_spot = lot_spot / volume * 100 if volume else 0.0
+        porsi_remote = (volume - lot_spot) / volume * 100 if volume else 0.0
+        baris.append({
+            'Bulan_Trade': f"{m.MONTH_NAME_ID[bulan_trade % 12 + 1]} {bulan_trade // 12}",
+            'Bulan_Kontrak': ('Unknown' if pd.isna(bulan_kontrak)
+                              else f"{m.MONTH_NAME_ID[bulan_kontrak % 12 + 1]} {bulan_kontrak // 12}"),
+            'Tenor_Bulan': bulan_kontrak - bulan_trade,
+            'Jenis_Produk': produk,
+            'Volume_Lot': volume,
+            'Lot_Spot': lot_spot,
+            'Lot_Remote': volume - lot_spot,
+            'Porsi_Spot (%)': porsi_spot,
+            'Porsi_Remote (%)': porsi_remote,
+            'Nilai_Transaksi_RP': nilai,
+        })
+    return pd.DataFrame(baris)
+
+
+def ref_kualitas_data(m, df, panjang_file):
+    """Jumlah anomali per pemeriksaan, per file dan contoh baris lewat loop per baris."""
+    cek = {'DateTrade kosong': lambda r: pd.isna(r['DateTrade'])}
+    for nama in (m.KOLOM_LOT, 'Price', 'Close Vol'):
+        if nama in df:
+            cek[f"{nama} kosong"] = lambda r, nama=nama: pd.isna(r[nama])
+    cek['Contract tidak terbaca'] = lambda r: pd.isna(_ref_bulan_kontrak(m, r['Contract']))
+    cek['Kurs JISDOR kosong'] = lambda r: not pd.isna(r['DateTrade']) and pd.isna(r['Kurs_Jisdor'])
+    if 'Kurs_Mata_Uang' in df:
+        cek['Kurs mata uang kosong'] = lambda r: not pd.isna(r['DateTrade']) and pd.isna(r['Kurs_Mata_Uang'])
+    cek['Lot negatif'] = lambda r: not pd.isna(r[m.KOLOM_LOT]) and r[m.KOLOM_LOT] < 0
+    if 'Buy Sell' in df:
+        cek['Buy Sell tidak dikenal'] = lambda r: _ref_beli(r['Buy Sell']) is None
+
+    baris = df.to_dict('records')
+    file_ke, bulan_file = [], []
+    awal = 0
+    for i, panjang in enumerate(panjang_file):
+        hitung = defaultdict(int)
+        for r in baris[awal:awal + panjang]:
+            if not pd.isna(r['DateTrade']):
+                hitung[(r['DateTrade'].year, r['DateTrade'].month)] += 1
+        # Bulan terbanyak; seri → bulan paling awal
+        bulan_file.append(min(hitung, key=lambda k: (-hitung[k], k)) if hitung else None)
+        file_ke += [i] * panjang
+        awal += panjang
+    cek['Di luar bulan file'] = lambda r: (not pd.isna(r['DateTrade'])
+                                           and (r['DateTrade'].year, r['DateTrade'].month) != bulan_file[r['_file']])
+
+    jumlah = {nama: 0 for nama in cek}
+    per_file = [{nama: 0 for nama in cek} for _ in panjang_file]
+    contoh = []
+    bermasalah = 0
+    for pos, (r, f) in enumerate(zip(baris, file_ke)):
+        r['_file'] = f
+        ada = False
+        for nama, fungsi in cek.items():
+            if fungsi(r):
+                jumlah[nama] += 1
+                per_file[f][nama] += 1
+                ada = True
+                if jumlah[nama] <= m.N_CONTOH_KUALITAS:
+                    contoh.append((list(cek).index(nama), pos + 2, nama))
+        bermasalah += ada
+    ringkasan = pd.DataFrame({'Pemeriksaan': [*cek, 'Baris bermasalah (unik)'],
+                              'Jumlah_Baris': [*jumlah.values(), bermasalah]})
+    per_file_df = pd.DataFrame([{
+        'Sumber': f"file_{i}.xlsx",
+        'Bulan_File': 'Unknown' if b is None else f"{m.MONTH_NAME_ID[b[1]]} {b[0]}",
+        'Baris': panjang, **isi,
+    } for i, (panjang, b, isi) in enumerate(zip(panjang_file, bulan_file, per_file))])
+    contoh_df = pd.DataFrame(sorted(contoh), columns=['_urut', 'Baris_Dashboard', 'Pemeriksaan'])
+    return ringkasan, per_file_df, contoh_df[['Pemeriksaan', 'Baris_Dashboard']]
+
+
+def ref_partisi_bulanan(m, df):
+    urut = df.assign(_urut=np.arange(len(df))).sort_values(['DateTrade', '_urut'], kind='stable')
+    urut = urut[urut['DateTrade'].notna()]
+    hasil = {}
+    for waktu, idx in zip(urut['DateTrade'], urut.index):
+        hasil.setdefault(f"{m.MONTH_REV[waktu.month]}{waktu.year % 100:02d}", []).append(idx)
+    return {nama: df.loc[idx] for nama, idx in hasil.items()}
+
+
+# === Perbandingan === #
+def bandingkan(hasil_cek, nama, hasil, referensi):
+    """Semua tabel & kolom harus sama (angka dalam toleransi RTOL/ATOL)."""
+    try:
+        pd.testing.assert_frame_equal(
+            hasil.reset_index(drop=True), referensi.reset_index(drop=True),
+            check_dtype=False, check_exact=False, rtol=RTOL, atol=ATOL,
+            check_column_type=False, check_index_type=False,
+        )
+    except AssertionError as e:
+        hasil_cek[nama] = False
+        print(f"❌ {nama}\n{e}\n")
+        return
+    hasil_cek[nama] = True
+    print(f"✅ {nama} ({len(hasil)} baris, {len(hasil.columns)} kolom)")
+
+
+def periksa_data(m, nama, df_mentah, kurs_mentah, hasil_cek):
+    print(f"\n=== {nama}: {len(df_mentah)} transaksi ===")
+    kurs = m.buat_penyimpanan_kurs(kurs_mentah)
+    p = partial(bandingkan, hasil_cek)
+    kolom_turunan = ['Jenis_Produk', 'Bulan_Kontrak', 'Contract_Size_KG', 'Notional_Value', 'Margin']
+
+    df = m._urutkan_tanggal(df_mentah.copy())
+    referensi = ref_kolom_turunan(m, df)
+    m.lengkapi_trade(df, kurs, RATE_SPOT, RATE_REMOTE)
+    p(f"{nama} / kolom turunan", df[kolom_turunan], referensi)
+
+    ref_kurs = ref_kolom_kurs(df, kurs_mentah)
+    p(f"{nama} / kolom kurs", df[ref_kurs.columns], ref_kurs)
+
+    df_ref_kurs = m.padankan_kurs(df_mentah.sample(frac=1, random_state=1).assign(
+        Notional_Value=lambda d: d.apply(hitung_NV, axis=1, args=(layout_ref(m),))), kurs)
+    p(f"{nama} / padankan_kurs (input acak)",
+                 df_ref_kurs[ref_kurs.columns], ref_kolom_kurs(df_ref_kurs, kurs_mentah))
+
+    dashboard_df, sheet_map = m.gabung_trade([m._urutkan_tanggal(df_mentah.copy())], kurs, RATE_SPOT, RATE_REMOTE)
+    p(f"{nama} / gabung_trade = lengkapi_trade", dashboard_df[df.columns], df)
+
+    for builder, kolom, judul in [
+        (m.buat_rekap_volume, m.KOLOM_LOT, 'Volume_Lot'),
+        (m.buat_nilai_transaksi_rp, 'Notional_Value_IDR' if 'Notional_Value_IDR' in df else 'Notional_Value',
+         'Nilai Transaksi RP'),
+        (m.buat_nilai_transaksi_usd, 'Notional_Value_USD', 'Nilai Transaksi (USD)'),
+        (m.buat_margin_transaksi, 'Margin', 'Margin Transaksi (Rp)'),
+    ]:
+        hasil, _ = builder(dashboard_df)
+        p(f"{nama} / {builder.__name__}", hasil, ref_tabel_bulanan(m, dashboard_df, kolom, judul))
+
+    breakdown_df, _, _ = m.buat_breakdown_volume(dashboard_df)
+    p(f"{nama} / buat_breakdown_volume", breakdown_df, ref_breakdown(m, dashboard_df))
+
+    if 'Currency' in dashboard_df.columns:
+        p(f"{nama} / buat_nilai_per_mata_uang",
+                     m.buat_nilai_per_mata_uang(dashboard_df), ref_nilai_per_mata_uang(m, dashboard_df))
+
+    sisi = _sisi_transaksi(m, dashboard_df)
+    indeks = m.buat_indeks_grup(dashboard_df)
+    p(f"{nama} / buat_member_teratas", m.buat_member_teratas(dashboard_df, indeks),
+                 ref_member_teratas(m, sisi, m.TOP_N_MEMBER))
+    p(f"{nama} / buat_member_beli_jual", m.buat_member_beli_jual(dashboard_df, indeks),
+                 ref_member_beli_jual(sisi))
+    p(f"{nama} / buat_akun_teratas", m.buat_akun_teratas(dashboard_df, indeks),
+                 ref_akun_teratas(m, sisi, m.TOP_N_AKUN))
+    p(f"{nama} / buat_open_interest", m.buat_open_interest(dashboard_df, indeks),
+                 ref_open_interest(m, sisi))
+
+    p(f"{nama} / buat_struktur_tenor", m.buat_struktur_tenor(dashboard_df),
+      ref_struktur_tenor(m, dashboard_df))
+
+    harian_df = m.buat_rekap_harian(dashboard_df)
+    p(f"{nama} / buat_rekap_harian", harian_df, ref_rekap_harian(m, dashboard_df))
+    batas = dashboard_df['DateTrade'].quantile(0.7)
+    lama = dashboard_df[dashboard_df['DateTrade'] < batas]
+    baru = dashboard_df[dashboard_df['DateTrade'] >= batas]
+    p(f"{nama} / perbarui_rekap_harian",
+                 m.perbarui_rekap_harian(m.buat_rekap_harian(lama), baru), harian_df)
+    # Transaksi baru di tanggal yang sudah ada di rekap lama (file susulan)
+    susulan = (dashboard_df['DateTrade'] >= dashboard_df['DateTrade'].quantile(0.5)) & (dashboard_df.index % 4 == 0)
+    p(f"{nama} / perbarui_rekap_harian (tanggal beririsan)",
+                 m.perbarui_rekap_harian(m.buat_rekap_harian(dashboard_df[~susulan]), dashboard_df[susulan]),
+                 harian_df)
+
+    # Tiga "file" berurutan seperti hasil dedup_trade (batas baris dari Baris_Dipakai)
+    panjang_file = [len(dashboard_df) // 3, len(dashboard_df) // 3, len(dashboard_df) - 2 * (len(dashboard_df) // 3)]
+    laporan = pd.DataFrame({'Sumber': [f"file_{i}.xlsx" for i in range(3)], 'Baris_Dipakai': panjang_file})
+    kualitas = m.buat_kualitas_data(dashboard_df, laporan)
+    ref_kualitas = ref_kualitas_data(m, dashboard_df, panjang_file)
+    p(f"{nama} / buat_kualitas_data (ringkasan)", kualitas[0][['Pemeriksaan', 'Jumlah_Baris']], ref_kualitas[0])
+    p(f"{nama} / buat_kualitas_data (per file)", kualitas[1], ref_kualitas[1])
+    p(f"{nama} / buat_kualitas_data (contoh)", kualitas[2][['Pemeriksaan', 'Baris_Dashboard']], ref_kualitas[2])
+
+    ref_sheet = ref_partisi_bulanan(m, dashboard_df)
+    p(f"{nama} / partisi_bulanan (nama sheet)",
+      pd.DataFrame({'Sheet': list(sheet_map)}), pd.DataFrame({'Sheet': list(ref_sheet)}))
+    for sheet, ambil in sheet_map.items():
+        if sheet in ref_sheet:
+            p(f"{nama} / partisi_bulanan {sheet}", ambil(), ref_sheet[sheet])
+
+
+def main():
+    default_modul = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_v6_dengan_jenis_produk.py')
+    parser = argparse.ArgumentParser(description='Cek ekuivalensi jalur teroptimasi vs referensi per baris')
+    parser.add_argument('--modul', default=default_modul, help='Path modul dashboard yang diuji')
+    parser.add_argument('--baris', type=int, default=20000, help='Jumlah transaksi data acak')
+    parser.add_argument('--seed', type=int, default=2025)
+    args = parser.parse_args()
+
+    mulai = time.time()
+    m = muat_modul(args.modul)
+    kurs_mentah = buat_kurs()
+    if not skema_root(m):
+        # Skema webtest tanpa kolom Currency: hanya seri JISDOR
+        kurs_mentah = {'USD': kurs_mentah['USD']}
+
+    hasil_cek = {}
+    periksa_data(m, 'kasus_tepi', buat_kasus_tepi(m), kurs_mentah, hasil_cek)
+    periksa_data(m, 'acak', buat_data_acak(m, args.baris, args.seed), kurs_mentah, hasil_cek)
+
+    cocok = sum(hasil_cek.values())
+    print(f"\n{'=' * 70}")
+    print(f"{cocok}/{len(hasil_cek)} pemeriksaan cocok ({time.time() - mulai:.1f} detik)")
+    print('=' * 70)
+    return 0 if cocok == len(hasil_cek) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Cek batas memori pipeline dashboard_v6_dengan_jenis_produk pada data besar.
+
+Frame trade mentah (layout hasil read_excel, dipecah per file) dibuat di
+luar pengukuran; lalu di bawah tracemalloc dijalankan jalur produksi:
+siapkan_kolom_trade (bagian baca_trade setelah read_excel) per file,
+dedup_trade, gabung_trade, semua builder buat_* sheet ringkasan,
+buat_rekap_harian dan buat_kualitas_data. Puncak alokasi tambahan dibagi
+ukuran data mentah (memory_usage deep) harus di bawah --batas; frame besar
+yang disalin ulang (slice, merge, concat berulang) langsung melewatinya.
+
+Pemakaian:
+    python cek_memori.py
+    python cek_memori.py --modul webtest/python/dashboard_v6_dengan_jenis_produk.py
+    python cek_memori.py --baris 200000 --batas 1.8
+Exit code 1 jika puncak / ukuran mentah >= batas.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cek_ekuivalensi import buat_data_acak, buat_kurs, muat_modul, skema_root
+
+BARIS = 1_000_000
+JUMLAH_FILE = 12
+# Batas puncak alokasi / ukuran data mentah per layout. Terukur di 1 juta
+# baris: root ~1.0x, webtest ~1.6x (kolom teks lebih sedikit → data mentah
+# lebih kecil). Satu salinan penuh dashboard_df (~0.9x / ~1.4x) melewatinya.
+BATAS = {'root': 1.3, 'webtest': 1.9}
+
+# Kolom posisional file upload per layout (urutan sama dengan siapkan_kolom_trade)
+LAYOUT_ROOT = ['DateTrade', 'Trade ID', 'Contract', 'Acc.Buy', 'Mbr.Buy', 'Acc.Sell', 'Mbr.Sell',
+               'Currency', 'Price', 'Unit', 'Vol(LOT)', 'ClosePosition']
+LAYOUT_WEBTEST = ['DateTrade', 'Trade ID', 'Contract', 'Acc', 'Buy Sell', 'Trade Vol', 'Price',
+                  'Close Vol', 'Close Settle', 'Fee Trade', 'Overnight']
+
+
+def buat_frame_mentah(m, n, jumlah_file, seed=2025):
+    """Data acak harness → daftar frame per file dengan kolom posisional seperti read_excel."""
+    df = buat_data_acak(m, n, seed)
+    if skema_root(m):
+        layout = LAYOUT_ROOT
+        df['Unit'] = 'LOT'
+        df['ClosePosition'] = 0
+    else:
+        layout = LAYOUT_WEBTEST
+        df['Close Settle'] = df['Price']
+        df['Fee Trade'] = 1000
+        df['Overnight'] = 'N'
+    df = df[layout]
+    df.columns = range(len(layout))
+    return [df.iloc[posisi].reset_index(drop=True) for posisi in np.array_split(np.arange(n), jumlah_file)]
+
+
+def jalankan_pipeline(m, frames, kurs):
+    """Jalur produksi dari frame mentah sampai semua tabel ringkasan; return puncak per tahap."""
+    puncak = {}
+
+    def tahap(nama):
+        puncak[nama] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+    frames = [m.siapkan_kolom_trade(df) for df in frames]
+    tahap('siapkan_kolom_trade')
+    frames, laporan = m.dedup_trade(frames, [f"file_{i}.xlsx" for i in range(len(frames))])
+    tahap('dedup_trade')
+    dashboard_df, sheet_map = m.gabung_trade(frames, kurs)
+    del frames
+    tahap('gabung_trade')
+
+    indeks = m.buat_indeks_grup(dashboard_df)
+    for builder in (m.buat_rekap_volume, m.buat_breakdown_volume, m.buat_nilai_transaksi_rp,
+                    m.buat_nilai_transaksi_usd, m.buat_nilai_per_mata_uang, m.buat_margin_transaksi,
+                    m.buat_struktur_tenor):
+        builder(dashboard_df)
+    for builder in (m.buat_member_teratas, m.buat_member_beli_jual, m.buat_akun_teratas,
+                    m.buat_open_interest):
+        builder(dashboard_df, indeks)
+    tahap('builder buat_*')
+    m.buat_rekap_harian(dashboard_df)
+    tahap('buat_rekap_harian')
+    m.buat_kualitas_data(dashboard_df, laporan)
+    tahap('buat_kualitas_data')
+    for ambil in sheet_map.values():
+        ambil()
+    tahap('sheet bulanan')
+    return puncak
+
+
+def main():
+    default_modul = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_v6_dengan_jenis_produk.py')
+    parser = argparse.ArgumentParser(description='Cek puncak memori pipeline vs ukuran data mentah')
+    parser.add_argument('--modul', default=default_modul, help='Path modul dashboard yang diuji')
+    parser.add_argument('--baris', type=int, default=BARIS, help='Jumlah transaksi (default: 1 juta)')
+    parser.add_argument('--file', type=int, default=JUMLAH_FILE, help='Jumlah file trade')
+    parser.add_argument('--batas', type=float, help='Batas puncak / ukuran mentah (default: BATAS per layout)')
+    args = parser.parse_args()
+
+    mulai = time.time()
+    m = muat_modul(args.modul)
+    kurs_mentah = buat_kurs()
+    if not skema_root(m):
+        kurs_mentah = {'USD': kurs_mentah['USD']}
+    kurs = m.buat_penyimpanan_kurs(kurs_mentah)
+    batas = args.batas or BATAS['root' if skema_root(m) else 'webtest']
+    frames = buat_frame_mentah(m, args.baris, args.file)
+    ukuran_mentah = sum(int(df.memory_usage(index=True, deep=True).sum()) for df in frames)
+    print(f"Data mentah: {args.baris:,} transaksi, {args.file} file, {ukuran_mentah / 2**20:,.1f} MiB")
+
+    tracemalloc.start()
+    try:
+        puncak = jalankan_pipeline(m, frames, kurs)
+    finally:
+        tracemalloc.stop()
+
+    for nama, nilai in puncak.items():
+        print(f"  {nama:<22} puncak {nilai / 2**20:9,.1f} MiB  ({nilai / ukuran_mentah:.2f}x)")
+    rasio = max(puncak.values()) / ukuran_mentah
+    lolos = rasio < batas
+    print(f"{'✅' if lolos else '❌'} Puncak {rasio:.2f}x ukuran mentah (batas {batas}x, "
+          f"{time.time() - mulai:.1f} detik)")
+    return 0 if lolos else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+package main
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"os"
+	"path/filepath"
+
+	"github.com/gorilla/mux"
+)
+
+// Arrow IPC artifacts written by processor.py --arrow-dir: one .arrow file
+// per table plus a manifest.json sidecar with row counts, columns and the
+// summary, so the server never has to start Python (or parse Excel) for them.
+const ArtifactDir = CacheDir + "/arrow"
+
+type ArtifactFile struct {
+	File    string   `json:"file"`
+	Rows    int      `json:"rows"`
+	Columns []string `json:"columns"`
+}
+
+type ArtifactManifest struct {
+	Format    string                  `json:"format"`
+	CreatedAt string                  `json:"created_at"`
+	Rows      int                     `json:"rows"`
+	Files     map[string]ArtifactFile `json:"files"`
+	Summary   json.RawMessage         `json:"summary,omitempty"`
+}
+
+type ArtifactResponse struct {
+	Success    bool                    `json:"success"`
+	SummaryKey string                  `json:"summary_key,omitempty"`
+	CreatedAt  string                  `json:"created_at,omitempty"`
+	Rows       int                     `json:"rows"`
+	Files      map[string]ArtifactFile `json:"files,omitempty"`
+	Error      string                  `json:"error,omitempty"`
+}
+
+func artifactDir(key string) string {
+	return filepath.Join(ArtifactDir, filepath.Base(key))
+}
+
+func readArtifactManifest(key string) (ArtifactManifest, error) {
+	var manifest ArtifactManifest
+	data, err := os.ReadFile(filepath.Join(artifactDir(key), "manifest.json"))
+	if err != nil {
+		return manifest, err
+	}
+	err = json.Unmarshal(data, &manifest)
+	return manifest, err
+}
+
+// GET /api/artifacts/{key} - row counts and columns per Arrow table
+func getArtifactsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	key := mux.Vars(r)["key"]
+	manifest, err := readArtifactManifest(key)
+	if err != nil || !retention.lookup(artifactDir(key)) {
+		w.WriteHeader(http.StatusNotFound)
+		json.NewEncoder(w).Encode(ArtifactResponse{
+			Success: false,
+			Error:   "Artifacts not found",
+		})
+		return
+	}
+
+	json.NewEncoder(w).Encode(ArtifactResponse{
+		Success:    true,
+		SummaryKey: key,
+		CreatedAt:  manifest.CreatedAt,
+		Rows:       manifest.Rows,
+		Files:      manifest.Files,
+	})
+}
+
+// GET /api/artifacts/{key}/{table} - raw Arrow IPC file (e.g. for Arrow JS)
+func downloadArtifactHandler(w http.ResponseWriter, r *http.Request) {
+	vars := mux.Vars(r)
+	manifest, err := readArtifactManifest(vars["key"])
+	if err != nil || !retention.lookup(artifactDir(vars["key"])) {
+		http.Error(w, "Artifacts not found", http.StatusNotFound)
+		return
+	}
+
+	file, ok := manifest.Files[vars["table"]]
+	if !ok {
+		http.Error(w, "Table not found", http.StatusNotFound)
+		return
+	}
+
+	w.Header().Set("Content-Type", "application/vnd.apache.arrow.file")
+	log.Printf("📦 Serving artifact %s/%s (%d rows)", vars["key"], file.File, file.Rows)
+	http.ServeFile(w, r, filepath.Join(artifactDir(vars["key"]), filepath.Base(file.File)))
+}
@@ -0,0 +1,140 @@
+package main
+
+import (
+	"encoding/json"
+	"errors"
+	"fmt"
+	"io"
+	"log"
+	"mime/multipart"
+	"net/http"
+	"os"
+	"path/filepath"
+	"runtime"
+	"sync"
+	"time"
+)
+
+// MaxBatchFiles caps the number of files in one /api/upload/batch request
+const MaxBatchFiles = 24
+
+var errBadExtension = errors.New("Only Excel files (.xlsx, .xls) or CSV are allowed")
+
+// sniffSlots bounds concurrent sniff.py processes during batch uploads
+var sniffSlots = make(chan struct{}, runtime.NumCPU())
+
+type BatchUploadResponse struct {
+	Success bool               `json:"success"`
+	Files   []*ProcessResponse `json:"files"`
+	Error   string             `json:"error,omitempty"`
+}
+
+// saveUploadPart streams one multipart file part into UploadDir through a
+// pooled copy buffer (no in-memory form parsing) and returns the stored name
+func saveUploadPart(part *multipart.Part) (string, int64, error) {
+	name := filepath.Base(part.FileName())
+	ext := filepath.Ext(name)
+	if ext != ".xlsx" && ext != ".xls" && ext != ".csv" {
+		return "", 0, errBadExtension
+	}
+
+	// Unique filename; O_EXCL keeps same-second uploads of one name apart
+	timestamp := time.Now().Unix()
+	filename := fmt.Sprintf("%d_%s", timestamp, name)
+	dst, err := os.OpenFile(filepath.Join(UploadDir, filename), os.O_WRONLY|os.O_CREATE|os.O_EXCL, 0644)
+	for i := 1; os.IsExist(err); i++ {
+		filename = fmt.Sprintf("%d_%d_%s", timestamp, i, name)
+		dst, err = os.OpenFile(filepath.Join(UploadDir, filename), os.O_WRONLY|os.O_CREATE|os.O_EXCL, 0644)
+	}
+	if err != nil {
+		return "", 0, fmt.Errorf("Failed to save file: %v", err)
+	}
+
+	buf := copyBuffers.Get().(*[]byte)
+	defer copyBuffers.Put(buf)
+	n, err := io.CopyBuffer(dst, io.LimitReader(part, MaxFileSize+1), *buf)
+	dst.Close()
+	if err == nil && n > MaxFileSize {
+		err = fmt.Errorf("file exceeds %d MB, use the chunked upload", MaxFileSize>>20)
+	}
+	if err != nil {
+		os.Remove(filepath.Join(UploadDir, filename))
+		return "", 0, fmt.Errorf("Failed to write file: %v", err)
+	}
+
+	retention.touch(filepath.Join(UploadDir, filename))
+	return filename, n, nil
+}
+
+// POST /api/upload/batch - several files in one multipart request. Each
+// file is sniffed in the background as soon as it is on disk, overlapping
+// with the rest of the request body; results keep the part order.
+func uploadBatchHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	reader, err := r.MultipartReader()
+	if err != nil {
+		json.NewEncoder(w).Encode(BatchUploadResponse{
+			Success: false,
+			Error:   "Failed to read uploaded files: " + err.Error(),
+		})
+		return
+	}
+
+	var wg sync.WaitGroup
+	var results []*ProcessResponse
+	for {
+		part, err := reader.NextPart()
+		if err == io.EOF {
+			break
+		}
+		if err != nil {
+			wg.Wait()
+			log.Printf("❌ Error reading batch upload: %v", err)
+			json.NewEncoder(w).Encode(BatchUploadResponse{
+				Success: false,
+				Files:   results,
+				Error:   "Failed to read uploaded files: " + err.Error(),
+			})
+			return
+		}
+		if part.FileName() == "" {
+			continue
+		}
+
+		resp := &ProcessResponse{}
+		results = append(results, resp)
+		if len(results) > MaxBatchFiles {
+			resp.Error = fmt.Sprintf("more than %d files in one batch", MaxBatchFiles)
+			continue
+		}
+
+		filename, size, err := saveUploadPart(part)
+		if err != nil {
+			log.Printf("❌ Batch upload %s: %v", part.FileName(), err)
+			resp.Error = err.Error()
+			continue
+		}
+		log.Printf("✅ File uploaded (batch): %s (size: %.2f MB)", filename, float64(size)/(1024*1024))
+		*resp = ProcessResponse{Success: true, Message: "File uploaded successfully", OutputFile: filename}
+
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			sniffSlots <- struct{}{}
+			defer func() { <-sniffSlots }()
+			if meta, err := sniffUpload(filename); err != nil {
+				log.Printf("⚠️  Could not sniff %s: %v", filename, err)
+			} else {
+				resp.Meta = &meta
+			}
+		}()
+	}
+	wg.Wait()
+	retention.kick()
+
+	json.NewEncoder(w).Encode(BatchUploadResponse{
+		Success: true,
+		Files:   results,
+	})
+}
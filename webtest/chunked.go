@@ -0,0 +1,350 @@
+package main
+
+import (
+	"crypto/rand"
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"fmt"
+	"io"
+	"log"
+	"net/http"
+	"os"
+	"path/filepath"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+
+	"github.com/gorilla/mux"
+)
+
+// Chunked, resumable uploads: the client opens a session, PUTs fixed-size
+// chunks (in any order, in parallel) at their byte offset, then completes
+// the session. Each chunk is streamed straight into a preallocated .part
+// file and hashed on the way in, so memory stays at one copy buffer per
+// request regardless of file size.
+const (
+	PartialDir = UploadDir + "/.partial"
+	// A completed upload moves into UploadDir, so it must fit its budget
+	MaxChunkedFileSize = UploadBudget
+	DefaultChunkSize   = 8 << 20
+	MinChunkSize       = 1 << 20
+	MaxChunkSize       = 64 << 20
+	PartialMaxIdle     = 24 * time.Hour
+)
+
+var copyBuffers = sync.Pool{New: func() interface{} { b := make([]byte, 256<<10); return &b }}
+
+type UploadSessionRequest struct {
+	Filename  string `json:"filename"`
+	Size      int64  `json:"size"`
+	ChunkSize int64  `json:"chunk_size"`
+}
+
+type UploadSessionResponse struct {
+	Success   bool   `json:"success"`
+	UploadID  string `json:"upload_id,omitempty"`
+	Filename  string `json:"filename,omitempty"`
+	Size      int64  `json:"size"`
+	ChunkSize int64  `json:"chunk_size,omitempty"`
+	Received  []int  `json:"received"`
+	Offset    int64  `json:"offset"`
+	Error     string `json:"error,omitempty"`
+}
+
+// uploadSession is persisted as session.json next to data.part in
+// PartialDir/<id>/, so an interrupted upload can resume after a restart.
+type uploadSession struct {
+	mu        sync.Mutex
+	ID        string    `json:"upload_id"`
+	Filename  string    `json:"filename"`
+	Size      int64     `json:"size"`
+	ChunkSize int64     `json:"chunk_size"`
+	Chunks    []string  `json:"chunks"` // hex SHA-256 per chunk, "" until received
+	CreatedAt time.Time `json:"created_at"`
+}
+
+var uploadSessions = struct {
+	sync.Mutex
+	items map[string]*uploadSession
+}{items: make(map[string]*uploadSession)}
+
+func sessionDir(id string) string {
+	return filepath.Join(PartialDir, filepath.Base(id))
+}
+
+func (s *uploadSession) chunkLen(index int) int64 {
+	return min(s.ChunkSize, s.Size-int64(index)*s.ChunkSize)
+}
+
+// save writes session.json; caller holds s.mu
+func (s *uploadSession) save() error {
+	data, err := json.Marshal(s)
+	if err != nil {
+		return err
+	}
+	tmp := filepath.Join(sessionDir(s.ID), "session.json.tmp")
+	if err := os.WriteFile(tmp, data, 0644); err != nil {
+		return err
+	}
+	return os.Rename(tmp, filepath.Join(sessionDir(s.ID), "session.json"))
+}
+
+// status reports received chunks and the contiguous byte offset to resume
+// from; caller holds s.mu
+func (s *uploadSession) status() UploadSessionResponse {
+	resp := UploadSessionResponse{
+		Success:   true,
+		UploadID:  s.ID,
+		Filename:  s.Filename,
+		Size:      s.Size,
+		ChunkSize: s.ChunkSize,
+		Received:  []int{},
+	}
+	contiguous := true
+	for i, sum := range s.Chunks {
+		if sum == "" {
+			contiguous = false
+			continue
+		}
+		resp.Received = append(resp.Received, i)
+		if contiguous {
+			resp.Offset += s.chunkLen(i)
+		}
+	}
+	return resp
+}
+
+func getUploadSession(id string) (*uploadSession, bool) {
+	uploadSessions.Lock()
+	defer uploadSessions.Unlock()
+	if s, ok := uploadSessions.items[id]; ok {
+		return s, true
+	}
+
+	data, err := os.ReadFile(filepath.Join(sessionDir(id), "session.json"))
+	if err != nil {
+		return nil, false
+	}
+	s := &uploadSession{}
+	if json.Unmarshal(data, s) != nil || s.ID != id {
+		return nil, false
+	}
+	uploadSessions.items[id] = s
+	return s, true
+}
+
+func dropUploadSession(id string) {
+	uploadSessions.Lock()
+	delete(uploadSessions.items, id)
+	uploadSessions.Unlock()
+	os.RemoveAll(sessionDir(id))
+}
+
+func writeSessionError(w http.ResponseWriter, status int, msg string) {
+	w.WriteHeader(status)
+	json.NewEncoder(w).Encode(UploadSessionResponse{Success: false, Error: msg})
+}
+
+// POST /api/upload/session - start a chunked upload
+func createUploadSessionHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	var req UploadSessionRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		writeSessionError(w, http.StatusBadRequest, "Invalid request body: "+err.Error())
+		return
+	}
+
+	name := filepath.Base(req.Filename)
+	ext := strings.ToLower(filepath.Ext(name))
+	if ext != ".xlsx" && ext != ".xls" && ext != ".csv" {
+		writeSessionError(w, http.StatusBadRequest, "Only Excel files (.xlsx, .xls) or CSV are allowed")
+		return
+	}
+	if req.Size <= 0 || req.Size > MaxChunkedFileSize {
+		writeSessionError(w, http.StatusBadRequest, fmt.Sprintf("File size must be between 1 byte and %d MB", MaxChunkedFileSize>>20))
+		return
+	}
+	chunkSize := req.ChunkSize
+	if chunkSize == 0 {
+		chunkSize = DefaultChunkSize
+	}
+	chunkSize = max(MinChunkSize, min(chunkSize, MaxChunkSize))
+
+	// Reserve the preallocated size within PartialBudget; sessions are
+	// created under the lock so concurrent requests cannot overbook it
+	uploadSessions.Lock()
+	defer uploadSessions.Unlock()
+	if used := dirSize(PartialDir); used+req.Size > PartialBudget {
+		writeSessionError(w, http.StatusInsufficientStorage, fmt.Sprintf(
+			"Upload space full (%d of %d MB reserved by unfinished uploads), try again later", used>>20, PartialBudget>>20))
+		return
+	}
+
+	idBytes := make([]byte, 16)
+	rand.Read(idBytes)
+	s := &uploadSession{
+		ID:        hex.EncodeToString(idBytes),
+		Filename:  fmt.Sprintf("%d_%s", time.Now().Unix(), name),
+		Size:      req.Size,
+		ChunkSize: chunkSize,
+		Chunks:    make([]string, (req.Size+chunkSize-1)/chunkSize),
+		CreatedAt: time.Now(),
+	}
+
+	// Preallocate the target file so chunks can be written at any offset
+	err := os.MkdirAll(sessionDir(s.ID), 0755)
+	if err == nil {
+		var f *os.File
+		if f, err = os.Create(filepath.Join(sessionDir(s.ID), "data.part")); err == nil {
+			err = f.Truncate(s.Size)
+			f.Close()
+		}
+	}
+	if err == nil {
+		err = s.save()
+	}
+	if err != nil {
+		os.RemoveAll(sessionDir(s.ID))
+		log.Printf("❌ Error creating upload session: %v", err)
+		writeSessionError(w, http.StatusInternalServerError, "Failed to create upload session: "+err.Error())
+		return
+	}
+
+	uploadSessions.items[s.ID] = s
+	retention.touch(sessionDir(s.ID))
+
+	log.Printf("📦 Upload session %s: %s (%.2f MB, %d chunks)", s.ID, s.Filename, float64(s.Size)/(1024*1024), len(s.Chunks))
+	json.NewEncoder(w).Encode(s.status())
+}
+
+// GET /api/upload/{id} - received chunks and resume offset
+func getUploadSessionHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	s, ok := getUploadSession(mux.Vars(r)["id"])
+	if !ok {
+		writeSessionError(w, http.StatusNotFound, "Upload session not found")
+		return
+	}
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	json.NewEncoder(w).Encode(s.status())
+}
+
+// PUT /api/upload/{id}?offset=N - one chunk as the raw request body.
+// An optional X-Chunk-SHA256 header is checked against the streamed hash.
+func uploadChunkHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	s, ok := getUploadSession(mux.Vars(r)["id"])
+	if !ok {
+		writeSessionError(w, http.StatusNotFound, "Upload session not found")
+		return
+	}
+
+	offset, err := strconv.ParseInt(r.URL.Query().Get("offset"), 10, 64)
+	if err != nil || offset < 0 || offset >= s.Size || offset%s.ChunkSize != 0 {
+		writeSessionError(w, http.StatusBadRequest, "offset must be a multiple of chunk_size within the file")
+		return
+	}
+	index := int(offset / s.ChunkSize)
+	expected := s.chunkLen(index)
+
+	release := retention.pin(sessionDir(s.ID))
+	defer release()
+	f, err := os.OpenFile(filepath.Join(sessionDir(s.ID), "data.part"), os.O_WRONLY, 0644)
+	if err != nil {
+		writeSessionError(w, http.StatusNotFound, "Upload session data missing")
+		return
+	}
+	defer f.Close()
+
+	buf := copyBuffers.Get().(*[]byte)
+	defer copyBuffers.Put(buf)
+
+	h := sha256.New()
+	body := http.MaxBytesReader(w, r.Body, expected)
+	n, err := io.CopyBuffer(io.MultiWriter(io.NewOffsetWriter(f, offset), h), body, *buf)
+	if err != nil || n != expected {
+		writeSessionError(w, http.StatusBadRequest, fmt.Sprintf("chunk %d: got %d of %d bytes", index, n, expected))
+		return
+	}
+	sum := hex.EncodeToString(h.Sum(nil))
+	if want := r.Header.Get("X-Chunk-SHA256"); want != "" && !strings.EqualFold(want, sum) {
+		writeSessionError(w, http.StatusBadRequest, fmt.Sprintf("chunk %d: checksum mismatch", index))
+		return
+	}
+
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	s.Chunks[index] = sum
+	if err := s.save(); err != nil {
+		writeSessionError(w, http.StatusInternalServerError, "Failed to record chunk: "+err.Error())
+		return
+	}
+	retention.touch(sessionDir(s.ID))
+	json.NewEncoder(w).Encode(s.status())
+}
+
+// POST /api/upload/{id}/complete - move the assembled file into UploadDir
+// and sniff it, like a regular upload
+func completeUploadHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	s, ok := getUploadSession(mux.Vars(r)["id"])
+	if !ok {
+		writeSessionError(w, http.StatusNotFound, "Upload session not found")
+		return
+	}
+	release := retention.pin(sessionDir(s.ID))
+	defer release()
+
+	s.mu.Lock()
+	status := s.status()
+	if len(status.Received) != len(s.Chunks) {
+		s.mu.Unlock()
+		w.WriteHeader(http.StatusConflict)
+		status.Success = false
+		status.Error = fmt.Sprintf("%d of %d chunks missing", len(s.Chunks)-len(status.Received), len(s.Chunks))
+		json.NewEncoder(w).Encode(status)
+		return
+	}
+
+	// Content hash: SHA-256 over the per-chunk SHA-256 digests (chunk size
+	// is fixed per session, so it is stable for the same file)
+	h := sha256.New()
+	for _, sum := range s.Chunks {
+		digest, _ := hex.DecodeString(sum)
+		h.Write(digest)
+	}
+	filePath := filepath.Join(UploadDir, s.Filename)
+	err := os.Rename(filepath.Join(sessionDir(s.ID), "data.part"), filePath)
+	s.mu.Unlock()
+	if err != nil {
+		log.Printf("❌ Error finishing upload %s: %v", s.ID, err)
+		writeSessionError(w, http.StatusInternalServerError, "Failed to save file: "+err.Error())
+		return
+	}
+	dropUploadSession(s.ID)
+
+	log.Printf("✅ File uploaded (chunked): %s (size: %.2f MB)", s.Filename, float64(s.Size)/(1024*1024))
+	retention.touch(filePath)
+	retention.kick()
+
+	response := ProcessResponse{
+		Success:     true,
+		Message:     "File uploaded successfully",
+		OutputFile:  s.Filename,
+		ContentHash: hex.EncodeToString(h.Sum(nil)),
+	}
+	if meta, err := sniffUpload(s.Filename); err != nil {
+		log.Printf("⚠️  Could not sniff %s: %v", s.Filename, err)
+	} else {
+		response.Meta = &meta
+	}
+
+	json.NewEncoder(w).Encode(response)
+}
@@ -0,0 +1,170 @@
+package main
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"fmt"
+	"log"
+	"net/http"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"sort"
+	"strings"
+	"time"
+
+	"github.com/gorilla/mux"
+)
+
+// Filtered re-reporting: processor.py --arrow-dir also writes indeks.arrow
+// (rows sorted by DateTrade plus product/member codes) and indeks.json
+// (code labels, date range). A filter slices that index instead of
+// re-reading the uploads, so it only needs the artifacts of a finished job.
+type FilterRequest struct {
+	SummaryKey string   `json:"summary_key"`
+	DateFrom   string   `json:"date_from,omitempty"` // YYYY-MM-DD, inclusive
+	DateTo     string   `json:"date_to,omitempty"`   // YYYY-MM-DD, inclusive
+	Products   []string `json:"products,omitempty"`
+	Members    []string `json:"members,omitempty"`
+}
+
+// filterKey identifies a filter on one job's artifacts (order of the
+// product/member lists does not matter)
+func filterKey(req FilterRequest) string {
+	products := append([]string(nil), req.Products...)
+	members := append([]string(nil), req.Members...)
+	sort.Strings(products)
+	sort.Strings(members)
+
+	h := sha256.New()
+	fmt.Fprintf(h, "%s\n%s\n%s\n%s\n%s\n", req.SummaryKey, req.DateFrom, req.DateTo,
+		strings.Join(products, "\x00"), strings.Join(members, "\x00"))
+	return hex.EncodeToString(h.Sum(nil))[:32]
+}
+
+func filterPath(key string) string {
+	return filepath.Join(CacheDir, key+".filter.json")
+}
+
+func validateFilter(req FilterRequest) error {
+	if req.SummaryKey == "" || filepath.Base(req.SummaryKey) != req.SummaryKey {
+		return fmt.Errorf("summary_key is required")
+	}
+	for _, d := range []string{req.DateFrom, req.DateTo} {
+		if d == "" {
+			continue
+		}
+		if _, err := time.Parse("2006-01-02", d); err != nil {
+			return fmt.Errorf("dates must be YYYY-MM-DD, got %q", d)
+		}
+	}
+	if req.DateFrom != "" && req.DateTo != "" && req.DateFrom > req.DateTo {
+		return fmt.Errorf("date_from is after date_to")
+	}
+	return nil
+}
+
+// POST /api/filter - summary of a finished job limited to a date range,
+// products and/or members, sliced from its Arrow index and cached
+func filterHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	var req FilterRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "Invalid request body: " + err.Error(),
+		})
+		return
+	}
+	if err := validateFilter(req); err != nil {
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   err.Error(),
+		})
+		return
+	}
+
+	dir := artifactDir(req.SummaryKey)
+	if _, err := os.Stat(filepath.Join(dir, "indeks.json")); err != nil || !retention.lookup(dir) {
+		w.WriteHeader(http.StatusNotFound)
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "Filter index not found; run /api/summary or /api/process for this job first",
+		})
+		return
+	}
+
+	key := filterKey(req)
+	if data, err := os.ReadFile(filterPath(key)); err == nil {
+		retention.touch(filterPath(key))
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success:    true,
+			Cached:     true,
+			SummaryKey: req.SummaryKey,
+			Summary:    data,
+		})
+		return
+	}
+
+	release := retention.pin(dir, filterPath(key))
+	defer release()
+	args := []string{"python/processor.py", "--filter-index", dir, "--filter-json", filterPath(key)}
+	if req.DateFrom != "" {
+		args = append(args, "--date-from", req.DateFrom)
+	}
+	if req.DateTo != "" {
+		args = append(args, "--date-to", req.DateTo)
+	}
+	for _, p := range req.Products {
+		args = append(args, "--product", p)
+	}
+	for _, m := range req.Members {
+		args = append(args, "--member", m)
+	}
+
+	output, err := exec.Command("python", args...).CombinedOutput()
+	var data []byte
+	if err == nil {
+		data, err = os.ReadFile(filterPath(key))
+	}
+	if err != nil {
+		log.Printf("❌ Filter error: %v", err)
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   fmt.Sprintf("Filter failed: %v", err),
+			Logs:    []string{string(output)},
+		})
+		return
+	}
+
+	log.Printf("🔎 Filter ready: %s (%s)", req.SummaryKey, key)
+	json.NewEncoder(w).Encode(SummaryResponse{
+		Success:    true,
+		Cached:     false,
+		SummaryKey: req.SummaryKey,
+		Summary:    data,
+	})
+}
+
+// GET /api/filter/{key} - filter options (products, members, date range)
+func filterOptionsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	dir := artifactDir(mux.Vars(r)["key"])
+	data, err := os.ReadFile(filepath.Join(dir, "indeks.json"))
+	if err != nil || !retention.lookup(dir) {
+		w.WriteHeader(http.StatusNotFound)
+		json.NewEncoder(w).Encode(map[string]interface{}{
+			"success": false,
+			"error":   "Filter index not found",
+		})
+		return
+	}
+
+	json.NewEncoder(w).Encode(map[string]interface{}{
+		"success": true,
+		"options": json.RawMessage(data),
+	})
+}
@@ -3,12 +3,13 @@ package main
 import (
 	"encoding/json"
 	"fmt"
-	"io"
 	"log"
+	"mime/multipart"
 	"net/http"
 	"os"
 	"os/exec"
 	"path/filepath"
+	"strings"
 	"time"
 
 	"github.com/gorilla/mux"
@@ -18,6 +19,7 @@ import (
 type Config struct {
 	RateSpot   float64 `json:"rate_spot"`
 	RateRemote float64 `json:"rate_remote"`
+	SplitBy    string  `json:"split_by,omitempty"` // "", "year" or "product" (zip of workbooks)
 }
 
 type ProcessRequest struct {
@@ -27,11 +29,14 @@ type ProcessRequest struct {
 }
 
 type ProcessResponse struct {
-	Success    bool     `json:"success"`
-	Message    string   `json:"message"`
-	OutputFile string   `json:"output_file,omitempty"`
-	Error      string   `json:"error,omitempty"`
-	Logs       []string `json:"logs,omitempty"`
+	Success     bool      `json:"success"`
+	Message     string    `json:"message"`
+	OutputFile  string    `json:"output_file,omitempty"`
+	SummaryKey  string    `json:"summary_key,omitempty"`
+	Meta        *FileMeta `json:"meta,omitempty"`
+	ContentHash string    `json:"content_hash,omitempty"` // chunked uploads: SHA-256 over chunk digests
+	Error       string    `json:"error,omitempty"`
+	Logs        []string  `json:"logs,omitempty"`
 }
 
 const (
@@ -44,22 +49,43 @@ func main() {
 	// Setup directories
 	os.MkdirAll(UploadDir, 0755)
 	os.MkdirAll(OutputDir, 0755)
-
-	// Auto cleanup old files on startup
-	log.Printf("🧹 Cleaning up old files...")
-	cleanupOldFiles(UploadDir, 1*time.Hour)   // Delete files > 1 hour old in uploads
-	cleanupOldFiles(OutputDir, 24*time.Hour)  // Delete files > 24 hours old in outputs
+	os.MkdirAll(CacheDir, 0755)
+	os.MkdirAll(ArtifactDir, 0755)
+	os.MkdirAll(MetaDir, 0755)
+	os.MkdirAll(PartialDir, 0755)
+
+	// Background retention: byte budgets + idle limits, LRU eviction
+	retention.manage(retentionDir{path: UploadDir, budget: UploadBudget, maxIdle: UploadMaxIdle, onEvict: uploadMeta.remove})
+	retention.manage(retentionDir{path: OutputDir, budget: OutputBudget, maxIdle: OutputMaxIdle})
+	retention.manage(retentionDir{path: CacheDir, budget: CacheBudget, maxIdle: CacheMaxIdle, onEvict: summaries.forget})
+	retention.manage(retentionDir{path: ArtifactDir, budget: ArtifactBudget, maxIdle: CacheMaxIdle, onEvict: summaries.forget})
+	retention.manage(retentionDir{path: PartialDir, budget: PartialBudget, maxIdle: PartialMaxIdle, onEvict: dropUploadSession})
+	log.Printf("🧹 Starting retention manager...")
+	go retention.run()
 
 	router := mux.NewRouter()
 
 	// API endpoints
 	router.HandleFunc("/api/health", healthCheck).Methods("GET")
 	router.HandleFunc("/api/upload", uploadFile).Methods("POST")
+	router.HandleFunc("/api/upload/batch", uploadBatchHandler).Methods("POST")
+	router.HandleFunc("/api/upload/session", createUploadSessionHandler).Methods("POST")
+	router.HandleFunc("/api/upload/{id}", getUploadSessionHandler).Methods("GET")
+	router.HandleFunc("/api/upload/{id}", uploadChunkHandler).Methods("PUT")
+	router.HandleFunc("/api/upload/{id}/complete", completeUploadHandler).Methods("POST")
 	router.HandleFunc("/api/process", processData).Methods("POST")
+	router.HandleFunc("/api/preview", previewHandler).Methods("POST")
+	router.HandleFunc("/api/summary", summaryHandler).Methods("POST")
+	router.HandleFunc("/api/summary/{key}", getSummaryHandler).Methods("GET")
+	router.HandleFunc("/api/filter", filterHandler).Methods("POST")
+	router.HandleFunc("/api/filter/{key}", filterOptionsHandler).Methods("GET")
+	router.HandleFunc("/api/artifacts/{key}", getArtifactsHandler).Methods("GET")
+	router.HandleFunc("/api/artifacts/{key}/{table}", downloadArtifactHandler).Methods("GET")
 	router.HandleFunc("/api/download/{filename}", downloadFile).Methods("GET")
 	router.HandleFunc("/api/files", listUploadedFiles).Methods("GET")
 	router.HandleFunc("/api/outputs", listOutputFiles).Methods("GET")
 	router.HandleFunc("/api/cleanup", cleanupFilesHandler).Methods("DELETE")
+	router.HandleFunc("/api/retention", retentionStatsHandler).Methods("GET")
 
 	// Serve static files (frontend) - HARUS PALING AKHIR
 	router.PathPrefix("/").Handler(http.FileServer(http.Dir("./static")))
@@ -67,8 +93,8 @@ func main() {
 	// CORS configuration
 	c := cors.New(cors.Options{
 		AllowedOrigins: []string{"*"},
-		AllowedMethods: []string{"GET", "POST", "DELETE", "OPTIONS"},
-		AllowedHeaders: []string{"Content-Type", "Authorization"},
+		AllowedMethods: []string{"GET", "POST", "PUT", "DELETE", "OPTIONS"},
+		AllowedHeaders: []string{"Content-Type", "Authorization", "X-Chunk-SHA256"},
 	})
 
 	handler := c.Handler(router)
@@ -97,9 +123,14 @@ func healthCheck(w http.ResponseWriter, r *http.Request) {
 func uploadFile(w http.ResponseWriter, r *http.Request) {
 	w.Header().Set("Content-Type", "application/json")
 
-	// Parse multipart form
-	r.ParseMultipartForm(MaxFileSize)
-	file, handler, err := r.FormFile("file")
+	// Stream the "file" part straight to disk (no ParseMultipartForm buffering)
+	reader, err := r.MultipartReader()
+	var part *multipart.Part
+	for err == nil {
+		if part, err = reader.NextPart(); err == nil && part.FormName() == "file" {
+			break
+		}
+	}
 	if err != nil {
 		log.Printf("❌ Error reading uploaded file: %v", err)
 		json.NewEncoder(w).Encode(ProcessResponse{
@@ -108,52 +139,33 @@ func uploadFile(w http.ResponseWriter, r *http.Request) {
 		})
 		return
 	}
-	defer file.Close()
 
-	// Validate file extension
-	ext := filepath.Ext(handler.Filename)
-	if ext != ".xlsx" && ext != ".xls" && ext != ".csv" {
-		log.Printf("❌ Invalid file extension: %s", ext)
-		json.NewEncoder(w).Encode(ProcessResponse{
-			Success: false,
-			Error:   "Only Excel files (.xlsx, .xls) or CSV are allowed",
-		})
-		return
-	}
-
-	// Generate unique filename
-	timestamp := time.Now().Unix()
-	filename := fmt.Sprintf("%d_%s", timestamp, handler.Filename)
-	filePath := filepath.Join(UploadDir, filename)
-
-	// Save file
-	dst, err := os.Create(filePath)
+	filename, size, err := saveUploadPart(part)
 	if err != nil {
-		log.Printf("❌ Error creating file: %v", err)
+		log.Printf("❌ Error saving upload %s: %v", part.FileName(), err)
 		json.NewEncoder(w).Encode(ProcessResponse{
 			Success: false,
-			Error:   "Failed to save file: " + err.Error(),
+			Error:   err.Error(),
 		})
 		return
 	}
-	defer dst.Close()
 
-	if _, err := io.Copy(dst, file); err != nil {
-		log.Printf("❌ Error writing file: %v", err)
-		json.NewEncoder(w).Encode(ProcessResponse{
-			Success: false,
-			Error:   "Failed to write file: " + err.Error(),
-		})
-		return
-	}
-
-	log.Printf("✅ File uploaded: %s (size: %.2f MB)", filename, float64(handler.Size)/(1024*1024))
+	log.Printf("✅ File uploaded: %s (size: %.2f MB)", filename, float64(size)/(1024*1024))
+	retention.kick()
 
-	json.NewEncoder(w).Encode(ProcessResponse{
+	// Pre-validate layout from the header rows so /api/process can reject bad jobs early
+	response := ProcessResponse{
 		Success:    true,
 		Message:    "File uploaded successfully",
 		OutputFile: filename,
-	})
+	}
+	if meta, err := sniffUpload(filename); err != nil {
+		log.Printf("⚠️  Could not sniff %s: %v", filename, err)
+	} else {
+		response.Meta = &meta
+	}
+
+	json.NewEncoder(w).Encode(response)
 }
 
 func processData(w http.ResponseWriter, r *http.Request) {
@@ -192,20 +204,42 @@ func processData(w http.ResponseWriter, r *http.Request) {
 		return
 	}
 
+	if problems := validateJob(req); len(problems) > 0 {
+		log.Printf("❌ Job rejected: %v", problems)
+		json.NewEncoder(w).Encode(ProcessResponse{
+			Success: false,
+			Error:   "Invalid input files: " + strings.Join(problems, "; "),
+		})
+		return
+	}
+
+	if req.Config.SplitBy != "" && req.Config.SplitBy != "year" && req.Config.SplitBy != "product" {
+		json.NewEncoder(w).Encode(ProcessResponse{
+			Success: false,
+			Error:   "split_by must be \"year\" or \"product\"",
+		})
+		return
+	}
+
 	// Prepare Python script arguments
 	outputFilename := fmt.Sprintf("dashboard_%d.xlsx", time.Now().Unix())
+	if req.Config.SplitBy != "" {
+		outputFilename = fmt.Sprintf("dashboard_%d_per_%s.zip", time.Now().Unix(), req.Config.SplitBy)
+	}
 	outputPath := filepath.Join(OutputDir, outputFilename)
 
-	args := []string{
-		"python/processor.py",
-		"--jisdor", filepath.Join(UploadDir, req.JisdorFile),
+	// Summary JSON and Arrow artifacts are written alongside the Excel so
+	// /api/summary and /api/artifacts are served without Python
+	key := summaryKey(req)
+	release := retention.pin(jobPaths(req, key, outputPath)...)
+	defer release()
+	args := append(processorArgs(req),
 		"--output", outputPath,
-		"--rate-spot", fmt.Sprintf("%.0f", req.Config.RateSpot),
-		"--rate-remote", fmt.Sprintf("%.0f", req.Config.RateRemote),
-	}
-
-	for _, file := range req.TradeHistoryFiles {
-		args = append(args, "--trade-file", filepath.Join(UploadDir, file))
+		"--summary-json", summaryPath(key),
+		"--arrow-dir", artifactDir(key),
+	)
+	if req.Config.SplitBy != "" {
+		args = append(args, "--split-by", req.Config.SplitBy)
 	}
 
 	log.Printf("⚙️  Executing Python processor with arguments:")
@@ -231,30 +265,55 @@ func processData(w http.ResponseWriter, r *http.Request) {
 	}
 
 	log.Printf("✅ Processing completed successfully")
+	retention.touch(outputPath)
+	retention.kick()
+	if data, err := os.ReadFile(summaryPath(key)); err == nil {
+		summaries.put(key, data)
+	}
 
 	json.NewEncoder(w).Encode(ProcessResponse{
 		Success:    true,
 		Message:    "Data processed successfully",
 		OutputFile: outputFilename,
+		SummaryKey: key,
 		Logs:       []string{outputStr},
 	})
 }
 
+// processorArgs builds the common processor.py arguments for a job
+func processorArgs(req ProcessRequest) []string {
+	args := []string{
+		"python/processor.py",
+		"--jisdor", filepath.Join(UploadDir, req.JisdorFile),
+		"--rate-spot", fmt.Sprintf("%.0f", req.Config.RateSpot),
+		"--rate-remote", fmt.Sprintf("%.0f", req.Config.RateRemote),
+	}
+
+	for _, file := range req.TradeHistoryFiles {
+		args = append(args, "--trade-file", filepath.Join(UploadDir, file))
+	}
+	return args
+}
+
 func downloadFile(w http.ResponseWriter, r *http.Request) {
 	vars := mux.Vars(r)
 	filename := vars["filename"]
 
 	filePath := filepath.Join(OutputDir, filename)
 
-	// Check if file exists
-	if _, err := os.Stat(filePath); os.IsNotExist(err) {
+	// Check if file exists (counts a retention hit/miss)
+	if !retention.lookup(filePath) {
 		log.Printf("❌ File not found: %s", filename)
 		http.Error(w, "File not found", http.StatusNotFound)
 		return
 	}
 
 	w.Header().Set("Content-Disposition", fmt.Sprintf("attachment; filename=%s", filename))
-	w.Header().Set("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+	if filepath.Ext(filename) == ".zip" {
+		w.Header().Set("Content-Type", "application/zip")
+	} else {
+		w.Header().Set("Content-Type", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+	}
 
 	log.Printf("📥 Downloading file: %s", filename)
 	http.ServeFile(w, r, filePath)
@@ -277,11 +336,16 @@ func listUploadedFiles(w http.ResponseWriter, r *http.Request) {
 	for _, file := range files {
 		if !file.IsDir() {
 			info, _ := file.Info()
-			fileList = append(fileList, map[string]interface{}{
-				"name":         file.Name(),
-				"size":         info.Size(),
-				"uploaded_at":  info.ModTime().Format(time.RFC3339),
-			})
+			entry := map[string]interface{}{
+				"name":        file.Name(),
+				"size":        info.Size(),
+				"uploaded_at": info.ModTime().Format(time.RFC3339),
+			}
+			if meta, ok := uploadMeta.get(file.Name()); ok {
+				entry["kind"] = meta.Kind
+				entry["estimated_rows"] = meta.EstimatedRows
+			}
+			fileList = append(fileList, entry)
 		}
 	}
 
@@ -324,76 +388,19 @@ func listOutputFiles(w http.ResponseWriter, r *http.Request) {
 	})
 }
 
-// NEW: Cleanup handler for DELETE API
+// NEW: Cleanup handler for DELETE API - evicts uploads and outputs except
+// files pinned by running jobs or accessed in the last RetentionGrace
+// (e.g. an output someone is about to download)
 func cleanupFilesHandler(w http.ResponseWriter, r *http.Request) {
 	w.Header().Set("Content-Type", "application/json")
 
-	var deletedCount int
-
-	// Cleanup uploads folder
-	uploadFiles, err := os.ReadDir(UploadDir)
-	if err == nil {
-		for _, file := range uploadFiles {
-			if !file.IsDir() {
-				filePath := filepath.Join(UploadDir, file.Name())
-				if err := os.Remove(filePath); err == nil {
-					deletedCount++
-					log.Printf("🗑️  Deleted upload: %s", file.Name())
-				}
-			}
-		}
-	}
-
-	// Cleanup outputs folder
-	outputFiles, err := os.ReadDir(OutputDir)
-	if err == nil {
-		for _, file := range outputFiles {
-			if !file.IsDir() {
-				filePath := filepath.Join(OutputDir, file.Name())
-				if err := os.Remove(filePath); err == nil {
-					deletedCount++
-					log.Printf("🗑️  Deleted output: %s", file.Name())
-				}
-			}
-		}
-	}
+	deletedCount, keptCount := retention.purge(UploadDir, OutputDir)
 
-	log.Printf("✅ Cleanup completed: %d files deleted", deletedCount)
+	log.Printf("✅ Cleanup completed: %d files deleted, %d kept", deletedCount, keptCount)
 	json.NewEncoder(w).Encode(map[string]interface{}{
 		"success": true,
 		"message": "Cleanup completed",
 		"deleted": deletedCount,
+		"kept":    keptCount,
 	})
 }
-
-// NEW: Helper function to cleanup old files
-func cleanupOldFiles(dirPath string, maxAge time.Duration) {
-	files, err := os.ReadDir(dirPath)
-	if err != nil {
-		log.Printf("Error reading directory: %v", err)
-		return
-	}
-
-	now := time.Now()
-	deletedCount := 0
-
-	for _, file := range files {
-		if !file.IsDir() {
-			info, _ := file.Info()
-			fileAge := now.Sub(info.ModTime())
-
-			if fileAge > maxAge {
-				filePath := filepath.Join(dirPath, file.Name())
-				err := os.Remove(filePath)
-				if err == nil {
-					deletedCount++
-					log.Printf("   🗑️  Cleaned up: %s (age: %v)", file.Name(), fileAge)
-				}
-			}
-		}
-	}
-
-	if deletedCount > 0 {
-		log.Printf("✅ Auto-cleanup completed in %s: %d files deleted", dirPath, deletedCount)
-	}
-}
@@ -0,0 +1,101 @@
+package main
+
+import (
+	"encoding/json"
+	"fmt"
+	"log"
+	"net/http"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strings"
+)
+
+// PreviewRows is the number of data rows per trade file that
+// processor.py --preview-json reads and enriches.
+const PreviewRows = 1000
+
+type PreviewResponse struct {
+	Success    bool            `json:"success"`
+	Cached     bool            `json:"cached"`
+	SummaryKey string          `json:"summary_key,omitempty"`
+	Preview    json.RawMessage `json:"preview,omitempty"`
+	Error      string          `json:"error,omitempty"`
+	Logs       []string        `json:"logs,omitempty"`
+}
+
+func previewPath(key string) string {
+	return filepath.Join(CacheDir, key+".preview.json")
+}
+
+// POST /api/preview - sample rows and extrapolated monthly totals from the
+// first rows of each upload, before running the full job
+func previewHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	var req ProcessRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		json.NewEncoder(w).Encode(PreviewResponse{
+			Success: false,
+			Error:   "Invalid request body: " + err.Error(),
+		})
+		return
+	}
+
+	if req.JisdorFile == "" || len(req.TradeHistoryFiles) == 0 {
+		json.NewEncoder(w).Encode(PreviewResponse{
+			Success: false,
+			Error:   "JISDOR file and at least one trade history file are required",
+		})
+		return
+	}
+
+	if problems := validateJob(req); len(problems) > 0 {
+		json.NewEncoder(w).Encode(PreviewResponse{
+			Success: false,
+			Error:   "Invalid input files: " + strings.Join(problems, "; "),
+		})
+		return
+	}
+
+	key := summaryKey(req)
+	if data, err := os.ReadFile(previewPath(key)); err == nil {
+		retention.touch(previewPath(key))
+		json.NewEncoder(w).Encode(PreviewResponse{
+			Success:    true,
+			Cached:     true,
+			SummaryKey: key,
+			Preview:    data,
+		})
+		return
+	}
+
+	release := retention.pin(append(uploadPaths(req), previewPath(key))...)
+	defer release()
+	args := append(processorArgs(req),
+		"--preview-json", previewPath(key),
+		"--preview-rows", fmt.Sprintf("%d", PreviewRows),
+	)
+	output, err := exec.Command("python", args...).CombinedOutput()
+	var data []byte
+	if err == nil {
+		data, err = os.ReadFile(previewPath(key))
+	}
+	if err != nil {
+		log.Printf("❌ Preview error: %v", err)
+		json.NewEncoder(w).Encode(PreviewResponse{
+			Success: false,
+			Error:   fmt.Sprintf("Preview failed: %v", err),
+			Logs:    []string{string(output)},
+		})
+		return
+	}
+
+	log.Printf("👀 Preview ready: %s", key)
+	json.NewEncoder(w).Encode(PreviewResponse{
+		Success:    true,
+		Cached:     false,
+		SummaryKey: key,
+		Preview:    data,
+	})
+}
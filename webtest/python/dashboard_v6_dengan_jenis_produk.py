@@ -1,9 +1,18 @@
 import pandas as pd
 import numpy as np
+import argparse
 import glob
+import hashlib
+import json
 import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from openpyxl.utils import get_column_letter
+from functools import partial
 
 # === KONSTANTA === #
 MONTH_MAP = {
@@ -19,6 +28,36 @@ MONTH_NAME_ID = {
 }
 
 CONTRACT_SIZE_PER_LOT = 25000  # kg
+MATA_UANG_DASAR = 'IDR'   # Notional_Value tanpa kolom Currency dianggap Rupiah
+MATA_UANG_JISDOR = 'USD'  # seri kurs JISDOR (Rupiah per 1 USD)
+# Penulisan lain di kolom Currency (setelah huruf besar, tanpa spasi & titik)
+ALIAS_MATA_UANG = {
+    'RP': MATA_UANG_DASAR, 'RUPIAH': MATA_UANG_DASAR, 'INDONESIANRUPIAH': MATA_UANG_DASAR,
+    'US$': MATA_UANG_JISDOR, 'USDOLLAR': MATA_UANG_JISDOR,
+}
+KOLOM_LOT = 'Trade Vol'
+
+# Rolling window rekap harian (dalam hari bursa)
+ROLLING_WINDOWS = (5, 20)
+METRIK_HARIAN = {
+    KOLOM_LOT: 'Volume_Lot',
+    'Notional_Value': 'Nilai_Transaksi_RP',
+    'Notional_Value_USD': 'Nilai_Transaksi_USD',
+    'Margin': 'Margin',
+}
+
+# Jumlah baris pada sheet breakdown member & akun
+TOP_N_MEMBER = 10
+TOP_N_AKUN = 50
+
+# Kunci deduplikasi lintas file
+KOLOM_KUNCI_DEDUP = ('Trade ID', 'Acc', 'Buy Sell')  # satu baris per sisi trade
+LAPORAN_DEDUP = ['Sumber', 'Baris', 'Duplikat_Batch', 'Duplikat_Histori', 'Baris_Dipakai']
+BLOK_INDEKS_DEDUP = 1 << 22  # entri per blok saat menulis ulang indeks
+
+# Daemon pantau folder (detik)
+INTERVAL_PANTAU = 1.0
+DEBOUNCE_PANTAU = 3.0
 
 # === FUNGSI TAMBAHAN: Ekstrak Jenis Produk dari Contract === #
 def ekstrak_jenis_produk(contract_name):
@@ -78,10 +117,80 @@ def hitung_margin(row, rate_spot, rate_remote):
     except Exception:
         return lot * rate_remote * 1
 
+def periode_kontrak(contract):
+    """
+    Versi vektor dari parsing suffix contract di hitung_margin.
+    'CPOID-JAN25' → kode bulan kontrak (tahun * 12 + bulan - 1), NaN jika
+    suffix tidak bisa diparsing. Parsing dilakukan per contract unik.
+    """
+    kode, unik = pd.factorize(pd.Series(contract).astype(str))
+    suffix = pd.Series(unik).str.split('-').str[-1]
+    bulan = suffix.str[:3].str.upper().map(MONTH_MAP)
+    angka_tahun = suffix.str[3:].str.strip()
+    tahun = pd.to_numeric(angka_tahun.where(angka_tahun.str.fullmatch(r'[+-]?\d+')), errors='coerce') + 2000
+    periode_unik = (tahun * 12 + bulan - 1).to_numpy(dtype=float)
+    return periode_unik[kode]
+
+def bulan_ke_tanggal(kode_bulan):
+    """
+    Kode bulan (tahun * 12 + bulan - 1) → datetime tanggal 1 bulan tsb.
+    NaN atau tahun di luar rentang Timestamp pandas → NaT.
+    """
+    kode = np.asarray(kode_bulan, dtype=float)
+    valid = (kode >= 1678 * 12) & (kode <= 2261 * 12 + 11)
+    hasil = np.full(len(kode), np.datetime64('NaT'), dtype='datetime64[ns]')
+    hasil[valid] = (kode[valid].astype(np.int64) - 1970 * 12).astype('datetime64[M]')
+    return hasil
+
+def _per_nilai_unik(series, fungsi):
+    """Terapkan fungsi skalar sekali per nilai unik lalu sebar ke semua baris."""
+    kode, unik = pd.factorize(series)
+    hasil = np.array([fungsi(v) for v in unik] + [fungsi(np.nan)], dtype=object)
+    return hasil[kode]
+
+def _dalam_periode_spot(date_trade, periode):
+    """
+    Versi vektor dari cek start_spot <= DateTrade <= end_spot di hitung_margin:
+    tanggal 16 bulan sebelum kontrak 00:00 s.d. tanggal 15 bulan kontrak 00:00.
+    Dibandingkan dalam kode bulan + hari agar tahun ekstrem tidak overflow.
+    """
+    bulan_trade = (date_trade.dt.year * 12 + date_trade.dt.month - 1).to_numpy(dtype=float)
+    hari = date_trade.dt.day.to_numpy(dtype=float)
+    tengah_malam = (date_trade == date_trade.dt.normalize()).to_numpy()
+
+    # datetime() hanya menerima tahun 1..9999 (selain itu hitung_margin jatuh ke except)
+    periode = np.where((periode >= 13) & (periode < 10000 * 12), periode, np.nan)
+
+    setelah_mulai = (bulan_trade > periode - 1) | ((bulan_trade == periode - 1) & (hari >= 16))
+    sebelum_akhir = (bulan_trade < periode) | (
+        (bulan_trade == periode) & ((hari < 15) | ((hari == 15) & tengah_malam))
+    )
+    return setelah_mulai & sebelum_akhir
+
+def hitung_kolom_turunan(df, rate_spot, rate_remote):
+    """
+    Tambahkan Jenis_Produk, Bulan_Kontrak, Contract_Size_KG, Notional_Value
+    dan Margin langsung ke df (in-place, tanpa salinan frame). Hasil sama
+    dengan ekstrak_jenis_produk / hitung_contract_size / hitung_NV /
+    hitung_margin per baris. Bulan_Kontrak = tanggal 1 bulan kontrak dari
+    suffix contract (NaT jika tidak bisa diparsing).
+    """
+    lot = df[KOLOM_LOT].to_numpy()
+    periode = periode_kontrak(df['Contract'])
+    spot = _dalam_periode_spot(df['DateTrade'], periode)
+
+    df['Jenis_Produk'] = _per_nilai_unik(df['Contract'], ekstrak_jenis_produk)
+    df['Bulan_Kontrak'] = bulan_ke_tanggal(periode)
+    df['Contract_Size_KG'] = lot.astype(float) * CONTRACT_SIZE_PER_LOT
+    df['Notional_Value'] = df['Close Vol'].to_numpy(dtype=float) * CONTRACT_SIZE_PER_LOT * df['Price'].to_numpy(dtype=float)
+    df['Margin'] = lot * np.where(spot, rate_spot, rate_remote) * 1
+    return df
+
 def cari_kolom(nama_kolom, df, return_letter=False):
     if nama_kolom in df.columns:
         idx = df.columns.get_loc(nama_kolom)
         if return_letter:
+            from openpyxl.utils import get_column_letter  # openpyxl hanya dimuat saat menulis Excel
             col_letter = get_column_letter(idx + 1)
             return f"{col_letter}:{col_letter}"
         return idx
@@ -104,36 +213,167 @@ def load_jisdor(file_path):
 
     return kurs_df
 
-def padankan_kurs(df_trade, kurs_df):
-    kurs_df = kurs_df.sort_values('Tanggal')
-    df_trade = df_trade.sort_values('DateTrade')
+def load_kurs_multi(file_per_mata_uang):
+    """
+    Muat beberapa file kurs (format sama dengan JISDOR, Kurs = Rupiah per
+    1 unit mata uang) lalu gabungkan ke satu penyimpanan kurs.
+    file_per_mata_uang: {'USD': path_jisdor, 'MYR': path_myr, ...}
+    """
+    return buat_penyimpanan_kurs({
+        mata_uang: load_jisdor(file_path)
+        for mata_uang, file_path in file_per_mata_uang.items()
+    })
 
-    df_merged = pd.merge_asof(
-        df_trade,
-        kurs_df,
-        left_on='DateTrade',
-        right_on='Tanggal',
-        direction='backward'
-    )
+def parse_file_kurs(daftar):
+    """['MYR=kurs_myr.xlsx', ...] → {'MYR': 'kurs_myr.xlsx', ...} (untuk argumen CLI)."""
+    hasil = {}
+    for item in daftar or []:
+        mata_uang, sep, file_path = item.partition('=')
+        if not sep or not mata_uang.strip() or not file_path.strip():
+            raise ValueError(f"Format kurs harus MATA_UANG=FILE, bukan '{item}'")
+        hasil[_normalisasi_mata_uang(mata_uang)] = file_path.strip()
+    return hasil
 
-    df_merged.rename(columns={
-        'Kurs': 'Kurs_Jisdor',
-        'Tanggal': 'Tanggal_Kurs'
-    }, inplace=True)
-    
-    if 'No' in df_merged.columns:
-        df_merged.drop(columns=['No'], inplace=True)
-    
-    df_merged['Notional_Value_USD'] = df_merged['Notional_Value'] / df_merged['Kurs_Jisdor']
+def _normalisasi_mata_uang(nilai):
+    if pd.isna(nilai) or not str(nilai).strip():
+        return MATA_UANG_DASAR
+    kode = re.sub(r'[\s.]', '', str(nilai).upper())
+    return ALIAS_MATA_UANG.get(kode, kode)
+
+def buat_penyimpanan_kurs(kurs):
+    """
+    Satu struktur terindeks untuk semua seri kurs: baris terurut per
+    (mata uang, tanggal) dengan kunci int64 gabungan, sehingga as-of lookup
+    semua mata uang cukup satu searchsorted.
+    kurs: {'USD': kurs_df, ...}, satu kurs_df JISDOR (dianggap USD), atau
+    penyimpanan yang sudah jadi (dikembalikan apa adanya).
+    """
+    if isinstance(kurs, pd.DataFrame):
+        kurs = {MATA_UANG_JISDOR: kurs}
+    if 'kunci' in kurs:
+        return kurs
+
+    mata_uang = pd.Index(sorted(_normalisasi_mata_uang(k) for k in kurs))
+    seri = {_normalisasi_mata_uang(k): df for k, df in kurs.items()}
+    bagian = [seri[k][['Tanggal', 'Kurs']].assign(Kode=i) for i, k in enumerate(mata_uang)]
+    gabung = pd.concat(bagian, ignore_index=True).dropna(subset=['Tanggal'])
+    gabung = gabung.sort_values(['Kode', 'Tanggal'], kind='stable')
+
+    # Kunci = kode * rentang + mikrodetik sejak (tanggal paling awal - 1);
+    # offset 0 dicadangkan untuk transaksi sebelum kurs pertama.
+    waktu = gabung['Tanggal'].to_numpy().astype('datetime64[us]').view('i8')
+    basis = waktu.min() - 1 if len(waktu) else 0
+    rentang = (waktu.max() - basis + 1) if len(waktu) else 1
+    kode = gabung['Kode'].to_numpy(dtype='i8')
+
+    return {
+        'mata_uang': mata_uang,
+        'kode': kode,
+        'tanggal': gabung['Tanggal'].to_numpy(),
+        'kurs': gabung['Kurs'].to_numpy(dtype=float),
+        'kunci': kode * rentang + (waktu - basis),
+        'basis': basis,
+        'rentang': rentang,
+    }
+
+def cari_kurs(penyimpanan, mata_uang, waktu):
+    """
+    As-of lookup (backward) vektor yang dipartisi per mata uang.
+    mata_uang: satu kode atau array per baris; waktu: Series datetime.
+    Return (kurs, tanggal_kurs); NaN/NaT bila mata uang tidak dikenal atau
+    transaksi sebelum kurs pertama. IDR selalu bernilai 1.
+    """
+    n = len(waktu)
+    if np.ndim(mata_uang) == 0:
+        mata_uang = _normalisasi_mata_uang(mata_uang)
+        kode = np.full(n, penyimpanan['mata_uang'].get_indexer([mata_uang])[0], dtype='i8')
+        dasar = np.full(n, mata_uang == MATA_UANG_DASAR)
+    else:
+        kode_unik, unik = pd.factorize(pd.Series(mata_uang), use_na_sentinel=False)
+        unik = pd.Index([_normalisasi_mata_uang(v) for v in unik])
+        kode = penyimpanan['mata_uang'].get_indexer(unik)[kode_unik].astype('i8')
+        dasar = (unik == MATA_UANG_DASAR)[kode_unik]
+
+    t = waktu.to_numpy().astype('datetime64[us]').view('i8')
+    ada_waktu = ~pd.isna(waktu).to_numpy()
+    offset = np.clip(t - penyimpanan['basis'], 0, penyimpanan['rentang'] - 1)
+    kunci = np.maximum(kode, 0) * penyimpanan['rentang'] + offset
+
+    posisi = np.searchsorted(penyimpanan['kunci'], kunci, side='right') - 1
+    posisi_aman = np.maximum(posisi, 0)
+    ketemu = (kode >= 0) & ada_waktu & (posisi >= 0)
+    if len(penyimpanan['kode']):
+        ketemu &= penyimpanan['kode'][posisi_aman] == kode
+    else:
+        ketemu[:] = False
+
+    kurs = np.full(n, np.nan)
+    tanggal = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+    kurs[ketemu] = penyimpanan['kurs'][posisi_aman[ketemu]]
+    tanggal[ketemu] = penyimpanan['tanggal'][posisi_aman[ketemu]]
+    kurs[dasar] = 1.0
+    return kurs, tanggal
+
+def _tambah_kolom_kurs(df_trade, kurs_df):
+    """
+    Setara merge_asof backward DateTrade → Tanggal, tetapi kolom kurs
+    ditambahkan langsung ke df_trade (urutan baris tidak diubah).
+    kurs_df: kurs JISDOR atau penyimpanan multi mata uang. Jika ada kolom
+    Currency, notional dikonversi per mata uang transaksi ke Rupiah dulu.
+    """
+    penyimpanan = buat_penyimpanan_kurs(kurs_df)
+    kurs_usd, tanggal_kurs = cari_kurs(penyimpanan, MATA_UANG_JISDOR, df_trade['DateTrade'])
+    df_trade['Tanggal_Kurs'] = tanggal_kurs
+    df_trade['Kurs_Jisdor'] = kurs_usd
+
+    if 'Currency' not in df_trade.columns:
+        df_trade['Notional_Value_USD'] = df_trade['Notional_Value'] / df_trade['Kurs_Jisdor']
+        return df_trade
+
+    mata_uang = _per_nilai_unik(df_trade['Currency'], _normalisasi_mata_uang)
+    kurs_asal, _ = cari_kurs(penyimpanan, mata_uang, df_trade['DateTrade'])
+    tanpa_seri = ~pd.Index(mata_uang).isin(penyimpanan['mata_uang']) & (mata_uang != MATA_UANG_DASAR)
+    if tanpa_seri.any():
+        jumlah = pd.Series(mata_uang[tanpa_seri]).value_counts()
+        print(f"⚠️ Mata uang tanpa seri kurs ({int(tanpa_seri.sum())} baris, nilai Rupiah & USD kosong): "
+              + ', '.join(f"{kode} {n} baris" for kode, n in jumlah.items()))
+    nilai = df_trade['Notional_Value'].to_numpy(dtype=float)
+    nilai_rp = nilai * kurs_asal
+    mata_uang_usd = mata_uang == MATA_UANG_JISDOR
 
-    return df_merged
+    df_trade['Kurs_Mata_Uang'] = kurs_asal
+    df_trade['Notional_Value_IDR'] = nilai_rp
+    df_trade['Notional_Value_USD'] = np.where(mata_uang_usd, nilai, nilai_rp / kurs_usd)
+    return df_trade
+
+def _urutkan_tanggal(df_trade):
+    """Urutkan per DateTrade (stabil); tanpa salinan jika sudah terurut."""
+    if not df_trade['DateTrade'].is_monotonic_increasing:
+        urutan = np.argsort(df_trade['DateTrade'].to_numpy(), kind='stable')
+        df_trade = df_trade.take(urutan)
+    df_trade.index = pd.RangeIndex(len(df_trade))
+    return df_trade
+
+def padankan_kurs(df_trade, kurs_df):
+    df_trade = _urutkan_tanggal(df_trade)
+    return _tambah_kolom_kurs(df_trade, kurs_df)
 
 # === 3️⃣ Fungsi Proses File === #
-def process_file(file_path, kurs_df, rate_spot=5_000_000, rate_remote=3_500_000):
+def baca_trade(file_path):
+    """
+    Baca satu file trade history (baris 1 judul, baris 2 header asli yang
+    dilewati) lalu ketik kolom dan urutkan per DateTrade.
+    """
     print(f"Membaca file: {os.path.basename(file_path)}")
-    df = pd.read_excel(file_path, header=0)
-    df = df[1:].reset_index(drop=True)
+    df = pd.read_excel(file_path, header=0, skiprows=[1])
+    return siapkan_kolom_trade(df)
 
+def siapkan_kolom_trade(df):
+    """
+    Beri nama & tipe kolom trade history pada df mentah (kolom posisional,
+    baris data saja) lalu urutkan per DateTrade. Dipakai baca_trade dan
+    pembaca sampel (mis. preview di processor.py).
+    """
     df.columns = [
         'DateTrade', 'Trade ID', 'Contract', 'Acc', 'Buy Sell',
         'Trade Vol', 'Price', 'Close Vol', 'Close Settle', 'Fee Trade',
@@ -144,55 +384,276 @@ def process_file(file_path, kurs_df, rate_spot=5_000_000, rate_remote=3_500_000)
     df['Price'] = pd.to_numeric(df['Price'], errors='coerce')
     df['Close Vol'] = pd.to_numeric(df['Close Vol'], errors='coerce')
     df['Trade Vol'] = pd.to_numeric(df['Trade Vol'], errors='coerce')
-    
-    # ✨ TAMBAHAN: Ekstrak Jenis_Produk dari Contract
-    df['Jenis_Produk'] = df['Contract'].apply(ekstrak_jenis_produk)
-    
-    df['Contract_Size_KG'] = df.apply(hitung_contract_size, axis=1)
-    df['Notional_Value'] = df.apply(hitung_NV, axis=1)
-    df['Margin'] = df.apply(
-        hitung_margin,
-        axis=1,
-        rate_spot=rate_spot,
-        rate_remote=rate_remote
-    )
 
-    df = padankan_kurs(df, kurs_df)
+    return _urutkan_tanggal(df)
 
-    if not df.empty:
-        sample_date = df['DateTrade'].iloc[0]
-        sheet_name = f"{MONTH_REV[sample_date.month]}{str(sample_date.year)[-2:]}"
-    else:
-        sheet_name = None
+def lengkapi_trade(df, kurs_df, rate_spot=5_000_000, rate_remote=3_500_000):
+    """
+    Tambahkan semua kolom turunan + kurs JISDOR ke df hasil baca_trade
+    (in-place). df boleh berupa gabungan beberapa file yang masing-masing
+    sudah terurut; urutan baris dipertahankan.
+    """
+    hitung_kolom_turunan(df, rate_spot, rate_remote)
+    return _tambah_kolom_kurs(df, kurs_df)
+
+def _nama_sheet(df):
+    if df.empty:
+        return None
+    sample_date = df['DateTrade'].iloc[0]
+    return f"{MONTH_REV[sample_date.month]}{str(sample_date.year)[-2:]}"
+
+def process_file(file_path, kurs_df, rate_spot=5_000_000, rate_remote=3_500_000):
+    df = lengkapi_trade(baca_trade(file_path), kurs_df, rate_spot, rate_remote)
+    return df, _nama_sheet(df)
+
+def gabung_trade(frames, kurs_df, rate_spot=5_000_000, rate_remote=3_500_000):
+    """
+    Gabungkan frame hasil baca_trade menjadi dashboard_df. Frame besar hanya
+    dimaterialisasi sekali (satu concat), kolom turunan dihitung sekali, dan
+    sheet bulanan dipartisi per (tahun, bulan) lewat partisi_bulanan.
+    kurs_df None: frame sudah melewati lengkapi_trade (cache daemon), hanya
+    digabung.
+    """
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame(), {}
+
+    dashboard_df = pd.concat(frames, ignore_index=True)
+    frames.clear()
+    if kurs_df is not None:
+        lengkapi_trade(dashboard_df, kurs_df, rate_spot, rate_remote)
+    return dashboard_df, partisi_bulanan(dashboard_df)
+
+def partisi_bulanan(dashboard_df):
+    """
+    Partisi dashboard_df per (tahun, bulan) DateTrade dengan satu argsort
+    stabil: {nama_sheet: fungsi tanpa argumen → DataFrame bulan itu}, urut
+    kronologis. Baris tiap bulan baru di-take saat fungsinya dipanggil
+    (write_output), jadi hanya satu bulan yang dimaterialisasi sekaligus.
+    Baris tanpa DateTrade tidak masuk sheet bulanan mana pun.
+    """
+    tanggal = dashboard_df['DateTrade'].to_numpy(dtype='datetime64[ns]')
+    urutan = np.argsort(tanggal.view('i8'), kind='stable')
+    urutan = urutan[~np.isnat(tanggal[urutan])]
+    if len(urutan) == 0:
+        return {}
+
+    bulan = tanggal[urutan].astype('datetime64[M]').astype(np.int64)
+    batas = np.concatenate(([0], np.flatnonzero(np.diff(bulan)) + 1, [len(bulan)]))
+
+    sheet_map = {}
+    for awal, akhir in zip(batas[:-1], batas[1:]):
+        tahun, indeks_bulan = divmod(int(bulan[awal]), 12)
+        nama = f"{MONTH_REV[indeks_bulan + 1]}{(1970 + tahun) % 100:02d}"
+        sheet_map[nama] = partial(dashboard_df.take, urutan[awal:akhir])
+    return sheet_map
+
+def _teks_kunci(series):
+    """Normalisasi nilai kunci ke teks agar 123, 123.0 dan ' 123' dianggap sama."""
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return series.astype('Int64').astype(str)
+        except (TypeError, ValueError):
+            return series.astype(str)
+    return series.astype(str).str.strip().str.replace(r'^(\d+)\.0+$', r'\1', regex=True)
+
+def hash_kunci_trade(df):
+    """Hash uint64 per baris dari kolom KOLOM_KUNCI_DEDUP (vektor, O(n))."""
+    kolom = [k for k in KOLOM_KUNCI_DEDUP if k in df.columns]
+    kunci = pd.DataFrame({k: _teks_kunci(df[k]) for k in kolom})
+    return pd.util.hash_pandas_object(kunci, index=False).to_numpy()
 
-    return df, sheet_name
+def _path_indeks_dedup(folder):
+    return (os.path.join(folder, 'hash.npy'), os.path.join(folder, 'sumber.npy'),
+            os.path.join(folder, 'sumber.json'))
+
+def buka_indeks_dedup(folder):
+    """
+    Indeks persisten Trade ID yang pernah diproses: hash uint64 terurut +
+    kode file asal per hash (.npy, dibuka via memmap) dan daftar nama file
+    (.json). Puluhan juta ID tidak pernah dimuat sebagai objek Python.
+    """
+    path_hash, path_sumber, path_daftar = _path_indeks_dedup(folder)
+    if not os.path.exists(path_hash):
+        return {'folder': folder, 'hash': np.empty(0, dtype=np.uint64),
+                'sumber': np.empty(0, dtype=np.uint32), 'daftar_sumber': []}
+
+    with open(path_daftar, encoding='utf-8') as f:
+        daftar_sumber = json.load(f)
+    return {
+        'folder': folder,
+        'hash': np.load(path_hash, mmap_mode='r'),
+        'sumber': np.load(path_sumber, mmap_mode='r'),
+        'daftar_sumber': daftar_sumber,
+    }
+
+def _tulis_array_indeks(indeks, blok, panjang):
+    """
+    Tulis hash & kode sumber per blok ke .npy sementara (memmap, tidak
+    ditampung di RAM) lalu ganti file lama secara atomik.
+    blok: iterable (posisi_tujuan, hash, sumber).
+    """
+    path_hash, path_sumber, _ = _path_indeks_dedup(indeks['folder'])
+    os.makedirs(indeks['folder'], exist_ok=True)
+    out_hash = np.lib.format.open_memmap(path_hash + '.tmp', mode='w+', dtype=np.uint64, shape=(panjang,))
+    out_sumber = np.lib.format.open_memmap(path_sumber + '.tmp', mode='w+', dtype=np.uint32, shape=(panjang,))
+    for tujuan, nilai_hash, nilai_sumber in blok:
+        out_hash[tujuan] = nilai_hash
+        out_sumber[tujuan] = nilai_sumber
+    out_hash.flush()
+    out_sumber.flush()
+    del out_hash, out_sumber, blok
+
+    # Memmap lama dilepas dulu (Windows tidak bisa mengganti file yang sedang di-map)
+    indeks['hash'] = indeks['sumber'] = None
+    os.replace(path_hash + '.tmp', path_hash)
+    os.replace(path_sumber + '.tmp', path_sumber)
+    indeks['hash'] = np.load(path_hash, mmap_mode='r')
+    indeks['sumber'] = np.load(path_sumber, mmap_mode='r')
+
+def _blok_gabung(lama_hash, lama_sumber, hash_baru, sumber_baru):
+    """Merge dua array terurut: posisi tujuan tiap elemen dihitung dengan searchsorted."""
+    posisi = np.searchsorted(lama_hash, hash_baru)
+    yield posisi + np.arange(len(hash_baru)), hash_baru, sumber_baru
+    for awal in range(0, len(lama_hash), BLOK_INDEKS_DEDUP):
+        urut = np.arange(awal, min(awal + BLOK_INDEKS_DEDUP, len(lama_hash)))
+        geser = np.searchsorted(posisi, urut, side='right')
+        yield urut + geser, lama_hash[urut[0]:urut[-1] + 1], lama_sumber[urut[0]:urut[-1] + 1]
+
+def _blok_saring(lama_hash, lama_sumber, kode):
+    """Salin semua entri kecuali milik sumber `kode`, per blok."""
+    tujuan = 0
+    for awal in range(0, len(lama_hash), BLOK_INDEKS_DEDUP):
+        akhir = min(awal + BLOK_INDEKS_DEDUP, len(lama_hash))
+        sisa = np.asarray(lama_sumber[awal:akhir]) != kode
+        jumlah = int(sisa.sum())
+        yield slice(tujuan, tujuan + jumlah), np.asarray(lama_hash[awal:akhir])[sisa], np.asarray(lama_sumber[awal:akhir])[sisa]
+        tujuan += jumlah
+
+def simpan_indeks_dedup(indeks, hash_baru=None, sumber_baru=None):
+    """Gabungkan hash baru ke indeks (tetap terurut) lalu tulis ke disk."""
+    if hash_baru is not None and len(hash_baru):
+        urutan = np.argsort(hash_baru, kind='stable')
+        blok = _blok_gabung(indeks['hash'], indeks['sumber'],
+                            hash_baru[urutan], np.asarray(sumber_baru, dtype=np.uint32)[urutan])
+        _tulis_array_indeks(indeks, blok, len(indeks['hash']) + len(hash_baru))
+    elif not os.path.exists(_path_indeks_dedup(indeks['folder'])[0]):
+        _tulis_array_indeks(indeks, [], 0)
+
+    path_daftar = _path_indeks_dedup(indeks['folder'])[2]
+    with open(path_daftar + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(indeks['daftar_sumber'], f, ensure_ascii=False)
+    os.replace(path_daftar + '.tmp', path_daftar)
+    return indeks
+
+def lepas_sumber_dedup(indeks, nama_sumber):
+    """Hapus kepemilikan ID milik file yang sudah tidak ada (mis. dihapus dari folder)."""
+    if nama_sumber not in indeks['daftar_sumber']:
+        return indeks
+    kode = indeks['daftar_sumber'].index(nama_sumber)
+    panjang = sum(int((np.asarray(indeks['sumber'][a:a + BLOK_INDEKS_DEDUP]) != kode).sum())
+                  for a in range(0, len(indeks['sumber']), BLOK_INDEKS_DEDUP))
+    if panjang < len(indeks['sumber']):
+        _tulis_array_indeks(indeks, _blok_saring(indeks['hash'], indeks['sumber'], kode), panjang)
+    return indeks
+
+def dedup_trade(frames, sumber, indeks=None):
+    """
+    Buang baris duplikat (kunci KOLOM_KUNCI_DEDUP) lintas semua frame; baris
+    pertama yang menang. Dengan indeks persisten (buka_indeks_dedup), kunci
+    yang sudah tercatat milik file lain di luar batch ini juga dibuang, dan
+    kunci baru dicatat atas nama file asalnya. Return (frames, laporan_df).
+    """
+    jumlah_baris = [len(df) for df in frames]
+    if not frames or not sum(jumlah_baris):
+        return list(frames), pd.DataFrame(columns=LAPORAN_DEDUP)
+
+    semua = np.concatenate([hash_kunci_trade(df) for df in frames])
+    ada_id = np.concatenate([df['Trade ID'].notna().to_numpy() for df in frames])
+    file_ke = np.repeat(np.arange(len(frames)), jumlah_baris)
+
+    dup_batch = np.zeros(len(semua), dtype=bool)
+    dup_batch[ada_id] = pd.Series(semua[ada_id]).duplicated(keep='first').to_numpy()
+
+    dup_histori = np.zeros(len(semua), dtype=bool)
+    tercatat = np.zeros(len(semua), dtype=bool)
+    if indeks is not None and len(indeks['hash']):
+        # Kueri diurutkan dulu agar akses ke memmap berurutan (ramah cache/disk)
+        urutan = np.argsort(semua)
+        posisi = np.empty(len(semua), dtype=np.intp)
+        posisi[urutan] = np.searchsorted(indeks['hash'], semua[urutan])
+        posisi = np.minimum(posisi, len(indeks['hash']) - 1)
+        tercatat = np.asarray(indeks['hash'][posisi]) == semua
+        kode_batch = [indeks['daftar_sumber'].index(s) for s in sumber if s in indeks['daftar_sumber']]
+        milik_lain = ~np.isin(np.asarray(indeks['sumber'][posisi]), kode_batch)
+        dup_histori = ada_id & tercatat & milik_lain & ~dup_batch
+
+    buang = dup_batch | dup_histori
+
+    if indeks is not None:
+        baru = ada_id & ~buang & ~tercatat
+        kode_file = []
+        for s in sumber:
+            if s not in indeks['daftar_sumber']:
+                indeks['daftar_sumber'].append(s)
+            kode_file.append(indeks['daftar_sumber'].index(s))
+        simpan_indeks_dedup(indeks, semua[baru], np.asarray(kode_file)[file_ke[baru]])
+
+    hasil = []
+    batas = np.cumsum([0] + jumlah_baris)
+    for df, awal, akhir in zip(frames, batas[:-1], batas[1:]):
+        buang_file = buang[awal:akhir]
+        if buang_file.any():
+            df = df[~buang_file]
+            df.index = pd.RangeIndex(len(df))
+        hasil.append(df)
+
+    laporan = pd.DataFrame({
+        'Sumber': list(sumber),
+        'Baris': jumlah_baris,
+        'Duplikat_Batch': np.bincount(file_ke, weights=dup_batch, minlength=len(frames)).astype(int),
+        'Duplikat_Histori': np.bincount(file_ke, weights=dup_histori, minlength=len(frames)).astype(int),
+    })
+    laporan['Baris_Dipakai'] = laporan['Baris'] - laporan['Duplikat_Batch'] - laporan['Duplikat_Histori']
+    return hasil, laporan[LAPORAN_DEDUP]
+
+def cetak_laporan_dedup(laporan):
+    for baris in laporan.itertuples(index=False):
+        dibuang = baris.Duplikat_Batch + baris.Duplikat_Histori
+        if dibuang:
+            print(f"🧹 {baris.Sumber}: {dibuang} duplikat dibuang "
+                  f"({baris.Duplikat_Batch} dalam batch, {baris.Duplikat_Histori} dari histori), "
+                  f"{baris.Baris_Dipakai} baris dipakai")
 
 # === 4️⃣ Fungsi Proses Folder === #
-def process_folder(input_folder, kurs_df, pattern='*.xlsx', **kwargs):
+def process_folder(input_folder, kurs_df, pattern='*.xlsx', indeks_dedup=None, dengan_laporan=False, **kwargs):
     files = glob.glob(os.path.join(input_folder, pattern))
     if not files:
         raise FileNotFoundError(f"Tidak ada file dengan pola {pattern} di folder {input_folder}")
 
-    all_data = []
-    sheet_map = {}
-
-    for file_path in files:
-        df, sheet_name = process_file(file_path, kurs_df, **kwargs)
-        if sheet_name:
-            sheet_map[sheet_name] = df
-            all_data.append(df)
+    frames = [baca_trade(file_path) for file_path in files]
+    indeks = buka_indeks_dedup(indeks_dedup) if indeks_dedup else None
+    frames, laporan = dedup_trade(frames, [os.path.basename(f) for f in files], indeks)
+    cetak_laporan_dedup(laporan)
 
-    dashboard_df = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
-    return dashboard_df, sheet_map
+    hasil = gabung_trade(frames, kurs_df, **kwargs)
+    # laporan dedup memberi batas baris per file (dipakai buat_kualitas_data)
+    return (*hasil, laporan) if dengan_laporan else hasil
 
 # === 5️⃣ Fungsi Buat Rekap Volume === #
+def _pastikan_kolom_waktu(dashboard_df):
+    """Tambahkan Bulan_Num & Tahun ke dashboard_df sekali saja (dipakai semua buat_*)."""
+    if 'Bulan_Num' not in dashboard_df.columns:
+        dashboard_df['Bulan_Num'] = dashboard_df['DateTrade'].dt.month
+    if 'Tahun' not in dashboard_df.columns:
+        dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+
 def buat_rekap_volume(dashboard_df):
     """Buat rekap volume per bulan."""
     if dashboard_df.empty or 'DateTrade' not in dashboard_df.columns:
         return pd.DataFrame({'Bulan': [], 'Volume_Lot': []}), ""
     
-    dashboard_df['Bulan_Num'] = dashboard_df['DateTrade'].dt.month
-    dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+    _pastikan_kolom_waktu(dashboard_df)
     
     rekap = dashboard_df.groupby('Bulan_Num')['Trade Vol'].sum().reset_index()
     rekap['Bulan'] = rekap['Bulan_Num'].map(MONTH_NAME_ID)
@@ -209,15 +670,37 @@ def buat_rekap_volume(dashboard_df):
     return rekap, tahun_str
 
 # === 6️⃣ Fungsi Buat Breakdown Volume === #
+def hitung_pertumbuhan(nilai, list_tahun):
+    """
+    Perubahan year-over-year antar tahun berurutan dan CAGR tahun pertama →
+    terakhir, dalam persen, untuk matriks nilai (baris × tahun) sekaligus.
+    Basis ≤ 0 menghasilkan 0 (sama seperti Perubahan (%) sebelumnya).
+    Return (nama_kolom_yoy, yoy [baris × (tahun-1)], cagr [baris]).
+    """
+    kolom_yoy = [f"Perubahan {a}-{b} (%)" for a, b in zip(list_tahun[:-1], list_tahun[1:])]
+    sebelum, sesudah = nilai[:, :-1], nilai[:, 1:]
+    awal, akhir = nilai[:, 0], nilai[:, -1]
+    periode = len(list_tahun) - 1
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yoy = np.where(sebelum > 0, (sesudah - sebelum) / sebelum * 100, 0.0)
+        if periode > 0:
+            cagr = np.where(awal > 0, (np.power(akhir / awal, 1 / periode) - 1) * 100, 0.0)
+        else:
+            cagr = np.zeros(len(nilai))
+    return kolom_yoy, yoy, cagr
+
 def buat_breakdown_volume(dashboard_df):
     """
-    Buat breakdown volume transaksi per jenis produk dan tahun.
+    Buat breakdown volume transaksi per jenis produk dan tahun, dengan
+    perubahan (%) antar tahun berurutan dan CAGR (%) per jenis produk.
     """
     if dashboard_df.empty or 'Contract' not in dashboard_df.columns:
         return pd.DataFrame(), "", []
     
-    dashboard_df['Jenis_Produk'] = dashboard_df['Contract'].apply(ekstrak_jenis_produk)
-    dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+    if 'Jenis_Produk' not in dashboard_df.columns:
+        dashboard_df['Jenis_Produk'] = _per_nilai_unik(dashboard_df['Contract'], ekstrak_jenis_produk)
+    _pastikan_kolom_waktu(dashboard_df)
     
     breakdown = dashboard_df.groupby(['Jenis_Produk', 'Tahun'])['Trade Vol'].sum().reset_index()
     
@@ -225,35 +708,12 @@ def buat_breakdown_volume(dashboard_df):
     pivot = pivot.sort_index(axis=1)
     list_tahun = sorted(pivot.columns.tolist())
     
-    pivot = pivot.reset_index()
+    pivot.loc['Total Lot'] = pivot.sum()
+    kolom_yoy, yoy, cagr = hitung_pertumbuhan(pivot.to_numpy(dtype=float), list_tahun)
     
-    if len(list_tahun) >= 2:
-        tahun_awal = list_tahun[0]
-        tahun_akhir = list_tahun[-1]
-        
-        pivot['Perubahan (%)'] = pivot.apply(
-            lambda row: ((row[tahun_akhir] - row[tahun_awal]) / row[tahun_awal] * 100)
-            if row[tahun_awal] > 0 else 0,
-            axis=1
-        )
-    else:
-        pivot['Perubahan (%)'] = 0
-    
-    total_row = {'Jenis_Produk': 'Total Lot'}
-    for tahun in list_tahun:
-        total_row[tahun] = pivot[tahun].sum()
-    
-    if len(list_tahun) >= 2:
-        tahun_awal = list_tahun[0]
-        tahun_akhir = list_tahun[-1]
-        total_row['Perubahan (%)'] = (
-            (total_row[tahun_akhir] - total_row[tahun_awal]) / total_row[tahun_awal] * 100
-            if total_row[tahun_awal] > 0 else 0
-        )
-    else:
-        total_row['Perubahan (%)'] = 0
-    
-    pivot = pd.concat([pivot, pd.DataFrame([total_row])], ignore_index=True)
+    pivot = pivot.rename_axis(index='Jenis_Produk', columns=None).reset_index()
+    pivot[kolom_yoy] = yoy
+    pivot['CAGR (%)'] = cagr
     
     min_year = min(list_tahun)
     max_year = max(list_tahun)
@@ -263,19 +723,20 @@ def buat_breakdown_volume(dashboard_df):
 
 # === 7️⃣ Fungsi Buat Nilai Transaksi RP === #
 def buat_nilai_transaksi_rp(dashboard_df):
-    """Buat sheet Nilai_Transaksi_RP dengan total notional value per bulan dalam Rupiah."""
+    """
+    Buat sheet Nilai_Transaksi_RP dengan total notional value per bulan dalam Rupiah.
+    Transaksi non-Rupiah memakai Notional_Value_IDR (hasil konversi kurs) bila ada.
+    """
     if dashboard_df.empty or 'Notional_Value' not in dashboard_df.columns:
         return pd.DataFrame({'Bulan': [], 'Nilai Transaksi RP': []}), ""
     
-    if 'Bulan_Num' not in dashboard_df.columns:
-        dashboard_df['Bulan_Num'] = dashboard_df['DateTrade'].dt.month
-    if 'Tahun' not in dashboard_df.columns:
-        dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+    _pastikan_kolom_waktu(dashboard_df)
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in dashboard_df.columns else 'Notional_Value'
     
-    nilai_rp = dashboard_df.groupby('Bulan_Num')['Notional_Value'].sum().reset_index()
+    nilai_rp = dashboard_df.groupby('Bulan_Num')[kolom_rp].sum().reset_index()
     nilai_rp['Bulan'] = nilai_rp['Bulan_Num'].map(MONTH_NAME_ID)
-    nilai_rp = nilai_rp[['Bulan', 'Notional_Value']].rename(
-        columns={'Notional_Value': 'Nilai Transaksi RP'}
+    nilai_rp = nilai_rp[['Bulan', kolom_rp]].rename(
+        columns={kolom_rp: 'Nilai Transaksi RP'}
     )
     
     total_nilai = nilai_rp['Nilai Transaksi RP'].sum()
@@ -294,10 +755,7 @@ def buat_nilai_transaksi_usd(dashboard_df):
     if dashboard_df.empty or 'Notional_Value_USD' not in dashboard_df.columns:
         return pd.DataFrame({'Bulan': [], 'Nilai Transaksi (USD)': []}), ""
     
-    if 'Bulan_Num' not in dashboard_df.columns:
-        dashboard_df['Bulan_Num'] = dashboard_df['DateTrade'].dt.month
-    if 'Tahun' not in dashboard_df.columns:
-        dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+    _pastikan_kolom_waktu(dashboard_df)
     
     nilai_usd = dashboard_df.groupby('Bulan_Num')['Notional_Value_USD'].sum().reset_index()
     nilai_usd['Bulan'] = nilai_usd['Bulan_Num'].map(MONTH_NAME_ID)
@@ -315,16 +773,49 @@ def buat_nilai_transaksi_usd(dashboard_df):
     
     return nilai_usd, tahun_str
 
+def buat_nilai_per_mata_uang(dashboard_df):
+    """
+    Nilai transaksi per bulan dan per mata uang (kolom Currency): nilai asli
+    dalam mata uang transaksi, serta hasil konversi ke Rupiah dan USD.
+    """
+    kolom = ['Bulan', 'Mata_Uang', 'Jumlah_Transaksi', 'Nilai_Asli',
+             'Nilai_Transaksi_RP', 'Nilai_Transaksi_USD']
+    if dashboard_df.empty or 'Currency' not in dashboard_df.columns:
+        return pd.DataFrame(columns=kolom)
+
+    _pastikan_kolom_waktu(dashboard_df)
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in dashboard_df.columns else 'Notional_Value'
+    mata_uang = pd.Series(
+        _per_nilai_unik(dashboard_df['Currency'], _normalisasi_mata_uang),
+        index=dashboard_df.index, name='Mata_Uang'
+    )
+
+    nilai = dashboard_df.groupby(['Bulan_Num', mata_uang]).agg(
+        Jumlah_Transaksi=('Notional_Value', 'size'),
+        Nilai_Asli=('Notional_Value', 'sum'),
+        Nilai_Transaksi_RP=(kolom_rp, 'sum'),
+        Nilai_Transaksi_USD=('Notional_Value_USD', 'sum'),
+    ).reset_index()
+    nilai['Bulan'] = nilai['Bulan_Num'].map(MONTH_NAME_ID)
+    nilai = nilai[kolom]
+
+    # Nilai_Asli beda mata uang tidak bisa dijumlahkan
+    total_row = pd.DataFrame({
+        'Bulan': ['Total'], 'Mata_Uang': [''],
+        'Jumlah_Transaksi': [nilai['Jumlah_Transaksi'].sum()],
+        'Nilai_Asli': [np.nan],
+        'Nilai_Transaksi_RP': [nilai['Nilai_Transaksi_RP'].sum()],
+        'Nilai_Transaksi_USD': [nilai['Nilai_Transaksi_USD'].sum()],
+    })
+    return pd.concat([nilai, total_row], ignore_index=True)
+
 # === 9️⃣ Fungsi Buat Margin Transaksi === #
 def buat_margin_transaksi(dashboard_df):
     """Buat sheet Margin_Transaksi dengan total margin per bulan dalam Rupiah."""
     if dashboard_df.empty or 'Margin' not in dashboard_df.columns:
         return pd.DataFrame({'Bulan': [], 'Margin Transaksi (Rp)': []}), ""
     
-    if 'Bulan_Num' not in dashboard_df.columns:
-        dashboard_df['Bulan_Num'] = dashboard_df['DateTrade'].dt.month
-    if 'Tahun' not in dashboard_df.columns:
-        dashboard_df['Tahun'] = dashboard_df['DateTrade'].dt.year
+    _pastikan_kolom_waktu(dashboard_df)
     
     margin = dashboard_df.groupby('Bulan_Num')['Margin'].sum().reset_index()
     margin['Bulan'] = margin['Bulan_Num'].map(MONTH_NAME_ID)
@@ -342,17 +833,636 @@ def buat_margin_transaksi(dashboard_df):
     
     return margin, tahun_str
 
-# === 🔟 Fungsi Output ke Excel === #
-def write_output(dashboard_df, sheet_map, output_file):
+# === 🔟 Fungsi Buat Rekap Harian (Rolling Window) === #
+def _agregasi_harian(dashboard_df):
+    """
+    Jumlahkan metrik per (tanggal, Jenis_Produk) dalam format lebar:
+    index = tanggal bursa, kolom = (metrik, Jenis_Produk).
+    """
+    tanggal = dashboard_df['DateTrade'].dt.normalize().rename('Tanggal')
+    metrik = [c for c in METRIK_HARIAN if c in dashboard_df.columns]
+    harian = dashboard_df.groupby([tanggal, 'Jenis_Produk'])[metrik].sum()
+    harian = harian.rename(columns=METRIK_HARIAN)
+    return harian.unstack('Jenis_Produk', fill_value=0)
+
+def _hitung_rolling(harian_lebar):
+    """Tambahkan rolling sum per window lalu kembalikan ke format panjang."""
+    metrik_dasar = harian_lebar.columns.get_level_values(0).unique()
+    produk = harian_lebar.columns.get_level_values(1).unique().sort_values()
+    jumlah_hari = len(harian_lebar)
+
+    panjang = pd.DataFrame({
+        'Tanggal': np.repeat(harian_lebar.index.to_numpy(), len(produk)),
+        'Jenis_Produk': np.tile(produk.to_numpy(), jumlah_hari),
+    })
+    for metrik in metrik_dasar:
+        blok = harian_lebar[metrik].reindex(columns=produk, fill_value=0)
+        panjang[metrik] = blok.to_numpy().ravel()
+        for window in ROLLING_WINDOWS:
+            rolling = blok.rolling(window, min_periods=1).sum()
+            panjang[f"{metrik}_{window}H"] = rolling.to_numpy().ravel()
+
+    # Buang baris produk yang tidak punya aktivitas sama sekali di window terpanjang
+    nilai = panjang.drop(columns=['Tanggal', 'Jenis_Produk']).to_numpy()
+    return panjang[(nilai != 0).any(axis=1)].reset_index(drop=True)
+
+def _ke_lebar(harian_df):
+    """Kembalikan rekap harian format panjang ke metrik dasar format lebar."""
+    dasar = [c for c in METRIK_HARIAN.values() if c in harian_df.columns]
+    lebar = harian_df.pivot(index='Tanggal', columns='Jenis_Produk', values=dasar)
+    return lebar.fillna(0)
+
+def buat_rekap_harian(dashboard_df):
+    """
+    Buat rekap harian volume, notional (Rp & USD), dan margin per Jenis_Produk
+    lengkap dengan rolling sum 5 dan 20 hari bursa.
+    """
+    if dashboard_df.empty or 'DateTrade' not in dashboard_df.columns:
+        return pd.DataFrame({'Tanggal': [], 'Jenis_Produk': []})
+
+    return _hitung_rolling(_agregasi_harian(dashboard_df))
+
+def perbarui_rekap_harian(harian_lama, df_baru):
+    """
+    Tambahkan transaksi baru ke rekap harian yang sudah ada (terurut per
+    Tanggal, seperti keluaran buat_rekap_harian / fungsi ini). Histori lama
+    tidak diagregasi ulang; hanya baris lama mulai (window terpanjang - 1)
+    hari bursa sebelum tanggal baru paling awal yang dibentuk ulang ke format
+    lebar dan dihitung ulang rolling-nya, baris sebelumnya dipakai apa adanya.
+    """
+    if harian_lama is None or harian_lama.empty:
+        return buat_rekap_harian(df_baru)
+    if df_baru.empty:
+        return harian_lama
+
+    baru = _agregasi_harian(df_baru)
+    tanggal_mulai = baru.index.min()
+    tanggal_lama = harian_lama['Tanggal']
+    hari_lama = pd.Index(tanggal_lama.unique())
+    posisi_mulai = hari_lama.searchsorted(tanggal_mulai)
+    tanggal_awal = hari_lama[max(posisi_mulai - (max(ROLLING_WINDOWS) - 1), 0)]
+
+    # fill_value hanya mengisi sisi yang kosong; (tanggal lama × produk baru) kosong di keduanya
+    jendela = harian_lama.iloc[tanggal_lama.searchsorted(tanggal_awal):]
+    gabung = _ke_lebar(jendela).add(baru, fill_value=0).fillna(0).sort_index()
+
+    ekor = _hitung_rolling(gabung)
+    ekor = ekor[ekor['Tanggal'] >= tanggal_mulai]
+    tetap = harian_lama.iloc[:tanggal_lama.searchsorted(tanggal_mulai)]
+
+    return pd.concat([tetap, ekor], ignore_index=True)
+
+def tulis_kolumnar(df, output_file):
+    """Ekspor DataFrame ke Parquet (butuh pyarrow atau fastparquet)."""
+    try:
+        df.to_parquet(output_file, index=False)
+    except ImportError as e:
+        print(f"⚠️ Ekspor kolumnar dilewati ({output_file}): {e}")
+        return None
+    return output_file
+
+def baca_kolumnar(input_file):
+    """Baca hasil ekspor Parquet dari tulis_kolumnar."""
+    return pd.read_parquet(input_file)
+
+def _kolom_arrow(pa, series):
+    """Series → pyarrow array; kolom object campuran (mis. Trade ID angka & teks) jadi teks."""
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array(series.astype(str).where(series.notna()), from_pandas=True)
+
+def tulis_arrow(df, output_file):
+    """
+    Ekspor DataFrame ke Arrow IPC format file tanpa kompresi (butuh pyarrow),
+    sehingga baca_arrow bisa me-memory-map isinya tanpa salinan. Ditulis
+    ke file sementara per proses (penulis paralel ke path yang sama tidak
+    saling timpa) lalu di-rename agar pembaca tidak melihat file setengah jadi.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        print(f"⚠️ Ekspor Arrow dilewati ({output_file}): {e}")
+        return None
+
+    tabel = pa.Table.from_arrays(
+        [_kolom_arrow(pa, df[kolom]) for kolom in df.columns],
+        names=[str(kolom) for kolom in df.columns],
+    )
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_file, 'wb') as sink, pa.ipc.new_file(sink, tabel.schema) as writer:
+        writer.write_table(tabel)
+    os.replace(tmp_file, output_file)
+    return output_file
+
+def baca_arrow(input_file, kolom=None, sebagai_pandas=True):
+    """
+    Buka hasil tulis_arrow lewat memory map (zero-copy: hanya footer yang
+    dibaca, buffer kolom dirujuk langsung dari page cache).
+    sebagai_pandas=False mengembalikan pyarrow.Table tanpa konversi.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(input_file, 'r') as sumber:
+        tabel = pa.ipc.open_file(sumber).read_all()
+    if kolom is not None:
+        tabel = tabel.select(list(kolom))
+    return tabel.to_pandas() if sebagai_pandas else tabel
+
+# === 1️⃣1️⃣ Fungsi Breakdown Member & Akun === #
+def _label_bulan(kode_bulan):
+    """Kode bulan (tahun * 12 + bulan - 1) → 'Oktober 2025'."""
+    return [f"{MONTH_NAME_ID[k % 12 + 1]} {k // 12}" for k in kode_bulan]
+
+def _sisi_buy_sell(kolom):
+    """Kolom 'Buy Sell' → (beli, jual) boolean; kosong / selain B… / S… tidak masuk keduanya."""
+    sisi = kolom.astype('string').str.strip().str.upper()
+    return (sisi.str.startswith('B').fillna(False).to_numpy(dtype=bool),
+            sisi.str.startswith('S').fillna(False).to_numpy(dtype=bool))
+
+def buat_indeks_grup(dashboard_df):
+    """
+    Faktorisasi kunci member, akun, dan bulan satu kali untuk dipakai bersama
+    oleh semua agregasi member/akun (tanpa groupby string berulang).
+
+    Setiap entri indeks adalah satu sisi transaksi:
+    - skema root: tiap baris punya sisi beli (Acc.Buy/Mbr.Buy) dan sisi jual
+      (Acc.Sell/Mbr.Sell); margin dibagi rata ke kedua sisi.
+    - skema webtest: satu sisi per baris (Acc + Buy Sell); member = akun.
+      Baris dengan Buy Sell kosong / tidak dikenal tidak punya sisi dan
+      dilewati (dilaporkan di buat_kualitas_data).
+    """
+    n = len(dashboard_df)
+    baris_df = np.arange(n)
+
+    if 'Acc.Buy' in dashboard_df.columns:
+        baris = np.concatenate([baris_df, baris_df])
+        beli = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+        akun = np.concatenate([dashboard_df['Acc.Buy'].to_numpy(), dashboard_df['Acc.Sell'].to_numpy()])
+        member = np.concatenate([dashboard_df['Mbr.Buy'].to_numpy(), dashboard_df['Mbr.Sell'].to_numpy()])
+        bobot_margin = 0.5
+        ada_member = True
+    else:
+        beli, jual = _sisi_buy_sell(dashboard_df['Buy Sell'])
+        ada_sisi = beli | jual
+        baris = baris_df[ada_sisi]
+        beli = beli[ada_sisi]
+        akun = dashboard_df['Acc'].to_numpy()[ada_sisi]
+        member = akun
+        bobot_margin = 1.0
+        ada_member = False
+
+    akun_kode, akun_label = pd.factorize(akun)
+    if ada_member:
+        member_kode, member_label = pd.factorize(member)
+    else:
+        member_kode, member_label = akun_kode, akun_label
+
+    tanggal = dashboard_df['DateTrade']
+    bulan_mentah = (tanggal.dt.year * 12 + tanggal.dt.month - 1).to_numpy(dtype=float)
+    ada_tanggal = ~np.isnan(bulan_mentah)
+    kode_valid, bulan_unik = pd.factorize(bulan_mentah[ada_tanggal].astype(np.int64), sort=True)
+    bulan_kode = np.full(n, -1, dtype=np.int64)
+    bulan_kode[ada_tanggal] = kode_valid
+
+    return {
+        'baris': baris,
+        'beli': beli,
+        'akun_kode': akun_kode,
+        'akun_label': np.asarray(akun_label),
+        'member_kode': member_kode,
+        'member_label': np.asarray(member_label),
+        'bulan_kode': bulan_kode[baris],
+        'bulan_label': _label_bulan(bulan_unik),
+        'bobot_margin': bobot_margin,
+        'ada_member': ada_member,
+    }
+
+def _nilai_sisi(dashboard_df, indeks, kolom, bobot=1.0):
+    """Nilai kolom per sisi transaksi (NaN dianggap 0, seperti groupby.sum)."""
+    if kolom not in dashboard_df.columns:
+        return np.zeros(len(indeks['baris']))
+    nilai = pd.to_numeric(dashboard_df[kolom], errors='coerce').to_numpy(dtype=float)
+    return np.nan_to_num(nilai)[indeks['baris']] * bobot
+
+def _jumlah_per_kode(kode, jumlah_kode, nilai):
+    """Jumlahkan nilai per kode grup; kode negatif (kunci kosong) diabaikan."""
+    valid = kode >= 0
+    return np.bincount(kode[valid], weights=nilai[valid], minlength=jumlah_kode)
+
+def buat_member_teratas(dashboard_df, indeks=None, top_n=TOP_N_MEMBER):
+    """
+    Top-N member per bulan berdasarkan lot, lengkap dengan notional dan margin.
+    """
+    kolom = ['Bulan', 'Peringkat', 'Member', 'Volume_Lot', 'Nilai_Transaksi_RP', 'Margin']
+    if dashboard_df.empty:
+        return pd.DataFrame(columns=kolom)
+    if indeks is None:
+        indeks = buat_indeks_grup(dashboard_df)
+
+    n_member = len(indeks['member_label'])
+    n_bulan = len(indeks['bulan_label'])
+    valid = (indeks['member_kode'] >= 0) & (indeks['bulan_kode'] >= 0)
+    kode = np.where(valid, indeks['member_kode'] * n_bulan + indeks['bulan_kode'], -1)
+    ukuran = n_member * n_bulan
+
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in dashboard_df.columns else 'Notional_Value'
+    lot = _jumlah_per_kode(kode, ukuran, _nilai_sisi(dashboard_df, indeks, KOLOM_LOT))
+    notional = _jumlah_per_kode(kode, ukuran, _nilai_sisi(dashboard_df, indeks, kolom_rp))
+    margin = _jumlah_per_kode(
+        kode, ukuran, _nilai_sisi(dashboard_df, indeks, 'Margin', indeks['bobot_margin'])
+    )
+    lot, notional, margin = (a.reshape(n_member, n_bulan) for a in (lot, notional, margin))
+
+    # Urutkan member per kolom bulan sekaligus (stable → seri tetap urutan kemunculan)
+    top_n = min(top_n, n_member)
+    urutan = np.argsort(-lot, axis=0, kind='stable')[:top_n]
+    kolom_bulan = np.broadcast_to(np.arange(n_bulan), urutan.shape)
+
+    hasil = pd.DataFrame({
+        'Bulan_Kode': kolom_bulan.T.ravel(),
+        'Peringkat': np.broadcast_to(np.arange(1, top_n + 1)[:, None], urutan.shape).T.ravel(),
+        'Member': indeks['member_label'][urutan.T.ravel()],
+        'Volume_Lot': lot[urutan, kolom_bulan].T.ravel(),
+        'Nilai_Transaksi_RP': notional[urutan, kolom_bulan].T.ravel(),
+        'Margin': margin[urutan, kolom_bulan].T.ravel(),
+    })
+    hasil = hasil[hasil['Volume_Lot'] > 0]
+    hasil.insert(0, 'Bulan', np.asarray(indeks['bulan_label'], dtype=object)[hasil.pop('Bulan_Kode')])
+    return hasil.reset_index(drop=True)
+
+def buat_member_beli_jual(dashboard_df, indeks=None):
+    """Volume sisi beli vs sisi jual per member."""
+    kolom = ['Member', 'Lot_Beli', 'Lot_Jual', 'Lot_Net', 'Total_Lot']
+    if dashboard_df.empty:
+        return pd.DataFrame(columns=kolom)
+    if indeks is None:
+        indeks = buat_indeks_grup(dashboard_df)
+
+    n_member = len(indeks['member_label'])
+    lot = _nilai_sisi(dashboard_df, indeks, KOLOM_LOT)
+    beli = indeks['beli']
+    kode = indeks['member_kode']
+    lot_beli = _jumlah_per_kode(kode[beli], n_member, lot[beli])
+    lot_jual = _jumlah_per_kode(kode[~beli], n_member, lot[~beli])
+
+    hasil = pd.DataFrame({
+        'Member': indeks['member_label'],
+        'Lot_Beli': lot_beli,
+        'Lot_Jual': lot_jual,
+        'Lot_Net': lot_beli - lot_jual,
+        'Total_Lot': lot_beli + lot_jual,
+    })
+    hasil = hasil.sort_values('Total_Lot', ascending=False, kind='stable')
+    return hasil[hasil['Total_Lot'] > 0].reset_index(drop=True)
+
+def buat_akun_teratas(dashboard_df, indeks=None, top_n=TOP_N_AKUN):
+    """Top-N akun berdasarkan total lot (beli + jual) selama periode data."""
+    kolom = ['Akun', 'Lot_Beli', 'Lot_Jual', 'Total_Lot', 'Nilai_Transaksi_RP', 'Margin']
+    if dashboard_df.empty:
+        return pd.DataFrame(columns=kolom)
+    if indeks is None:
+        indeks = buat_indeks_grup(dashboard_df)
+
+    n_akun = len(indeks['akun_label'])
+    kode = indeks['akun_kode']
+    beli = indeks['beli']
+    lot = _nilai_sisi(dashboard_df, indeks, KOLOM_LOT)
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in dashboard_df.columns else 'Notional_Value'
+
+    hasil = pd.DataFrame({
+        'Akun': indeks['akun_label'],
+        'Lot_Beli': _jumlah_per_kode(kode[beli], n_akun, lot[beli]),
+        'Lot_Jual': _jumlah_per_kode(kode[~beli], n_akun, lot[~beli]),
+        'Total_Lot': _jumlah_per_kode(kode, n_akun, lot),
+        'Nilai_Transaksi_RP': _jumlah_per_kode(
+            kode, n_akun, _nilai_sisi(dashboard_df, indeks, kolom_rp)
+        ),
+        'Margin': _jumlah_per_kode(
+            kode, n_akun, _nilai_sisi(dashboard_df, indeks, 'Margin', indeks['bobot_margin'])
+        ),
+    })
+
+    if indeks['ada_member']:
+        # Member pemilik akun: ambil dari sisi mana pun akun tersebut muncul
+        valid = (kode >= 0) & (indeks['member_kode'] >= 0)
+        member_akun = np.full(n_akun, -1)
+        member_akun[kode[valid]] = indeks['member_kode'][valid]
+        label_member = np.append(indeks['member_label'].astype(object), None)
+        hasil.insert(1, 'Member', label_member[member_akun])
+
+    hasil = hasil.sort_values('Total_Lot', ascending=False, kind='stable').head(top_n)
+    return hasil[hasil['Total_Lot'] > 0].reset_index(drop=True)
+
+# === 1️⃣2️⃣ Fungsi Posisi Bersih & Open Interest === #
+def _posisi_terurut(dashboard_df, indeks):
+    """
+    Posisi bersih berjalan per (akun, contract) dalam bentuk array.
+    Sisi diurutkan per kunci lalu waktu; posisi = cumsum lot bertanda
+    (beli +, jual -) dikurangi cumsum sebelum awal grup, tanpa loop per baris.
+    ClosePosition / Close Vol tidak dipakai: posisi bersih sudah ditentukan
+    oleh arus lot bertanda.
+    """
+    baris = indeks['baris']
+    contract_kode, contract_label = pd.factorize(dashboard_df['Contract'])
+    contract_kode = contract_kode[baris]
+    lot = _nilai_sisi(dashboard_df, indeks, KOLOM_LOT)
+    perubahan = np.where(indeks['beli'], lot, -lot)
+    waktu = dashboard_df['DateTrade'].to_numpy()[baris]
+
+    valid = (indeks['akun_kode'] >= 0) & (contract_kode >= 0) & ~np.isnat(waktu)
+    kunci = indeks['akun_kode'].astype(np.int64) * len(contract_label) + contract_kode
+    idx = np.flatnonzero(valid)
+    urutan = idx[np.lexsort((waktu[idx], kunci[idx]))]
+
+    kunci = kunci[urutan]
+    perubahan = perubahan[urutan]
+    kumulatif = np.cumsum(perubahan)
+    awal_grup = np.r_[True, kunci[1:] != kunci[:-1]]
+    sebelum_grup = (kumulatif - perubahan)[awal_grup]
+    posisi = kumulatif - sebelum_grup[np.cumsum(awal_grup) - 1]
+
+    return {
+        'urutan': urutan,
+        'kunci': kunci,
+        'contract_kode': contract_kode[urutan],
+        'contract_label': np.asarray(contract_label),
+        'waktu': waktu[urutan],
+        'perubahan': perubahan,
+        'posisi': posisi,
+    }
+
+def hitung_posisi_bersih(dashboard_df, indeks=None):
+    """
+    Posisi bersih berjalan per (akun, contract) untuk setiap sisi transaksi,
+    diurutkan per akun, contract, lalu waktu.
+    """
+    kolom = ['DateTrade', 'Akun', 'Contract', 'Perubahan_Lot', 'Posisi_Bersih']
+    if dashboard_df.empty:
+        return pd.DataFrame(columns=kolom)
+    if indeks is None:
+        indeks = buat_indeks_grup(dashboard_df)
+
+    p = _posisi_terurut(dashboard_df, indeks)
+    return pd.DataFrame({
+        'DateTrade': p['waktu'],
+        'Akun': indeks['akun_label'][indeks['akun_kode'][p['urutan']]],
+        'Contract': p['contract_label'][p['contract_kode']],
+        'Perubahan_Lot': p['perubahan'],
+        'Posisi_Bersih': p['posisi'],
+    })
+
+def buat_open_interest(dashboard_df, indeks=None):
+    """
+    Open interest akhir bulan per Jenis_Produk (jumlah posisi long bersih
+    seluruh akun). Posisi dibawa ke bulan berikutnya sampai ada transaksi
+    baru atau contract jatuh tempo (lewat bulan kontrak posisi dianggap nol).
+    """
+    if dashboard_df.empty:
+        return pd.DataFrame({'Bulan': []})
+    if indeks is None:
+        indeks = buat_indeks_grup(dashboard_df)
+
+    p = _posisi_terurut(dashboard_df, indeks)
+    waktu = pd.DatetimeIndex(p['waktu'])
+    bulan = (waktu.year * 12 + waktu.month - 1).to_numpy(dtype=np.int64)
+    if len(bulan) == 0:
+        return pd.DataFrame({'Bulan': []})
+    jatuh_tempo_kontrak = periode_kontrak(p['contract_label'])
+    produk_kontrak = pd.Series(p['contract_label']).map(ekstrak_jenis_produk).to_numpy()
+
+    # Transaksi setelah bulan kontrak tidak lagi membuka posisi
+    jatuh_tempo = jatuh_tempo_kontrak[p['contract_kode']]
+    aktif = np.isnan(jatuh_tempo) | (bulan <= jatuh_tempo)
+    kunci, ck, bln, posisi = p['kunci'][aktif], p['contract_kode'][aktif], bulan[aktif], p['posisi'][aktif]
+
+    # Posisi akhir bulan per kunci → perubahan exposure long antar bulan
+    akhir_bulan = np.r_[(kunci[1:] != kunci[:-1]) | (bln[1:] != bln[:-1]), True]
+    kunci, ck, bln = kunci[akhir_bulan], ck[akhir_bulan], bln[akhir_bulan]
+    long_akhir = np.maximum(posisi[akhir_bulan], 0)
+    awal_kunci = np.r_[True, kunci[1:] != kunci[:-1]]
+    long_sebelum = np.r_[0.0, long_akhir[:-1]]
+    long_sebelum[awal_kunci] = 0.0
+    delta = long_akhir - long_sebelum
+
+    # Tutup exposure yang tersisa di bulan setelah contract jatuh tempo
+    akhir_kunci = np.r_[kunci[1:] != kunci[:-1], True]
+    tempo = jatuh_tempo_kontrak[ck[akhir_kunci]]
+    tutup = ~np.isnan(tempo) & (long_akhir[akhir_kunci] > 0)
+
+    peristiwa = pd.DataFrame({
+        'Bulan_Kode': np.r_[bln, tempo[tutup].astype(np.int64) + 1],
+        'Jenis_Produk': np.r_[produk_kontrak[ck], produk_kontrak[ck[akhir_kunci]][tutup]],
+        'Delta': np.r_[delta, -long_akhir[akhir_kunci][tutup]],
+    })
+    rentang = np.arange(bulan.min(), bulan.max() + 1)
+    oi = (peristiwa.groupby(['Bulan_Kode', 'Jenis_Produk'])['Delta'].sum()
+          .unstack('Jenis_Produk', fill_value=0)
+          .reindex(rentang, fill_value=0)
+          .cumsum())
+    oi.columns.name = None
+    oi['Total'] = oi.sum(axis=1)
+    oi.insert(0, 'Bulan', _label_bulan(rentang))
+    return oi.reset_index(drop=True)
+
+def buat_struktur_tenor(dashboard_df):
+    """
+    Struktur tenor: volume & notional per bulan trade × bulan kontrak ×
+    Jenis_Produk, termasuk porsi volume spot vs remote (periode margin
+    seperti hitung_margin). Satu groupby atas kode bulan, tanpa loop per bulan.
+    """
+    kolom = ['Bulan_Trade', 'Bulan_Kontrak', 'Tenor_Bulan', 'Jenis_Produk', 'Volume_Lot',
+             'Lot_Spot', 'Lot_Remote', 'Porsi_Spot (%)', 'Porsi_Remote (%)', 'Nilai_Transaksi_RP']
+    if dashboard_df.empty or 'Bulan_Kontrak' not in dashboard_df.columns:
+        return pd.DataFrame(columns=kolom)
+
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in dashboard_df.columns else 'Notional_Value'
+    waktu, kontrak = dashboard_df['DateTrade'], dashboard_df['Bulan_Kontrak']
+    kode_kontrak = (kontrak.dt.year * 12 + kontrak.dt.month - 1).to_numpy(dtype=float)
+    lot = dashboard_df[KOLOM_LOT].to_numpy(dtype=float)
+    spot = _dalam_periode_spot(waktu, kode_kontrak)
+
+    sel = pd.DataFrame({
+        'Bulan_Kode': (waktu.dt.year * 12 + waktu.dt.month - 1).to_numpy(dtype=float),
+        'Kontrak_Kode': kode_kontrak,
+        'Jenis_Produk': dashboard_df['Jenis_Produk'].to_numpy(),
+        'Volume_Lot': lot,
+        'Lot_Spot': np.where(spot, lot, 0.0),
+        'Nilai_Transaksi_RP': dashboard_df[kolom_rp].to_numpy(dtype=float),
+    })[waktu.notna().to_numpy()]
+    if sel.empty:
+        return pd.DataFrame(columns=kolom)
+
+    tenor = (sel.groupby(['Bulan_Kode', 'Kontrak_Kode', 'Jenis_Produk'], dropna=False, sort=True)
+             .sum(min_count=0).reset_index())
+    tenor['Lot_Remote'] = tenor['Volume_Lot'] - tenor['Lot_Spot']
+    volume = tenor['Volume_Lot'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for sisi in ('Spot', 'Remote'):
+            porsi = tenor[f'Lot_{sisi}'].to_numpy() / volume * 100
+            tenor[f'Porsi_{sisi} (%)'] = np.where(volume != 0, porsi, 0.0)
+
+    bulan_trade = tenor['Bulan_Kode'].to_numpy(dtype=np.int64)
+    kode_kontrak = tenor['Kontrak_Kode'].to_numpy()
+    ada_kontrak = ~np.isnan(kode_kontrak)
+    label_kontrak = np.full(len(tenor), 'Unknown', dtype=object)
+    label_kontrak[ada_kontrak] = _label_bulan(kode_kontrak[ada_kontrak].astype(np.int64))
+    tenor['Bulan_Trade'] = _label_bulan(bulan_trade)
+    tenor['Bulan_Kontrak'] = label_kontrak
+    tenor['Tenor_Bulan'] = kode_kontrak - bulan_trade
+    return tenor[kolom]
+
+# === 1️⃣3️⃣ Fungsi Kualitas Data === #
+# Anomali yang diam-diam hilang dari total: nilai yang jadi NaN karena
+# to_numeric(errors='coerce'), suffix Contract yang tidak terbaca (Margin
+# jatuh ke rate remote), kurs yang tidak ketemu (trade sebelum tanggal kurs
+# pertama), lot negatif, dan tanggal di luar bulan file asalnya.
+N_CONTOH_KUALITAS = 5  # contoh baris per pemeriksaan
+KOLOM_CONTOH_KUALITAS = ['DateTrade', 'Trade ID', 'Contract']
+
+def _masker_kualitas(dashboard_df, ada_tanggal):
+    """[(pemeriksaan, kolom nilai, keterangan, mask)]; kolom yang tidak ada dilewati."""
+    kolom = dashboard_df.columns
+    cek = [('DateTrade kosong', 'DateTrade', 'Tidak masuk sheet bulanan & rekap per bulan', ~ada_tanggal)]
+    for nama in (KOLOM_LOT, 'Price', 'Close Vol'):
+        if nama in kolom:
+            cek.append((f"{nama} kosong", nama, 'Kosong / bukan angka: hilang dari total',
+                        dashboard_df[nama].isna().to_numpy()))
+    if 'Bulan_Kontrak' in kolom:
+        cek.append(('Contract tidak terbaca', 'Contract', 'Margin memakai rate remote; tenor Unknown',
+                    dashboard_df['Bulan_Kontrak'].isna().to_numpy()))
+    if 'Kurs_Jisdor' in kolom:
+        cek.append(('Kurs JISDOR kosong', 'DateTrade', 'Sebelum tanggal kurs pertama: nilai USD kosong',
+                    ada_tanggal & dashboard_df['Kurs_Jisdor'].isna().to_numpy()))
+    if 'Kurs_Mata_Uang' in kolom:
+        cek.append(('Kurs mata uang kosong', 'Currency', 'Tanpa seri kurs / sebelum kurs pertama: nilai Rupiah kosong',
+                    ada_tanggal & dashboard_df['Kurs_Mata_Uang'].isna().to_numpy()))
+    if KOLOM_LOT in kolom:
+        cek.append(('Lot negatif', KOLOM_LOT, 'Mengurangi total volume & margin',
+                    dashboard_df[KOLOM_LOT].to_numpy(dtype=float) < 0))
+    if 'Buy Sell' in kolom:
+        beli, jual = _sisi_buy_sell(dashboard_df['Buy Sell'])
+        cek.append(('Buy Sell tidak dikenal', 'Buy Sell', 'Bukan B… / S…: tidak masuk agregasi member, akun & open interest',
+                    ~(beli | jual)))
+    return cek
+
+def buat_kualitas_data(dashboard_df, laporan_dedup=None, n_contoh=N_CONTOH_KUALITAS):
+    """
+    Laporan kualitas data dalam satu lintasan vektor: setiap pemeriksaan
+    adalah satu mask boolean, ditumpuk jadi matriks (pemeriksaan × baris)
+    sehingga jumlah, jumlah per file dan contoh baris diambil sekaligus.
+
+    laporan_dedup (hasil dedup_trade, urutan sama dengan frame yang
+    digabung) memberi batas baris tiap file; tanpanya pemeriksaan 'Di luar
+    bulan file' dan tabel per file dilewati. Bulan file = bulan DateTrade
+    terbanyak di file tersebut.
+
+    Return (ringkasan_df, per_file_df, contoh_df). Baris_Dashboard adalah
+    nomor baris di sheet Dashboard (header di baris 1).
+    """
+    n = len(dashboard_df)
+    tanggal = dashboard_df['DateTrade'].to_numpy(dtype='datetime64[ns]') if n else np.array([], dtype='datetime64[ns]')
+    ada_tanggal = ~np.isnat(tanggal)
+    cek = _masker_kualitas(dashboard_df, ada_tanggal) if n else []
+
+    sumber = None
+    if laporan_dedup is not None and n and int(laporan_dedup['Baris_Dipakai'].sum()) == n:
+        dipakai = laporan_dedup[laporan_dedup['Baris_Dipakai'] > 0]
+        sumber = dipakai['Sumber'].astype(str).to_numpy()
+        panjang = dipakai['Baris_Dipakai'].to_numpy(dtype=np.int64)
+        awal = np.concatenate(([0], np.cumsum(panjang)[:-1]))
+
+        bulan = tanggal.astype('datetime64[M]').astype(np.int64)
+        bulan_file = np.full(len(sumber), -1, dtype=np.int64)
+        for i, (a, p) in enumerate(zip(awal, panjang)):
+            b = bulan[a:a + p][ada_tanggal[a:a + p]]
+            if len(b):
+                nilai, hitung = np.unique(b, return_counts=True)
+                bulan_file[i] = nilai[hitung.argmax()]
+        cek.append(('Di luar bulan file', 'DateTrade', 'Tanggal tidak sebulan dengan mayoritas baris file asalnya',
+                    ada_tanggal & (bulan != np.repeat(bulan_file, panjang))))
+
+    kolom_ringkasan = ['Pemeriksaan', 'Jumlah_Baris', 'Persen_Baris', 'Keterangan']
+    kolom_contoh = ['Pemeriksaan', 'Baris_Dashboard', 'Sumber', *KOLOM_CONTOH_KUALITAS, 'Kolom', 'Nilai']
+    if not cek:
+        return (pd.DataFrame(columns=kolom_ringkasan), pd.DataFrame(columns=['Sumber', 'Bulan_File', 'Baris']),
+                pd.DataFrame(columns=kolom_contoh))
+
+    label = [c[0] for c in cek]
+    masker = np.vstack([c[3] for c in cek])
+    jumlah = masker.sum(axis=1)
+    bermasalah = int(masker.any(axis=0).sum())
+    ringkasan_df = pd.DataFrame({
+        'Pemeriksaan': label + ['Baris bermasalah (unik)'],
+        'Jumlah_Baris': np.append(jumlah, bermasalah).astype(np.int64),
+        'Persen_Baris': np.round(np.append(jumlah, bermasalah) / n * 100, 4),
+        'Keterangan': [c[2] for c in cek] + ['Baris dengan minimal satu anomali di atas'],
+    })
+
+    if sumber is not None:
+        per_file = np.add.reduceat(masker, awal, axis=1, dtype=np.int64)
+        per_file_df = pd.DataFrame({
+            'Sumber': sumber,
+            'Bulan_File': [_label_bulan([k + 1970 * 12])[0] if k >= 0 else 'Unknown' for k in bulan_file],
+            'Baris': panjang,
+            **dict(zip(label, per_file)),
+        })
+        sumber_baris = np.repeat(sumber, panjang)
+    else:
+        per_file_df = pd.DataFrame(columns=['Sumber', 'Bulan_File', 'Baris', *label])
+        sumber_baris = None
+
+    # Contoh: n_contoh baris pertama per pemeriksaan, diambil dengan satu take
+    posisi = [np.flatnonzero(m)[:n_contoh] for m in masker]
+    semua = np.concatenate(posisi)
+    kolom_ambil = list(dict.fromkeys(k for k in KOLOM_CONTOH_KUALITAS + [c[1] for c in cek] if k in dashboard_df.columns))
+    ambil = dashboard_df[kolom_ambil].take(semua)
+    kolom_nilai = np.repeat([c[1] for c in cek], [len(p) for p in posisi])
+    nilai = [None if pd.isna(v) else str(v) for v in (ambil[k].iat[j] for j, k in enumerate(kolom_nilai))]
+    contoh_df = pd.DataFrame({
+        'Pemeriksaan': np.repeat(label, [len(p) for p in posisi]),
+        'Baris_Dashboard': semua + 2,
+        'Sumber': sumber_baris[semua] if sumber_baris is not None else None,
+        **{k: ambil[k].to_numpy() if k in ambil.columns else None for k in KOLOM_CONTOH_KUALITAS},
+        'Kolom': kolom_nilai,
+        'Nilai': nilai,
+    })
+    return ringkasan_df, per_file_df, contoh_df
+
+def kualitas_ke_json(kualitas):
+    """(ringkasan_df, per_file_df, contoh_df) → dict siap-JSON (NaN → null)."""
+    return {nama: json.loads(df.to_json(orient='records', date_format='iso'))
+            for nama, df in zip(('ringkasan', 'per_file', 'contoh'), kualitas)}
+
+def cetak_kualitas_data(kualitas):
+    ringkasan_df = kualitas[0]
+    for baris in ringkasan_df.iloc[:-1].itertuples(index=False):
+        if baris.Jumlah_Baris:
+            print(f"⚠️ {baris.Pemeriksaan}: {baris.Jumlah_Baris} baris ({baris.Persen_Baris:.2f}%) - {baris.Keterangan}")
+
+# === 1️⃣4️⃣ Fungsi Output ke Excel === #
+def write_output(dashboard_df, sheet_map, output_file, harian_df=None, kualitas=None):
     """
     Tulis Excel dengan urutan sheet:
     1. Rekap_Volume_Transaksi
     2. Breakdown_Volume_Transaksi
     3. Nilai_Transaksi_RP
-    4. Nilai_transaksi_USD
+    4. Nilai_transaksi_USD (+ Nilai_Per_Mata_Uang jika ada kolom Currency)
     5. Margin_Transaksi
-    6. Dashboard (dengan Jenis_Produk)
-    7. Sheet bulanan (JAN25, FEB25, dst dengan Jenis_Produk)
+    6. Harian (rolling 5 & 20 hari per Jenis_Produk)
+    7. Member_Teratas, Member_Beli_Jual, Akun_Teratas
+    8. Open_Interest (akhir bulan per Jenis_Produk), Struktur_Tenor
+       (bulan trade × bulan kontrak × Jenis_Produk)
+    9. Kualitas_Data (ringkasan anomali, per file, contoh baris)
+    10. Dashboard (dengan Jenis_Produk)
+    11. Sheet bulanan (JAN25, FEB25, dst dengan Jenis_Produk)
+
+    sheet_map: {nama_sheet: DataFrame atau fungsi → DataFrame} (lihat
+    partisi_bulanan); fungsi dipanggil tepat saat sheet-nya ditulis.
+    harian_df opsional: rekap harian yang sudah dihitung (mis. hasil
+    perbarui_rekap_harian); jika None dihitung dari dashboard_df.
+    kualitas opsional: hasil buat_kualitas_data (mis. dengan laporan dedup);
+    jika None dihitung dari dashboard_df tanpa pemeriksaan per file.
     """
     def parse_sheet_order(name):
         month_str = name[:3].upper()
@@ -361,7 +1471,7 @@ def write_output(dashboard_df, sheet_map, output_file):
         year_num = 2000 + int(year_str)
         return (year_num, month_num)
 
-    sorted_sheets = sorted(sheet_map.items(), key=lambda x: parse_sheet_order(x[0]))
+    sorted_sheets = sorted(sheet_map, key=parse_sheet_order)
 
     with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
         # 1️⃣ Sheet Rekap Volume
@@ -370,7 +1480,11 @@ def write_output(dashboard_df, sheet_map, output_file):
         
         # 2️⃣ Sheet Breakdown Volume
         breakdown_df, tahun_str_breakdown, list_tahun = buat_breakdown_volume(dashboard_df)
-        breakdown_df.to_excel(writer, index=False, sheet_name='Breakdown_Volume_Transaksi', startrow=3)
+        # Persen ditulis sebagai pecahan agar format 0.00% cukup dipasang per kolom
+        kolom_persen = list(breakdown_df.columns[len(list_tahun) + 1:])
+        breakdown_excel = breakdown_df.copy()
+        breakdown_excel[kolom_persen] = breakdown_excel[kolom_persen] / 100
+        breakdown_excel.to_excel(writer, index=False, sheet_name='Breakdown_Volume_Transaksi', startrow=3)
         
         # 3️⃣ Sheet Nilai Transaksi RP
         nilai_rp_df, tahun_str_rp = buat_nilai_transaksi_rp(dashboard_df)
@@ -379,17 +1493,52 @@ def write_output(dashboard_df, sheet_map, output_file):
         # 4️⃣ Sheet Nilai Transaksi USD
         nilai_usd_df, tahun_str_usd = buat_nilai_transaksi_usd(dashboard_df)
         nilai_usd_df.to_excel(writer, index=False, sheet_name='Nilai_transaksi_USD', startrow=2)
+        mata_uang_df = buat_nilai_per_mata_uang(dashboard_df)
+        if 'Currency' in dashboard_df.columns:
+            mata_uang_df.to_excel(writer, index=False, sheet_name='Nilai_Per_Mata_Uang', startrow=2)
         
         # 5️⃣ Sheet Margin Transaksi
         margin_df, tahun_str_margin = buat_margin_transaksi(dashboard_df)
         margin_df.to_excel(writer, index=False, sheet_name='Margin_Transaksi', startrow=2)
         
-        # 6️⃣ Sheet Dashboard (dengan Jenis_Produk)
+        # 6️⃣ Sheet Harian
+        if harian_df is None:
+            harian_df = buat_rekap_harian(dashboard_df)
+        harian_df.to_excel(writer, index=False, sheet_name='Harian', startrow=2)
+        
+        # 7️⃣ Sheet breakdown member & akun (satu indeks grup untuk semua)
+        indeks_grup = buat_indeks_grup(dashboard_df) if not dashboard_df.empty else None
+        member_top_df = buat_member_teratas(dashboard_df, indeks_grup)
+        member_top_df.to_excel(writer, index=False, sheet_name='Member_Teratas', startrow=2)
+        member_sisi_df = buat_member_beli_jual(dashboard_df, indeks_grup)
+        member_sisi_df.to_excel(writer, index=False, sheet_name='Member_Beli_Jual', startrow=2)
+        akun_top_df = buat_akun_teratas(dashboard_df, indeks_grup)
+        akun_top_df.to_excel(writer, index=False, sheet_name='Akun_Teratas', startrow=2)
+        
+        # 8️⃣ Sheet Open Interest
+        oi_df = buat_open_interest(dashboard_df, indeks_grup)
+        oi_df.to_excel(writer, index=False, sheet_name='Open_Interest', startrow=2)
+        tenor_df = buat_struktur_tenor(dashboard_df)
+        tenor_df.to_excel(writer, index=False, sheet_name='Struktur_Tenor', startrow=2)
+        
+        # 9️⃣ Sheet Kualitas Data (ringkasan, per file, contoh baris; bertumpuk)
+        if kualitas is None:
+            kualitas = buat_kualitas_data(dashboard_df)
+        baris_kualitas = 2
+        for kualitas_df in kualitas:
+            kualitas_df.to_excel(writer, index=False, sheet_name='Kualitas_Data', startrow=baris_kualitas)
+            baris_kualitas += len(kualitas_df) + 3
+        
+        # 🔟 Sheet Dashboard (dengan Jenis_Produk)
         dashboard_df.to_excel(writer, index=False, sheet_name='Dashboard')
 
-        # 7️⃣ Sheet bulanan (dengan Jenis_Produk sudah ada dari process_file)
-        for sheet_name, df_month in sorted_sheets:
+        # 1️⃣1️⃣ Sheet bulanan (partisi dari partisi_bulanan dimaterialisasi satu per satu)
+        for sheet_name in sorted_sheets:
+            df_month = sheet_map[sheet_name]
+            if callable(df_month):
+                df_month = df_month()
             df_month.to_excel(writer, index=False, sheet_name=sheet_name)
+            del df_month
 
         # === Format Excel === #
         workbook = writer.book
@@ -398,6 +1547,8 @@ def write_output(dashboard_df, sheet_map, output_file):
         fmt_percent = workbook.add_format({'align':'right', 'num_format':'0.00%'})
         fmt_bold = workbook.add_format({'bold': True, 'align':'right', 'num_format':'#,##0'})
         fmt_bold_decimal = workbook.add_format({'bold': True, 'align':'right', 'num_format':'#,##0.00'})
+        fmt_bold_total = workbook.add_format({'bold': True})
+        fmt_date = workbook.add_format({'num_format': 'yyyy-mm-dd'})
         fmt_title = workbook.add_format({
             'bold': True, 'font_size': 14, 'align': 'center', 'valign': 'vcenter'
         })
@@ -419,30 +1570,20 @@ def write_output(dashboard_df, sheet_map, output_file):
         ws_breakdown = writer.sheets['Breakdown_Volume_Transaksi']
         
         judul_breakdown = f"VOLUME TRANSAKSI PERIODE {tahun_str_breakdown}"
-        num_cols = len(list_tahun) + 2
+        num_cols = len(breakdown_df.columns)
         ws_breakdown.merge_range(0, 0, 0, num_cols - 1, judul_breakdown, fmt_title)
         
         ws_breakdown.write(2, 0, 'Jenis Produk', fmt_header_center)
-        for idx, tahun in enumerate(list_tahun, start=1):
-            ws_breakdown.write(2, idx, 'Lot', fmt_header_center)
-        ws_breakdown.write(2, num_cols - 1, '', fmt_header_center)
+        ws_breakdown.write_row(2, 1, ['Lot'] * len(list_tahun) + ['YoY'] * (len(list_tahun) - 1) + ['CAGR'],
+                               fmt_header_center)
         
         ws_breakdown.set_column(0, 0, 18)
-        for idx in range(1, len(list_tahun) + 1):
-            ws_breakdown.set_column(idx, idx, 12, fmt_integer)
-        ws_breakdown.set_column(num_cols - 1, num_cols - 1, 15, fmt_decimal)
+        ws_breakdown.set_column(1, len(list_tahun), 12, fmt_integer)
+        ws_breakdown.set_column(len(list_tahun) + 1, num_cols - 1, 15, fmt_percent)
         
         last_row_breakdown = len(breakdown_df) + 3
-        for col_idx in range(1, num_cols):
-            cell_value = breakdown_df.iloc[-1, col_idx]
-            if col_idx == num_cols - 1:
-                ws_breakdown.write(last_row_breakdown, col_idx, cell_value / 100, fmt_bold)
-            else:
-                ws_breakdown.write(last_row_breakdown, col_idx, cell_value, fmt_bold)
-        
-        for row_idx in range(4, last_row_breakdown):
-            cell_value = breakdown_df.iloc[row_idx - 4, num_cols - 1]
-            ws_breakdown.write(row_idx, num_cols - 1, cell_value / 100, fmt_percent)
+        ws_breakdown.conditional_format(last_row_breakdown, 0, last_row_breakdown, num_cols - 1,
+                                        {'type': 'no_errors', 'format': fmt_bold_total})
         
         # === Format Sheet Nilai_Transaksi_RP === #
         ws_nilai_rp = writer.sheets['Nilai_Transaksi_RP']
@@ -471,12 +1612,47 @@ def write_output(dashboard_df, sheet_map, output_file):
         last_row_margin = len(margin_df) + 2
         ws_margin.write(last_row_margin, 1, margin_df.iloc[-1]['Margin Transaksi (Rp)'], fmt_bold_decimal)
         
+        # === Format Sheet Ringkasan Tambahan === #
+        def format_tabel(worksheet, df, judul, fmt_angka=None):
+            worksheet.merge_range(0, 0, 0, max(len(df.columns) - 1, 1), judul, fmt_title)
+            for col_idx, col_name in enumerate(df.columns):
+                kolom = df[col_name]
+                if pd.api.types.is_datetime64_any_dtype(kolom):
+                    worksheet.set_column(col_idx, col_idx, 12, fmt_date)
+                elif col_name in ('Peringkat', 'Member', 'Akun') or not pd.api.types.is_numeric_dtype(kolom):
+                    worksheet.set_column(col_idx, col_idx, 15)
+                elif fmt_angka is not None:
+                    worksheet.set_column(col_idx, col_idx, 15, fmt_angka)
+                elif 'Lot' in col_name or col_name.startswith(('Jumlah', 'Tenor')):
+                    worksheet.set_column(col_idx, col_idx, 15, fmt_integer)
+                else:
+                    worksheet.set_column(col_idx, col_idx, 20, fmt_decimal)
+
+        if 'Nilai_Per_Mata_Uang' in writer.sheets:
+            format_tabel(writer.sheets['Nilai_Per_Mata_Uang'], mata_uang_df,
+                         f"NILAI TRANSAKSI PER MATA UANG PERIODE {tahun_str_rekap}")
+        format_tabel(writer.sheets['Harian'], harian_df,
+                     f"REKAP HARIAN PER JENIS PRODUK PERIODE {tahun_str_rekap}")
+        format_tabel(writer.sheets['Member_Teratas'], member_top_df,
+                     f"TOP {TOP_N_MEMBER} MEMBER PER BULAN PERIODE {tahun_str_rekap}")
+        format_tabel(writer.sheets['Member_Beli_Jual'], member_sisi_df,
+                     f"VOLUME BELI VS JUAL PER MEMBER PERIODE {tahun_str_rekap}")
+        format_tabel(writer.sheets['Akun_Teratas'], akun_top_df,
+                     f"TOP {TOP_N_AKUN} AKUN PERIODE {tahun_str_rekap}")
+        format_tabel(writer.sheets['Open_Interest'], oi_df,
+                     f"OPEN INTEREST AKHIR BULAN (LOT) PERIODE {tahun_str_rekap}", fmt_integer)
+        format_tabel(writer.sheets['Struktur_Tenor'], tenor_df,
+                     f"STRUKTUR TENOR BULAN TRADE × BULAN KONTRAK PERIODE {tahun_str_rekap}")
+        ws_kualitas = writer.sheets['Kualitas_Data']
+        ws_kualitas.merge_range(0, 0, 0, 3, f"KUALITAS DATA ({len(dashboard_df):,} BARIS) PERIODE {tahun_str_rekap}",
+                                fmt_title)
+        ws_kualitas.set_column(0, 0, 28)
+        ws_kualitas.set_column(1, 2, 15)
+        ws_kualitas.set_column(3, 3, 45)
+        ws_kualitas.set_column(4, 8, 18)
+        
         # === Format Sheet Dashboard dan Bulanan === #
-        for sheet_name in writer.sheets:
-            if sheet_name in ['Rekap_Volume_Transaksi', 'Breakdown_Volume_Transaksi', 
-                             'Nilai_Transaksi_RP', 'Nilai_transaksi_USD', 'Margin_Transaksi']:
-                continue
-                
+        for sheet_name in ['Dashboard'] + sorted_sheets:
             worksheet = writer.sheets[sheet_name]
             
             if 'Notional_Value_USD' in dashboard_df.columns:
@@ -495,23 +1671,320 @@ def write_output(dashboard_df, sheet_map, output_file):
     print(f"✅ Selesai. File output: {output_file}")
     print(f"📊 Total sheet yang dibuat: {len(writer.sheets)}")
 
-# === 1️⃣1️⃣ Main Routine === #
+# Output terpisah: satu workbook per tahun / Jenis_Produk, ditulis paralel.
+# Frame penuh dibagikan ke worker lewat initializer (fork: tanpa pickle),
+# tiap tugas hanya membawa posisi baris bagiannya.
+PISAH_PER = ('tahun', 'produk')
+_STATE_PISAH = {}
+
+def kelompok_pisah(dashboard_df, per='tahun'):
+    """
+    {label: posisi baris} per tahun DateTrade atau per Jenis_Produk, urut
+    label. Baris tanpa tanggal / produk masuk label 'Unknown'.
+    """
+    if per == 'tahun':
+        kunci = dashboard_df['DateTrade'].dt.year
+    elif per == 'produk':
+        kunci = dashboard_df['Jenis_Produk']
+    else:
+        raise ValueError(f"per harus salah satu dari {', '.join(PISAH_PER)}")
+
+    kode, label = pd.factorize(kunci, sort=True)
+    urutan = np.argsort(kode, kind='stable')
+    grup = np.split(urutan, np.flatnonzero(np.diff(kode[urutan])) + 1)
+    hasil = {}
+    for idx in grup:
+        if len(idx):
+            k = kode[idx[0]]
+            hasil['Unknown' if k < 0 else str(label[k])] = idx
+    return hasil
+
+def _init_worker_pisah(dashboard_df):
+    _STATE_PISAH['df'] = dashboard_df
+
+def _tulis_bagian(output_file, idx):
+    bagian = _STATE_PISAH['df'].take(idx)
+    bagian.index = pd.RangeIndex(len(bagian))
+    write_output(bagian, partisi_bulanan(bagian), output_file)
+    return output_file
+
+def tulis_output_terpisah(dashboard_df, output_zip, per='tahun', workers=None):
+    """
+    Tulis satu workbook lengkap (ringkasan + Dashboard + sheet bulanan) per
+    tahun atau per Jenis_Produk secara paralel di process pool, lalu bundel
+    ke satu arsip zip. Workbook xlsx sudah terkompresi, jadi zip disimpan
+    tanpa kompresi ulang.
+    """
+    kelompok = kelompok_pisah(dashboard_df, per)
+    if not kelompok:
+        raise ValueError("Tidak ada data untuk ditulis")
+
+    folder = tempfile.mkdtemp(prefix='.pisah_', dir=os.path.dirname(os.path.abspath(output_zip)))
+    stem = os.path.splitext(os.path.basename(output_zip))[0]
+    tugas = [(os.path.join(folder, f"{stem}_{re.sub(r'[^0-9A-Za-z_-]+', '_', label)}.xlsx"), idx)
+             for label, idx in kelompok.items()]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tugas)))
+
+    try:
+        mulai = time.perf_counter()
+        if workers == 1:
+            _init_worker_pisah(dashboard_df)
+            files = [_tulis_bagian(*t) for t in tugas]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_pisah,
+                                     initargs=(dashboard_df,)) as pool:
+                files = list(pool.map(_tulis_bagian, *zip(*tugas)))
+
+        tmp_zip = output_zip + '.tmp'
+        with zipfile.ZipFile(tmp_zip, 'w', zipfile.ZIP_STORED) as zf:
+            for f in files:
+                zf.write(f, os.path.basename(f))
+        os.replace(tmp_zip, output_zip)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"✅ {len(files)} workbook per {per} ({workers} proses, {time.perf_counter() - mulai:.1f} detik): {output_zip}")
+    return output_zip
+
+# === 1️⃣5️⃣ Daemon Pantau Folder === #
+def _hash_file(file_path, ukuran_blok=1 << 20):
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for blok in iter(lambda: f.read(ukuran_blok), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+def _pindai_folder(input_folder, pattern, abaikan=()):
+    """Snapshot {path: (mtime_ns, size)} file yang cocok dengan pattern."""
+    snapshot = {}
+    for file_path in glob.glob(os.path.join(input_folder, pattern)):
+        nama = os.path.basename(file_path)
+        # Lock file Excel (~$...) dan file output sendiri tidak ikut diproses
+        if nama.startswith('~$') or os.path.abspath(file_path) in abaikan:
+            continue
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def pantau_folder(input_folder, kurs_file, output_file, harian_file=None, pattern='*.xlsx',
+                  interval=INTERVAL_PANTAU, debounce=DEBOUNCE_PANTAU, kurs_lain=None,
+                  indeks_dedup=None, **kwargs):
+    """
+    Daemon: pantau input_folder dan bangun ulang workbook (+ ekspor kolumnar
+    rekap harian) setiap ada file baru/berubah.
+    - JISDOR (+ kurs_lain {'MYR': path, ...}) dimuat sekali untuk seluruh
+      umur proses.
+    - Perubahan dideteksi dari mtime + ukuran, lalu dikonfirmasi dengan hash
+      isi (file yang hanya di-touch tidak diproses ulang).
+    - Hanya file baru/berubah yang dibaca ulang; hasil baca_trade file lain
+      disimpan di memori.
+    - Rentetan file yang datang beruntun di-debounce: batch diproses setelah
+      folder tidak berubah selama `debounce` detik.
+    - Trade ID duplikat lintas file dibuang; dengan indeks_dedup (folder)
+      ID yang sudah tercatat milik file lain juga dibuang.
+    - Rekap harian diperbarui inkremental (perbarui_rekap_harian) saat hanya
+      ada file baru; file dihapus/ditulis ulang memicu hitung ulang penuh.
+    """
+    kurs_df = load_kurs_multi({MATA_UANG_JISDOR: kurs_file, **(kurs_lain or {})})
+    print(f"✅ Kurs dimuat sekali: {len(kurs_df['kunci'])} baris, mata uang {', '.join(kurs_df['mata_uang'])}")
+    print(f"👀 Memantau {input_folder} ({pattern}), debounce {debounce} detik. Ctrl+C untuk berhenti.")
+
+    indeks = buka_indeks_dedup(indeks_dedup) if indeks_dedup else None
+    abaikan = {os.path.abspath(output_file)}
+    status = {}   # path -> (mtime_ns, size, sha256)
+    frames = {}   # path -> hasil baca_trade + lengkapi_trade (kolom turunan & kurs per baris)
+    rekap = {}    # rekap harian terakhir + baris dipakai per file (lihat bangun_ulang_output)
+    snapshot_terakhir = None
+    snapshot_diproses = {}
+    waktu_berubah = time.monotonic()
+
+    try:
+        while True:
+            snapshot = _pindai_folder(input_folder, pattern, abaikan)
+            sekarang = time.monotonic()
+
+            if snapshot != snapshot_terakhir:
+                snapshot_terakhir = snapshot
+                waktu_berubah = sekarang
+            elif snapshot != snapshot_diproses and sekarang - waktu_berubah >= debounce:
+                ada_perubahan, file_baru = _proses_perubahan(snapshot, status, frames, indeks,
+                                                             kurs_df=kurs_df, **kwargs)
+                if ada_perubahan:
+                    bangun_ulang_output(frames, output_file, harian_file, indeks,
+                                        rekap=rekap, file_baru=file_baru)
+                snapshot_diproses = snapshot
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n🛑 Pemantauan dihentikan.")
+
+def _proses_perubahan(snapshot, status, frames, indeks=None, kurs_df=None, **kwargs):
+    """
+    Baca ulang file baru/berubah; frame langsung dilengkapi (lengkapi_trade)
+    sehingga file yang tidak berubah tidak dihitung ulang saat dashboard
+    dibangun ulang. Return (ada_perubahan, file_baru):
+    ada_perubahan True jika dashboard perlu dibangun ulang; file_baru daftar
+    path yang baru masuk, atau None jika ada frame lama yang dihapus /
+    ditulis ulang (rekap harian harus dihitung ulang penuh).
+    """
+    ada_perubahan = False
+    file_baru = []
+
+    for file_path in [p for p in status if p not in snapshot]:
+        print(f"🗑️ File dihapus: {os.path.basename(file_path)}")
+        status.pop(file_path)
+        if indeks is not None:
+            lepas_sumber_dedup(indeks, os.path.basename(file_path))
+        if frames.pop(file_path, None) is not None:
+            ada_perubahan, file_baru = True, None
+
+    for file_path, (mtime_ns, ukuran) in sorted(snapshot.items()):
+        lama = status.get(file_path)
+        if lama and lama[:2] == (mtime_ns, ukuran):
+            continue
+        try:
+            hash_isi = _hash_file(file_path)
+        except OSError as e:
+            print(f"⚠️ Tidak bisa membaca {os.path.basename(file_path)}: {e}")
+            continue
+
+        status[file_path] = (mtime_ns, ukuran, hash_isi)
+        if lama and lama[2] == hash_isi:
+            continue
+
+        sudah_ada = file_path in frames
+        try:
+            frames[file_path] = lengkapi_trade(baca_trade(file_path), kurs_df, **kwargs)
+            ada_perubahan = True
+        except Exception as e:
+            # Dicoba lagi saat file berubah lagi (mis. masih setengah tersalin)
+            print(f"⚠️ Gagal memproses {os.path.basename(file_path)}: {e}")
+            if frames.pop(file_path, None) is None:
+                continue
+            ada_perubahan = True
+        if sudah_ada:
+            file_baru = None
+        elif file_baru is not None:
+            file_baru.append(file_path)
+
+    return ada_perubahan, file_baru
+
+def _rekap_harian_daemon(dashboard_df, laporan, rekap, file_baru):
+    """
+    Rekap harian untuk bangun_ulang_output. Inkremental jika rekap (state
+    daemon) berisi rekap sebelumnya, hanya ada file baru, dan baris dipakai
+    file lama tidak berubah (dedup tidak menggeser baris lama); selain itu
+    dihitung ulang penuh. rekap diperbarui in-place.
+    """
+    dipakai = dict(zip(laporan['Sumber'], laporan['Baris_Dipakai'].astype(int)))
+    harian_df = None
+    if rekap.get('harian') is not None and file_baru is not None:
+        nama_baru = {os.path.basename(p) for p in file_baru}
+        lama = rekap['dipakai']
+        if set(lama) | nama_baru == set(dipakai) and all(dipakai[s] == n for s, n in lama.items()):
+            # dashboard_df = concat frame per file sesuai urutan laporan (lihat buat_kualitas_data)
+            baris_baru = np.repeat(laporan['Sumber'].isin(nama_baru).to_numpy(),
+                                   laporan['Baris_Dipakai'].to_numpy(dtype=np.int64))
+            harian_df = perbarui_rekap_harian(rekap['harian'], dashboard_df[baris_baru])
+            print(f"📈 Rekap harian diperbarui inkremental: {int(baris_baru.sum())} transaksi baru")
+    if harian_df is None:
+        harian_df = buat_rekap_harian(dashboard_df)
+    rekap['harian'], rekap['dipakai'] = harian_df, dipakai
+    return harian_df
+
+def bangun_ulang_output(frames, output_file, harian_file=None, indeks=None,
+                        rekap=None, file_baru=None):
+    """
+    Gabungkan frame tersimpan (sudah dilengkapi _proses_perubahan) lalu tulis
+    ulang workbook & rekap harian.
+    rekap: state daemon (dict) untuk pembaruan rekap harian inkremental;
+    file_baru: hasil _proses_perubahan (None = hitung ulang penuh).
+    """
+    mulai = time.monotonic()
+    urutan = sorted(frames)
+    bersih, laporan = dedup_trade([frames[p] for p in urutan], [os.path.basename(p) for p in urutan], indeks)
+    cetak_laporan_dedup(laporan)
+    dashboard_df, sheet_map = gabung_trade(bersih, None)
+    if dashboard_df.empty:
+        print("⚠️ Tidak ada transaksi valid, output tidak diperbarui")
+        if rekap is not None:
+            rekap.clear()
+        return False
+
+    if rekap is None:
+        harian_df = buat_rekap_harian(dashboard_df)
+    else:
+        harian_df = _rekap_harian_daemon(dashboard_df, laporan, rekap, file_baru)
+    kualitas = buat_kualitas_data(dashboard_df, laporan)
+    cetak_kualitas_data(kualitas)
+    try:
+        write_output(dashboard_df, sheet_map, output_file, harian_df=harian_df, kualitas=kualitas)
+    except OSError as e:
+        # Mis. workbook sedang dibuka di Excel; dicoba lagi pada batch berikutnya
+        print(f"⚠️ Gagal menulis {output_file}: {e}")
+        return False
+    if harian_file and tulis_kolumnar(harian_df, harian_file):
+        print(f"✅ Rekap harian diekspor: {harian_file}")
+
+    print(f"🔄 Dashboard dibangun ulang: {len(dashboard_df)} transaksi dari {len(frames)} file "
+          f"({time.monotonic() - mulai:.1f} detik)")
+    return True
+
+# === 1️⃣6️⃣ Main Routine === #
 def main():
-    input_folder = 'D:/cod/testDat/trade_history'
-    kurs_file = 'D:/cod/testDat/Informasi_Kurs_Jisdor.xlsx'
-    output_file = 'dashboard_v6_with_jenis_produk.xlsx'
+    parser = argparse.ArgumentParser(description='Dashboard trade history V6 (dengan Jenis_Produk)')
+    parser.add_argument('--input', default='D:/cod/testDat/trade_history', help='Folder file trade history')
+    parser.add_argument('--kurs', default='D:/cod/testDat/Informasi_Kurs_Jisdor.xlsx', help='File kurs JISDOR')
+    parser.add_argument('--kurs-lain', action='append', metavar='MATA_UANG=FILE',
+                        help='File kurs mata uang lain (Rupiah per 1 unit), boleh berulang')
+    parser.add_argument('--output', default='dashboard_v6_with_jenis_produk.xlsx', help='Workbook output')
+    parser.add_argument('--harian', default='dashboard_v6_harian.parquet', help='Ekspor Parquet rekap harian')
+    parser.add_argument('--indeks-dedup', metavar='FOLDER',
+                        help='Folder indeks persisten Trade ID (buang ID yang sudah diproses dari file lain)')
+    parser.add_argument('--watch', action='store_true', help='Jalan terus sebagai daemon dan pantau folder input')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_PANTAU, help='Detik tanpa perubahan sebelum batch diproses')
+    parser.add_argument('--pisah', choices=list(PISAH_PER),
+                        help='Satu workbook per tahun / Jenis_Produk, dibundel ke <output>.zip')
+    parser.add_argument('--workers', type=int, help='Jumlah proses untuk --pisah (default: jumlah CPU)')
+    parser.add_argument('--kualitas-json', metavar='FILE', help='Tulis laporan kualitas data ke file JSON')
+    args = parser.parse_args()
+
+    input_folder = args.input
+    kurs_file = args.kurs
+    output_file = args.output
+    harian_file = args.harian
+    kurs_lain = parse_file_kurs(args.kurs_lain)
+
+    if args.watch:
+        pantau_folder(
+            input_folder,
+            kurs_file,
+            output_file,
+            harian_file,
+            debounce=args.debounce,
+            kurs_lain=kurs_lain,
+            indeks_dedup=args.indeks_dedup,
+            rate_spot=5_000_000,
+            rate_remote=3_500_000
+        )
+        return
 
     print("=" * 60)
     print("🚀 MEMULAI PROSES PENGOLAHAN DATA TRADE HISTORY")
     print("   [UPGRADE V6] Dengan Kolom Jenis_Produk di Setiap Sheet")
     print("=" * 60)
     
-    kurs_df = load_jisdor(kurs_file)
-    print(f"✅ Kurs JISDOR berhasil dimuat: {len(kurs_df)} baris")
+    kurs_df = load_kurs_multi({MATA_UANG_JISDOR: kurs_file, **kurs_lain})
+    print(f"✅ Kurs berhasil dimuat: {len(kurs_df['kunci'])} baris ({', '.join(kurs_df['mata_uang'])})")
 
-    dashboard_df, sheet_map = process_folder(
+    dashboard_df, sheet_map, laporan_dedup = process_folder(
         input_folder,
         kurs_df,
+        indeks_dedup=args.indeks_dedup,
+        dengan_laporan=True,
         rate_spot=5_000_000,
         rate_remote=3_500_000
     )
@@ -520,7 +1993,21 @@ def main():
     print(f"✅ Sheet bulanan yang dibuat: {len(sheet_map)} sheet")
     print(f"✅ Kolom 'Jenis_Produk' ditambahkan ke semua sheet bulanan")
 
-    write_output(dashboard_df, sheet_map, output_file)
+    kualitas = buat_kualitas_data(dashboard_df, laporan_dedup)
+    cetak_kualitas_data(kualitas)
+    if args.kualitas_json:
+        with open(args.kualitas_json, 'w', encoding='utf-8') as f:
+            json.dump(kualitas_ke_json(kualitas), f, ensure_ascii=False, indent=2)
+        print(f"✅ Laporan kualitas data: {args.kualitas_json}")
+
+    harian_df = buat_rekap_harian(dashboard_df)
+    if args.pisah:
+        output_file = os.path.splitext(output_file)[0] + '.zip'
+        tulis_output_terpisah(dashboard_df, output_file, per=args.pisah, workers=args.workers)
+    else:
+        write_output(dashboard_df, sheet_map, output_file, harian_df=harian_df, kualitas=kualitas)
+    if tulis_kolumnar(harian_df, harian_file):
+        print(f"✅ Rekap harian diekspor: {harian_file}")
     
     print("=" * 60)
     print("🎉 PROSES SELESAI!")
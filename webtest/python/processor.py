@@ -6,9 +6,11 @@ FIX: Handle encoding issue di Windows (UTF-8)
 """
 
 import argparse
+import importlib
 import sys
 import os
-import pandas as pd
+import json
+import time
 import io
 
 # FIX: Set UTF-8 encoding untuk stdout di Windows
@@ -20,27 +22,629 @@ if sys.platform == 'win32':
 # PENTING: Setup path untuk import module Python original
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from dashboard_v6_dengan_jenis_produk import (
-        load_jisdor,
-        process_file,
-        write_output,
-        buat_rekap_volume,
-        buat_breakdown_volume,
-        buat_nilai_transaksi_rp,
-        buat_nilai_transaksi_usd,
-        buat_margin_transaksi,
-        MONTH_MAP,
-        MONTH_REV,
-        MONTH_NAME_ID,
-        CONTRACT_SIZE_PER_LOT
-    )
-    print("[OK] Successfully imported functions from dashboard_v6_dengan_jenis_produk.py")
-except ImportError as e:
-    print(f"[ERROR] Error importing functions: {e}")
-    print(f"        Current directory: {os.getcwd()}")
-    print(f"        Script directory: {os.path.dirname(os.path.abspath(__file__))}")
-    sys.exit(1)
+from sniff import sniff_file, JENIS_JISDOR, JENIS_TRADE_WEBTEST, JENIS_UNKNOWN
+
+# Layout trade yang dipakai modul dashboard di folder ini
+JENIS_TRADE = JENIS_TRADE_WEBTEST
+
+# Modul berat (NumPy, pandas, modul dashboard) baru dimuat lewat muat_modul()
+# setelah argumen dan file input lolos validasi, sehingga --help, error
+# argumen dan file yang hilang / salah layout tidak membayar biaya import.
+# Sampai saat itu ketiganya None; fungsi modul dashboard selalu dipanggil
+# lewat dashboard.<nama>. Library opsional (openpyxl, xlsxwriter, pyarrow)
+# dimuat hanya untuk mode yang memakainya.
+np = None
+pd = None
+dashboard = None
+WAKTU_IMPOR = {}  # nama modul → detik, diisi impor()
+
+
+def impor(nama):
+    """importlib.import_module + catat durasinya (≈0 jika sudah dimuat modul lain)."""
+    mulai = time.perf_counter()
+    modul = importlib.import_module(nama)
+    WAKTU_IMPOR.setdefault(nama, time.perf_counter() - mulai)
+    return modul
+
+
+def muat_modul(*opsional):
+    """
+    Isi np, pd dan dashboard (modul dashboard_v6_dengan_jenis_produk) sekali
+    per proses (juga dipakai sebagai initializer worker), lalu library
+    opsional. Library opsional yang tidak terpasang dilewati di sini; fungsi
+    pemakainya yang melaporkan.
+    """
+    global np, pd, dashboard
+    if dashboard is None:
+        np = impor('numpy')
+        pd = impor('pandas')
+        try:
+            dashboard = impor('dashboard_v6_dengan_jenis_produk')
+        except ImportError as e:
+            print(f"[ERROR] Error importing functions: {e}")
+            print(f"        Current directory: {os.getcwd()}")
+            print(f"        Script directory: {os.path.dirname(os.path.abspath(__file__))}")
+            sys.exit(1)
+        print("[OK] Successfully imported functions from dashboard_v6_dengan_jenis_produk.py")
+
+    for nama in opsional:
+        try:
+            impor(nama)
+        except ImportError:
+            pass
+
+
+def cetak_waktu_impor():
+    for nama, detik in WAKTU_IMPOR.items():
+        print(f"[IMPORT] {nama:<34} {detik * 1000:8.1f} ms")
+    print(f"[IMPORT] {'total':<34} {sum(WAKTU_IMPOR.values()) * 1000:8.1f} ms")
+
+
+def periksa_input(jisdor_file, trade_files, rate_specs=None):
+    """
+    Validasi awal tanpa pandas: semua file ada, lalu header tiap file
+    di-sniff (sniff.py, hanya beberapa baris pertama). File trade yang jelas
+    ber-layout lain dilewati dengan [ERROR] (seperti file yang gagal dibaca);
+    layout tak dikenali hanya diberi [WARN] karena kolom dibaca posisional.
+    → daftar file trade yang dipakai.
+    """
+    if not os.path.exists(jisdor_file):
+        raise FileNotFoundError(f"JISDOR file tidak ditemukan: {jisdor_file}")
+    for spec in rate_specs or []:
+        rate_file = spec.partition('=')[2].strip()
+        if rate_file and not os.path.exists(rate_file):
+            raise FileNotFoundError(f"Rate file tidak ditemukan: {rate_file}")
+    for trade_file in trade_files:
+        if not os.path.exists(trade_file):
+            raise FileNotFoundError(f"Trade history file tidak ditemukan: {trade_file}")
+
+    def jenis(path):
+        hasil = sniff_file(path)
+        # Format yang tidak bisa di-sniff (mis. .xls) diserahkan ke pandas
+        return None if hasil['error'] and not hasil['sheet'] else hasil['kind']
+
+    jenis_jisdor = jenis(jisdor_file)
+    if jenis_jisdor not in (None, JENIS_UNKNOWN, JENIS_JISDOR):
+        raise ValueError(f"{os.path.basename(jisdor_file)}: expected JISDOR file, got {jenis_jisdor} layout")
+
+    dipakai = []
+    for trade_file in trade_files:
+        nama = os.path.basename(trade_file)
+        kind = jenis(trade_file)
+        if kind in (None, JENIS_TRADE):
+            dipakai.append(trade_file)
+        elif kind == JENIS_UNKNOWN:
+            print(f"[WARN] {nama}: header not recognized, reading columns by position")
+            dipakai.append(trade_file)
+        else:
+            print(f"[ERROR] {nama}: expected {JENIS_TRADE} layout, got {kind} - skipped")
+    return dipakai
+
+
+# --split-by → per pada tulis_output_terpisah
+SPLIT_BY = {'year': 'tahun', 'product': 'produk'}
+
+
+def tabel_ke_json(df):
+    """DataFrame → {"columns": [...], "data": [[...], ...]} (NaN → null)."""
+    return json.loads(df.to_json(orient='split', index=False, date_format='iso'))
+
+
+def hitung_tabel_ringkasan(dashboard_df):
+    """Tabel ringkasan dari builder buat_* → ({nama: DataFrame}, periode, list_tahun)."""
+    rekap_df, tahun_str = dashboard.buat_rekap_volume(dashboard_df)
+    breakdown_df, _, list_tahun = dashboard.buat_breakdown_volume(dashboard_df)
+    tabel = {
+        'rekap_volume': rekap_df,
+        'breakdown_volume': breakdown_df,
+        'nilai_transaksi_rp': dashboard.buat_nilai_transaksi_rp(dashboard_df)[0],
+        'nilai_transaksi_usd': dashboard.buat_nilai_transaksi_usd(dashboard_df)[0],
+        'margin_transaksi': dashboard.buat_margin_transaksi(dashboard_df)[0],
+        'nilai_per_mata_uang': dashboard.buat_nilai_per_mata_uang(dashboard_df),
+        'struktur_tenor': dashboard.buat_struktur_tenor(dashboard_df),
+    }
+    return tabel, tahun_str, list_tahun
+
+
+def buat_ringkasan(dashboard_df, laporan_dedup=None, tabel_ringkasan=None, kualitas=None):
+    """
+    Ringkasan dari builder buat_* dalam bentuk dict siap-JSON untuk
+    dashboard di browser (tanpa menulis Excel). kualitas: hasil
+    buat_kualitas_data; jika None dihitung di sini (satu lintasan vektor).
+    """
+    tabel, tahun_str, list_tahun = tabel_ringkasan or hitung_tabel_ringkasan(dashboard_df)
+    if kualitas is None:
+        kualitas = dashboard.buat_kualitas_data(dashboard_df, laporan_dedup)
+
+    return {
+        'periode': tahun_str,
+        'total_transaksi': int(len(dashboard_df)),
+        'list_tahun': [int(t) for t in list_tahun],
+        **{nama: tabel_ke_json(df) for nama, df in tabel.items()},
+        'duplikat_per_file': tabel_ke_json(laporan_dedup) if laporan_dedup is not None else None,
+        'kualitas_data': dashboard.kualitas_ke_json(kualitas),
+    }
+
+
+def _tulis_json(data, output_file):
+    # File sementara per proses: /api/process dan /api/summary bisa menulis key yang sama bersamaan
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, output_file)
+
+
+def tulis_ringkasan_json(dashboard_df, output_file, laporan_dedup=None, kualitas=None):
+    """Tulis ringkasan ke file JSON ringkas (tanpa spasi)."""
+    ringkasan = buat_ringkasan(dashboard_df, laporan_dedup, kualitas=kualitas)
+    _tulis_json(ringkasan, output_file)
+    return ringkasan
+
+
+def cetak_kualitas(kualitas):
+    """Satu baris [QUALITY] per pemeriksaan yang menemukan anomali."""
+    ringkasan_df = kualitas[0]
+    for baris in ringkasan_df.iloc[:-1].itertuples(index=False):
+        if baris.Jumlah_Baris:
+            print(f"[QUALITY] {baris.Pemeriksaan}: {baris.Jumlah_Baris} row(s) "
+                  f"({baris.Persen_Baris:.2f}%) - {baris.Keterangan}")
+    if len(ringkasan_df) and not ringkasan_df['Jumlah_Baris'].iloc[-1]:
+        print("[OK] Data quality: no anomalies found")
+
+
+def tulis_artefak_arrow(dashboard_df, folder, laporan_dedup=None, harian_df=None, kualitas=None):
+    """
+    Tulis dashboard_df dan tabel agregat sebagai file Arrow IPC (bisa
+    di-memory-map, lihat baca_arrow) ke folder, plus manifest.json berisi
+    jumlah baris, kolom tiap file dan ringkasan JSON. Go server membaca
+    manifest.json untuk row count & ringkasan tanpa menjalankan Python.
+    """
+    os.makedirs(folder, exist_ok=True)
+    tabel_ringkasan = hitung_tabel_ringkasan(dashboard_df)
+    tabel = {'dashboard': dashboard_df, **tabel_ringkasan[0]}
+    if harian_df is not None:
+        tabel['harian'] = harian_df
+    if laporan_dedup is not None:
+        tabel['duplikat_per_file'] = laporan_dedup
+
+    files = {}
+    for nama, df in tabel.items():
+        if dashboard.tulis_arrow(df, os.path.join(folder, f"{nama}.arrow")) is None:
+            return None
+        files[nama] = {
+            'file': f"{nama}.arrow",
+            'rows': int(len(df)),
+            'columns': [str(c) for c in df.columns],
+        }
+
+    if tulis_indeks_filter(dashboard_df, folder) is None:
+        return None
+
+    _tulis_json({
+        'format': 'arrow-ipc-file',
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'rows': int(len(dashboard_df)),
+        'files': files,
+        'summary': buat_ringkasan(dashboard_df, laporan_dedup, tabel_ringkasan, kualitas),
+    }, os.path.join(folder, 'manifest.json'))
+    return folder
+
+
+# === Indeks filter (laporan ulang per rentang tanggal / produk / member) === #
+# indeks.arrow: dashboard_df terurut DateTrade (baris tanpa tanggal di akhir)
+# plus kolom kode int32 per produk & member; label kode ada di indeks.json.
+# Rentang tanggal = binary search, produk/member = bitmap lookup per kode.
+FILE_INDEKS = 'indeks.arrow'
+META_INDEKS = 'indeks.json'
+KOLOM_BARIS = '_baris'      # posisi asli baris, agar urutan irisan sama dengan dashboard_df
+KOLOM_KODE_PRODUK = '_kode_produk'
+
+
+def _kolom_member(dashboard_df):
+    """Skema root: Mbr.Buy & Mbr.Sell; skema webtest: Acc (member = akun)."""
+    return ['Mbr.Buy', 'Mbr.Sell'] if 'Mbr.Buy' in dashboard_df.columns else ['Acc']
+
+
+def tulis_indeks_filter(dashboard_df, folder):
+    """
+    Tulis indeks.arrow + indeks.json ke folder artefak. Kode produk/member
+    memakai satu kamus label (teks) bersama; -1 = kosong.
+    """
+    tanggal = dashboard_df['DateTrade'].to_numpy(dtype='datetime64[ns]')
+    ada_tanggal = ~np.isnat(tanggal)
+    urutan = np.argsort(tanggal, kind='stable')  # NumPy mengurutkan NaT ke akhir
+
+    def kode_teks(series):
+        return series.astype(str).where(series.notna())
+
+    kode_produk, label_produk = pd.factorize(kode_teks(dashboard_df['Jenis_Produk']), sort=True)
+    kolom_member = _kolom_member(dashboard_df)
+    _, label_member = pd.factorize(
+        pd.concat([kode_teks(dashboard_df[k]) for k in kolom_member], ignore_index=True), sort=True)
+
+    indeks_df = dashboard_df.take(urutan)
+    indeks_df.index = pd.RangeIndex(len(indeks_df))
+    indeks_df[KOLOM_BARIS] = urutan.astype(np.int64)
+    indeks_df[KOLOM_KODE_PRODUK] = kode_produk[urutan].astype(np.int32)
+    for k in kolom_member:
+        indeks_df[f"_kode_{k}"] = label_member.get_indexer(kode_teks(indeks_df[k])).astype(np.int32)
+
+    if dashboard.tulis_arrow(indeks_df, os.path.join(folder, FILE_INDEKS)) is None:
+        return None
+    n_tanggal = int(ada_tanggal.sum())
+    _tulis_json({
+        'rows': int(len(indeks_df)),
+        'rows_dated': n_tanggal,
+        'date_min': str(tanggal[urutan[0]])[:10] if n_tanggal else None,
+        'date_max': str(tanggal[urutan[n_tanggal - 1]])[:10] if n_tanggal else None,
+        'products': [str(p) for p in label_produk],
+        'members': [str(m) for m in label_member],
+        'member_columns': kolom_member,
+    }, os.path.join(folder, META_INDEKS))
+    return folder
+
+
+def _bitmap_kode(label, dipilih):
+    """Bitmap per kode (+1 slot di akhir agar kode -1 selalu False)."""
+    bitmap = np.zeros(len(label) + 1, dtype=bool)
+    posisi = {nilai: i for i, nilai in enumerate(label)}
+    bitmap[[posisi[v] for v in dipilih if v in posisi]] = True
+    return bitmap
+
+
+def saring_indeks(folder, tanggal_dari=None, tanggal_sampai=None, produk=None, member=None):
+    """
+    Irisan dashboard_df dari indeks.arrow tanpa membaca ulang Excel:
+    tanggal_dari/tanggal_sampai ('YYYY-MM-DD', inklusif) lewat searchsorted
+    pada DateTrade terurut, produk/member lewat bitmap kode. Member cocok
+    bila muncul di salah satu sisi. Hanya baris terpilih yang dikonversi
+    ke pandas. → (DataFrame urut dashboard_df asli, meta indeks)
+    """
+    with open(os.path.join(folder, META_INDEKS), encoding='utf-8') as f:
+        meta = json.load(f)
+    tabel = dashboard.baca_arrow(os.path.join(folder, FILE_INDEKS), sebagai_pandas=False)
+
+    awal, akhir = 0, meta['rows']
+    if tanggal_dari or tanggal_sampai:
+        tanggal = tabel.column('DateTrade').slice(0, meta['rows_dated']).to_numpy()
+        akhir = meta['rows_dated']
+        if tanggal_dari:
+            awal = int(np.searchsorted(tanggal, np.datetime64(tanggal_dari, 'ns'), side='left'))
+        if tanggal_sampai:
+            akhir = int(np.searchsorted(tanggal, np.datetime64(tanggal_sampai, 'D') + 1, side='left'))
+        akhir = max(awal, akhir)
+
+    def kode(kolom):
+        return tabel.column(kolom).slice(awal, akhir - awal).to_numpy()
+
+    pilih = np.ones(akhir - awal, dtype=bool)
+    if produk:
+        pilih &= _bitmap_kode(meta['products'], produk)[kode(KOLOM_KODE_PRODUK)]
+    if member:
+        bitmap = _bitmap_kode(meta['members'], member)
+        cocok = np.zeros(akhir - awal, dtype=bool)
+        for k in meta['member_columns']:
+            cocok |= bitmap[kode(f"_kode_{k}")]
+        pilih &= cocok
+
+    idx = awal + np.flatnonzero(pilih)
+    idx = idx[np.argsort(kode(KOLOM_BARIS)[idx - awal], kind='stable')]
+    kolom_data = [k for k in tabel.column_names if not k.startswith('_')]
+    irisan = tabel.select(kolom_data).take(idx).to_pandas()
+    return irisan, meta
+
+
+def buat_ringkasan_filter(folder, **filter_kw):
+    """buat_ringkasan untuk irisan saring_indeks, plus filter yang dipakai."""
+    mulai = time.perf_counter()
+    irisan, meta = saring_indeks(folder, **filter_kw)
+    waktu_iris = time.perf_counter() - mulai
+    ringkasan = buat_ringkasan(irisan) if len(irisan) else {'periode': None, 'total_transaksi': 0}
+    ringkasan['filter'] = {
+        **{k: v for k, v in filter_kw.items() if v},
+        'baris_total': meta['rows'],
+        'baris_cocok': int(len(irisan)),
+        'waktu_iris_ms': round(waktu_iris * 1000, 1),
+        'waktu_total_ms': round((time.perf_counter() - mulai) * 1000, 1),
+    }
+    return ringkasan
+
+
+# === Preview (sampel baris awal) === #
+PREVIEW_ROWS = 1000   # baris data per file yang dibaca
+PREVIEW_SAMPLE = 20   # baris contoh di output JSON
+
+
+def baca_trade_awal(trade_file, n_rows=PREVIEW_ROWS):
+    """
+    Baca hanya n_rows baris data pertama file trade history (openpyxl
+    read-only, berhenti setelah n_rows) plus jumlah baris dari tag
+    <dimension> sheet. → (df, info); info['total_rows'] None jika sheet
+    tidak punya dimensi (jumlah baris tidak diketahui tanpa scan penuh).
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(trade_file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # Baris 1 judul, baris 2 header asli (sama dengan baca_trade)
+        rows = list(ws.iter_rows(min_row=2, max_row=n_rows + 2, values_only=True))
+        try:
+            dimension = ws.calculate_dimension(force=False)
+            total_rows = max(ws.max_row - 2, 0)
+        except ValueError:
+            dimension, total_rows = None, None
+        info = {'file': os.path.basename(trade_file), 'sheet': ws.title, 'dimension': dimension}
+    finally:
+        wb.close()
+
+    header = list(rows[0]) if rows else []
+    while header and header[-1] is None:
+        header.pop()
+    data = [row[:len(header)] for row in rows[1:] if any(c is not None for c in row)]
+    if not data:
+        raise ValueError("tidak ada baris data")
+
+    df = dashboard.siapkan_kolom_trade(pd.DataFrame(data))
+    info['sample_rows'] = int(len(df))
+    info['total_rows'] = max(total_rows, len(df)) if total_rows is not None else None
+    return df, info
+
+
+def buat_preview(jisdor_file, trade_files, rate_spot, rate_remote, rate_files=None, n_rows=PREVIEW_ROWS):
+    """
+    Preview cepat sebelum job penuh: n_rows baris awal tiap file diperkaya
+    persis seperti gabung_trade (Jenis_Produk, Notional_Value, Margin, kurs)
+    lalu total bulanan diekstrapolasi dengan bobot total_rows / sample_rows
+    per file. Estimasi mengasumsikan baris sampel mewakili seluruh file.
+    """
+    kurs_per_mata_uang = {dashboard.MATA_UANG_JISDOR: dashboard.load_jisdor(jisdor_file)}
+    for mata_uang, rate_file in (rate_files or {}).items():
+        kurs_per_mata_uang[mata_uang] = dashboard.load_jisdor(rate_file)
+    kurs_df = dashboard.buat_penyimpanan_kurs(kurs_per_mata_uang)
+
+    frames, bobot, files = [], [], []
+    for trade_file in trade_files:
+        try:
+            df, info = baca_trade_awal(trade_file, n_rows)
+        except Exception as e:
+            files.append({'file': os.path.basename(trade_file), 'error': str(e)})
+            continue
+        skala = info['total_rows'] / len(df) if info['total_rows'] else 1.0
+        info['date_min'] = df['DateTrade'].min().isoformat() if df['DateTrade'].notna().any() else None
+        info['date_max'] = df['DateTrade'].max().isoformat() if df['DateTrade'].notna().any() else None
+        frames.append(df)
+        bobot.append(np.full(len(df), skala))
+        files.append(info)
+    if not frames:
+        raise ValueError("Tidak ada file trade yang bisa dibaca")
+
+    sampel = dashboard.lengkapi_trade(pd.concat(frames, ignore_index=True), kurs_df, rate_spot, rate_remote)
+    bobot = np.concatenate(bobot)
+    kolom_rp = 'Notional_Value_IDR' if 'Notional_Value_IDR' in sampel.columns else 'Notional_Value'
+
+    waktu = sampel['DateTrade']
+    ada_waktu = waktu.notna().to_numpy()
+    estimasi = pd.DataFrame({
+        'Bulan_Kode': (waktu.dt.year * 12 + waktu.dt.month - 1).to_numpy()[ada_waktu],
+        'Jumlah_Transaksi_Sampel': 1,
+        'Jumlah_Transaksi_Estimasi': bobot[ada_waktu],
+        'Volume_Lot_Estimasi': (sampel[dashboard.KOLOM_LOT].to_numpy(dtype=float) * bobot)[ada_waktu],
+        'Nilai_Transaksi_RP_Estimasi': (sampel[kolom_rp].to_numpy(dtype=float) * bobot)[ada_waktu],
+        'Margin_Estimasi': (sampel['Margin'].to_numpy(dtype=float) * bobot)[ada_waktu],
+    }).groupby('Bulan_Kode').sum().reset_index()
+    kode = estimasi.pop('Bulan_Kode').astype(int)
+    estimasi.insert(0, 'Bulan', [f"{dashboard.MONTH_NAME_ID[k % 12 + 1]} {k // 12}" for k in kode])
+
+    ada_kurs = int(sampel['Kurs_Jisdor'].notna().sum())
+    return {
+        'rows_per_file': int(n_rows),
+        'files': files,
+        'sample_rows': int(len(sampel)),
+        'estimated_rows': int(round(bobot.sum())),
+        'kurs': {
+            'matched': ada_kurs,
+            'unmatched': int(len(sampel)) - ada_kurs,
+            'first_date': kurs_per_mata_uang[dashboard.MATA_UANG_JISDOR]['Tanggal'].min().date().isoformat(),
+            'last_date': kurs_per_mata_uang[dashboard.MATA_UANG_JISDOR]['Tanggal'].max().date().isoformat(),
+        },
+        'sample': tabel_ke_json(sampel.head(PREVIEW_SAMPLE)),
+        'estimated_monthly': tabel_ke_json(estimasi),
+    }
+
+
+# === Batch mode (manifest) === #
+# State bersama untuk worker batch: frame per file trade + penyimpanan kurs.
+# Diisi sekali per proses lewat initializer (fork: diwarisi tanpa pickle).
+_STATE_BATCH = {}
+
+
+def baca_manifest(manifest_path):
+    """
+    Baca manifest JSON batch:
+    {
+      "jisdor": "kurs.xlsx",                  # default untuk semua job
+      "rate_files": {"MYR": "kurs_myr.xlsx"}, # opsional
+      "rate_spot": 5000000, "rate_remote": 3500000,
+      "workers": 4,
+      "jobs": [
+        {"name": "desk-a", "trade_files": ["okt.xlsx", "nov.xlsx"],
+         "output": "desk_a.xlsx", "summary_json": "desk_a.json",
+         "harian_export": "desk_a_harian.parquet", "arrow_dir": "desk_a_arrow"}
+      ]
+    }
+    Setiap job boleh meng-override jisdor, rate_files, rate_spot dan
+    rate_remote. Path relatif dihitung dari folder manifest.
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    folder = os.path.dirname(os.path.abspath(manifest_path))
+    def path_abs(path):
+        return path if path is None else os.path.normpath(os.path.join(folder, path))
+
+    jobs = []
+    for i, job in enumerate(manifest.get('jobs', []), 1):
+        nama = job.get('name') or f"job-{i}"
+        jisdor = path_abs(job.get('jisdor', manifest.get('jisdor')))
+        rate_files = {**manifest.get('rate_files', {}), **job.get('rate_files', {})}
+        rate_files = {k: path_abs(v) for k, v in
+                      dashboard.parse_file_kurs(f"{k}={v}" for k, v in rate_files.items()).items()}
+        trade_files = [path_abs(p) for p in job.get('trade_files', [])]
+
+        if not jisdor:
+            raise ValueError(f"{nama}: JISDOR file tidak ditentukan")
+        if not trade_files:
+            raise ValueError(f"{nama}: trade_files kosong")
+        if not any(job.get(k) for k in ('output', 'summary_json', 'harian_export', 'arrow_dir')):
+            raise ValueError(f"{nama}: butuh output, summary_json, harian_export dan/atau arrow_dir")
+        for path in [jisdor, *rate_files.values(), *trade_files]:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{nama}: file tidak ditemukan: {path}")
+
+        jobs.append({
+            'name': nama,
+            'jisdor': jisdor,
+            'rate_files': rate_files,
+            'kunci_kurs': (jisdor, tuple(sorted(rate_files.items()))),
+            'trade_files': trade_files,
+            'output': path_abs(job.get('output')),
+            'summary_json': path_abs(job.get('summary_json')),
+            'harian_export': path_abs(job.get('harian_export')),
+            'arrow_dir': path_abs(job.get('arrow_dir')),
+            'rate_spot': job.get('rate_spot', manifest.get('rate_spot', 5000000)),
+            'rate_remote': job.get('rate_remote', manifest.get('rate_remote', 3500000)),
+        })
+
+    if not jobs:
+        raise ValueError("Manifest tidak berisi job")
+    return jobs, manifest.get('workers')
+
+
+def _baca_trade_aman(trade_file):
+    try:
+        return trade_file, dashboard.baca_trade(trade_file), None
+    except Exception as e:
+        return trade_file, None, str(e)
+
+
+def _init_worker_batch(state):
+    global _STATE_BATCH
+    muat_modul()
+    _STATE_BATCH = state
+
+
+def _jalankan_job(job):
+    """Enrichment + output satu job dari frame yang sudah diparsing."""
+    mulai = time.time()
+    try:
+        frames, sumber = [], []
+        for trade_file in job['trade_files']:
+            df = _STATE_BATCH['frames'].get(trade_file)
+            if df is not None and not df.empty:
+                frames.append(df)
+                sumber.append(os.path.basename(trade_file))
+        if not frames:
+            raise ValueError("No valid data to process")
+
+        frames, laporan_dedup = dashboard.dedup_trade(frames, sumber)
+        dashboard_df, sheet_map = dashboard.gabung_trade(
+            frames,
+            _STATE_BATCH['kurs'][job['kunci_kurs']],
+            rate_spot=job['rate_spot'],
+            rate_remote=job['rate_remote']
+        )
+        kualitas = dashboard.buat_kualitas_data(dashboard_df, laporan_dedup)
+
+        if job['summary_json']:
+            tulis_ringkasan_json(dashboard_df, job['summary_json'], laporan_dedup, kualitas)
+        harian_df = None
+        if job['output'] or job['harian_export']:
+            harian_df = dashboard.buat_rekap_harian(dashboard_df)
+        if job['output']:
+            dashboard.write_output(dashboard_df, sheet_map, job['output'], harian_df=harian_df, kualitas=kualitas)
+        if job['harian_export']:
+            dashboard.tulis_kolumnar(harian_df, job['harian_export'])
+        if job['arrow_dir']:
+            tulis_artefak_arrow(dashboard_df, job['arrow_dir'], laporan_dedup, harian_df, kualitas)
+
+        return {'name': job['name'], 'success': True, 'rows': int(len(dashboard_df)),
+                'duplicates': int(laporan_dedup['Baris'].sum() - laporan_dedup['Baris_Dipakai'].sum()),
+                'quality_rows': int(kualitas[0]['Jumlah_Baris'].iloc[-1]) if len(kualitas[0]) else 0,
+                'seconds': round(time.time() - mulai, 2)}
+    except Exception as e:
+        return {'name': job['name'], 'success': False, 'error': str(e),
+                'seconds': round(time.time() - mulai, 2)}
+
+
+def jalankan_manifest(manifest_path, workers=None):
+    """
+    Jalankan semua job di manifest: tiap file kurs dimuat sekali, tiap file
+    trade unik diparsing sekali, lalu enrichment + penulisan workbook per job
+    berjalan paralel di beberapa proses.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs, workers_manifest = baca_manifest(manifest_path)
+    workers = max(1, int(workers or workers_manifest or os.cpu_count() or 1))
+    print(f"[INFO] Manifest: {len(jobs)} job(s), {workers} worker(s)")
+
+    # 1. Kurs: tiap file dimuat sekali, satu penyimpanan per kombinasi
+    print("[STEP 1] Loading rate files...")
+    kurs_file = {}
+    kurs = {}
+    for job in jobs:
+        if job['kunci_kurs'] in kurs:
+            continue
+        for path in [job['jisdor'], *job['rate_files'].values()]:
+            if path not in kurs_file:
+                kurs_file[path] = dashboard.load_jisdor(path)
+                print(f"[OK] Loaded {len(kurs_file[path])} rows: {os.path.basename(path)}")
+        kurs[job['kunci_kurs']] = dashboard.buat_penyimpanan_kurs({
+            dashboard.MATA_UANG_JISDOR: kurs_file[job['jisdor']],
+            **{mata_uang: kurs_file[path] for mata_uang, path in job['rate_files'].items()},
+        })
+
+    # 2. Trade files: tiap file unik diparsing sekali (paralel)
+    unik = list(dict.fromkeys(p for job in jobs for p in job['trade_files']))
+    print(f"\n[STEP 2] Parsing {len(unik)} unique trade file(s)...")
+    frames = {}
+    if workers > 1 and len(unik) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(unik)), initializer=muat_modul) as pool:
+            hasil_baca = list(pool.map(_baca_trade_aman, unik))
+    else:
+        hasil_baca = [_baca_trade_aman(p) for p in unik]
+    for trade_file, df, error in hasil_baca:
+        if error:
+            print(f"[ERROR] Error processing {os.path.basename(trade_file)}: {error}")
+            continue
+        frames[trade_file] = df
+        print(f"[OK] {os.path.basename(trade_file)}: {len(df)} transactions")
+
+    # 3. Job paralel
+    print(f"\n[STEP 3] Running {len(jobs)} job(s)...")
+    state = {'frames': frames, 'kurs': kurs}
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                 initializer=_init_worker_batch, initargs=(state,)) as pool:
+            hasil = list(pool.map(_jalankan_job, jobs))
+    else:
+        _init_worker_batch(state)
+        hasil = [_jalankan_job(job) for job in jobs]
+
+    gagal = 0
+    for h in hasil:
+        if h['success']:
+            print(f"[JOB] {h['name']}: OK, {h['rows']} transactions, "
+                  f"{h['duplicates']} duplicate(s) dropped ({h['seconds']}s)")
+        else:
+            gagal += 1
+            print(f"[JOB] {h['name']}: FAILED - {h['error']}")
+
+    print("=" * 70)
+    print(f"[{'SUCCESS' if not gagal else 'ERROR'}] {len(hasil) - gagal}/{len(hasil)} job(s) completed")
+    print("=" * 70)
+    return 0 if not gagal else 1
 
 
 def main():
@@ -50,90 +654,236 @@ def main():
     parser = argparse.ArgumentParser(
         description='Process trade history data and generate dashboard Excel'
     )
-    parser.add_argument('--jisdor', required=True, help='Path to JISDOR Excel file')
-    parser.add_argument('--output', required=True, help='Output Excel file path')
+    parser.add_argument('--jisdor', help='Path to JISDOR Excel file')
+    parser.add_argument('--output', help='Output Excel file path')
     parser.add_argument('--rate-spot', type=float, default=5000000, 
                        help='Spot rate for margin calculation (default: 5,000,000)')
     parser.add_argument('--rate-remote', type=float, default=3500000, 
                        help='Remote rate for margin calculation (default: 3,500,000)')
-    parser.add_argument('--trade-file', action='append', required=True, 
+    parser.add_argument('--trade-file', action='append', 
                        help='Trade history Excel file(s) - can be multiple')
+    parser.add_argument('--rate-file', action='append', metavar='CURRENCY=PATH',
+                       help='Extra rate file per currency (Rupiah per unit, JISDOR layout) - can be multiple')
+    parser.add_argument('--dedup-index',
+                       help='Optional folder for the persistent Trade ID index (drop IDs already seen in other files)')
+    parser.add_argument('--harian-export',
+                       help='Optional Parquet path for the daily rolling rollup (Harian)')
+    parser.add_argument('--summary-json',
+                       help='Write summary tables as compact JSON to this path')
+    parser.add_argument('--quality-json',
+                       help='Write the data-quality report (anomaly counts, per file, sample rows) as JSON here')
+    parser.add_argument('--arrow-dir',
+                       help='Write the enriched frame and aggregates as Arrow IPC files + manifest.json here')
+    parser.add_argument('--manifest',
+                       help='Batch mode: JSON manifest of jobs (see baca_manifest)')
+    parser.add_argument('--workers', type=int,
+                       help='Batch mode / --split-by: parallel worker processes (default: manifest or CPU count)')
+    parser.add_argument('--split-by', choices=list(SPLIT_BY),
+                       help='Write one workbook per year or per product into a .zip at --output')
+    parser.add_argument('--preview-json',
+                       help='Preview mode: enrich only the first rows of each file and write sample + estimates here')
+    parser.add_argument('--preview-rows', type=int, default=PREVIEW_ROWS,
+                       help=f'Preview mode: data rows read per file (default: {PREVIEW_ROWS})')
+    parser.add_argument('--filter-index',
+                       help='Filter mode: Arrow artifact folder (from --arrow-dir) to slice instead of reading Excel')
+    parser.add_argument('--filter-json',
+                       help='Filter mode: write the summary of the filtered rows here')
+    parser.add_argument('--date-from', help='Filter mode: first DateTrade (YYYY-MM-DD, inclusive)')
+    parser.add_argument('--date-to', help='Filter mode: last DateTrade (YYYY-MM-DD, inclusive)')
+    parser.add_argument('--product', action='append',
+                       help='Filter mode: Jenis_Produk to keep - can be multiple')
+    parser.add_argument('--member', action='append',
+                       help='Filter mode: member (or account) on either side to keep - can be multiple')
+    parser.add_argument('--import-times', action='store_true',
+                       help='Print the import cost of each heavy module (loaded after validation)')
     
     args = parser.parse_args()
+
+    def muat(*opsional):
+        muat_modul(*opsional)
+        if args.import_times:
+            cetak_waktu_impor()
+
+    if args.manifest:
+        print("=" * 70)
+        print("[START] TRADE HISTORY DASHBOARD - BATCH MODE")
+        print("=" * 70)
+        muat('openpyxl')
+        try:
+            return jalankan_manifest(args.manifest, args.workers)
+        except (OSError, ValueError) as e:
+            print(f"\n[ERROR] Invalid manifest: {str(e)}")
+            return 1
+    if args.filter_index:
+        if not args.filter_json:
+            parser.error('--filter-index requires --filter-json')
+        muat('pyarrow')
+        try:
+            ringkasan = buat_ringkasan_filter(args.filter_index, tanggal_dari=args.date_from,
+                                              tanggal_sampai=args.date_to, produk=args.product,
+                                              member=args.member)
+            _tulis_json(ringkasan, args.filter_json)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Filter failed: {str(e)}")
+            return 1
+        info = ringkasan['filter']
+        print(f"[OK] Filtered {info['baris_cocok']:,} of {info['baris_total']:,} rows "
+              f"(slice {info['waktu_iris_ms']} ms, total {info['waktu_total_ms']} ms): {args.filter_json}")
+        return 0
+    if not args.jisdor or not args.trade_file:
+        parser.error('--jisdor and --trade-file are required (or use --manifest)')
+    if (not args.preview_json and not args.output and not args.summary_json and not args.arrow_dir
+            and not args.quality_json and not args.harian_export):
+        parser.error('at least one of --output, --summary-json, --arrow-dir, --quality-json '
+                     'or --harian-export is required')
+
+    # Validasi file & header sebelum pandas dimuat
+    try:
+        trade_files = periksa_input(args.jisdor, args.trade_file, args.rate_file)
+    except FileNotFoundError as e:
+        print(f"[ERROR] File not found: {str(e)}")
+        return 1
+    except ValueError as e:
+        print(f"[ERROR] {str(e)}")
+        return 1
+    if not trade_files:
+        print("[ERROR] No valid data to process")
+        return 1
+
+    opsional = ['openpyxl']
+    if args.output:
+        opsional.append('xlsxwriter')
+    if args.arrow_dir or args.harian_export:
+        opsional.append('pyarrow')
+    muat(*opsional)
+
+    if args.preview_json:
+        try:
+            mulai = time.perf_counter()
+            preview = buat_preview(args.jisdor, trade_files, args.rate_spot, args.rate_remote,
+                                   dashboard.parse_file_kurs(args.rate_file), args.preview_rows)
+            _tulis_json(preview, args.preview_json)
+        except Exception as e:
+            print(f"[ERROR] Preview failed: {str(e)}")
+            return 1
+        print(f"[OK] Preview of {preview['sample_rows']} rows "
+              f"(~{preview['estimated_rows']:,} estimated) in {time.perf_counter() - mulai:.2f}s: "
+              f"{args.preview_json}")
+        return 0
     
     print("=" * 70)
     print("[START] TRADE HISTORY DASHBOARD - PYTHON PROCESSOR")
     print("=" * 70)
     
     try:
-        # Validasi file JISDOR ada
-        if not os.path.exists(args.jisdor):
-            raise FileNotFoundError(f"JISDOR file tidak ditemukan: {args.jisdor}")
-        
-        # Validasi semua trade files ada
-        for trade_file in args.trade_file:
-            if not os.path.exists(trade_file):
-                raise FileNotFoundError(f"Trade history file tidak ditemukan: {trade_file}")
+        # Keberadaan file & header sudah dicek periksa_input
+        kurs_lain = dashboard.parse_file_kurs(args.rate_file)
         
         print(f"[INFO] JISDOR file: {os.path.basename(args.jisdor)}")
-        print(f"[INFO] Trade history files: {len(args.trade_file)} file(s)")
+        print(f"[INFO] Trade history files: {len(trade_files)} file(s)")
         print(f"[INFO] Rate Spot: {args.rate_spot:,.0f} Rp")
         print(f"[INFO] Rate Remote: {args.rate_remote:,.0f} Rp")
-        print(f"[INFO] Output file: {os.path.basename(args.output)}")
+        if args.output:
+            print(f"[INFO] Output file: {os.path.basename(args.output)}")
+        if args.split_by:
+            print(f"[INFO] Split by: {args.split_by}")
+        if args.summary_json:
+            print(f"[INFO] Summary JSON: {os.path.basename(args.summary_json)}")
         print("-" * 70)
         
-        # 1. Load JISDOR exchange rate data
+        # 1. Load JISDOR (+ other currency) exchange rate data into one rate store
         print("[STEP 1] Loading JISDOR exchange rate data...")
-        kurs_df = load_jisdor(args.jisdor)
-        print(f"[OK] Loaded {len(kurs_df)} rows of JISDOR data")
-        print(f"[OK] Date range: {kurs_df['Tanggal'].min().date()} to {kurs_df['Tanggal'].max().date()}")
+        jisdor_df = dashboard.load_jisdor(args.jisdor)
+        print(f"[OK] Loaded {len(jisdor_df)} rows of JISDOR data")
+        print(f"[OK] Date range: {jisdor_df['Tanggal'].min().date()} to {jisdor_df['Tanggal'].max().date()}")
+        kurs_per_mata_uang = {dashboard.MATA_UANG_JISDOR: jisdor_df}
+        for mata_uang, rate_file in kurs_lain.items():
+            kurs_per_mata_uang[mata_uang] = dashboard.load_jisdor(rate_file)
+            print(f"[OK] Loaded {len(kurs_per_mata_uang[mata_uang])} rows of {mata_uang} rates")
+        kurs_df = dashboard.buat_penyimpanan_kurs(kurs_per_mata_uang)
         
         # 2. Process all trade history files
-        print(f"\n[STEP 2] Processing {len(args.trade_file)} trade history file(s)...")
+        print(f"\n[STEP 2] Processing {len(trade_files)} trade history file(s)...")
         all_data = []
-        sheet_map = {}
+        sumber = []
         
-        for i, trade_file in enumerate(args.trade_file, 1):
+        for i, trade_file in enumerate(trade_files, 1):
             filename = os.path.basename(trade_file)
-            print(f"\n[FILE {i}/{len(args.trade_file)}] Processing: {filename}")
+            print(f"\n[FILE {i}/{len(trade_files)}] Processing: {filename}")
             
             try:
-                df, sheet_name = process_file(
-                    trade_file,
-                    kurs_df,
-                    rate_spot=args.rate_spot,
-                    rate_remote=args.rate_remote
-                )
+                df = dashboard.baca_trade(trade_file)
                 
                 if df is None or df.empty:
                     print(f"[WARN] No valid data in {filename}")
                     continue
                 
-                print(f"[OK] Processed {len(df)} transactions")
-                print(f"[OK] Sheet name: {sheet_name}")
-                
-                if sheet_name:
-                    sheet_map[sheet_name] = df
+                print(f"[OK] Read {len(df)} transactions")
                 all_data.append(df)
+                sumber.append(filename)
                 
             except Exception as e:
                 print(f"[ERROR] Error processing {filename}: {str(e)}")
                 continue
         
-        # 3. Combine all data
+        # 3. Combine all data, then enrich once (no per-file copies)
         if not all_data:
             print("\n[ERROR] No valid data to process")
             sys.exit(1)
         
-        dashboard_df = pd.concat(all_data, ignore_index=True)
-        print(f"\n[OK] Combined {len(all_data)} file(s) into dashboard")
+        indeks = dashboard.buka_indeks_dedup(args.dedup_index) if args.dedup_index else None
+        all_data, laporan_dedup = dashboard.dedup_trade(all_data, sumber, indeks)
+        for baris in laporan_dedup.itertuples(index=False):
+            print(f"[DEDUP] {baris.Sumber}: {baris.Duplikat_Batch} duplicate(s) in batch, "
+                  f"{baris.Duplikat_Histori} already in index, {baris.Baris_Dipakai} kept")
+        
+        jumlah_file = len(all_data)
+        dashboard_df, sheet_map = dashboard.gabung_trade(
+            all_data,
+            kurs_df,
+            rate_spot=args.rate_spot,
+            rate_remote=args.rate_remote
+        )
+        print(f"\n[OK] Combined {jumlah_file} file(s) into dashboard")
+        print(f"[OK] Sheets: {', '.join(sheet_map)}")
         print(f"[OK] Total transactions: {len(dashboard_df)}")
         
-        # 4. Generate Excel output
-        print(f"\n[STEP 3] Generating Excel output...")
-        write_output(dashboard_df, sheet_map, args.output)
+        # Kualitas data: satu lintasan, dipakai ulang oleh JSON, Excel dan Arrow
+        kualitas = dashboard.buat_kualitas_data(dashboard_df, laporan_dedup)
+        cetak_kualitas(kualitas)
+        if args.quality_json:
+            _tulis_json(dashboard.kualitas_ke_json(kualitas), args.quality_json)
+            print(f"[OK] Data-quality report saved: {args.quality_json}")
         
-        print(f"[OK] Output saved: {args.output}")
+        # 4. Summary JSON (cached by the Go server)
+        if args.summary_json:
+            print(f"\n[STEP 3] Writing summary JSON...")
+            tulis_ringkasan_json(dashboard_df, args.summary_json, laporan_dedup, kualitas)
+            print(f"[OK] Summary saved: {args.summary_json}")
+        
+        # 5. Generate Excel output
+        harian_df = None
+        if args.output or args.harian_export:
+            harian_df = dashboard.buat_rekap_harian(dashboard_df)
+        if args.output:
+            print(f"\n[STEP 4] Generating Excel output...")
+            if args.split_by:
+                dashboard.tulis_output_terpisah(dashboard_df, args.output, per=SPLIT_BY[args.split_by],
+                                                workers=args.workers)
+            else:
+                dashboard.write_output(dashboard_df, sheet_map, args.output, harian_df=harian_df, kualitas=kualitas)
+
+            print(f"[OK] Output saved: {args.output}")
+
+        if args.harian_export:
+            if dashboard.tulis_kolumnar(harian_df, args.harian_export):
+                print(f"[OK] Daily rollup exported: {args.harian_export} ({len(harian_df)} rows)")
+
+        # 6. Arrow IPC artifacts (memory-mappable, read by the Go server via manifest.json)
+        if args.arrow_dir:
+            print(f"\n[STEP 5] Writing Arrow artifacts...")
+            if tulis_artefak_arrow(dashboard_df, args.arrow_dir, laporan_dedup, harian_df, kualitas):
+                print(f"[OK] Arrow artifacts saved: {args.arrow_dir}")
         print("=" * 70)
         print("[SUCCESS] Processing completed successfully!")
         print("=" * 70)
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Trade History Dashboard - Header Sniffer
+Kenali jenis file upload (JISDOR / trade history root / trade history webtest)
+hanya dari beberapa baris pertama, tanpa mem-parsing seluruh workbook.
+Dipanggil oleh Go server setelah upload: python sniff.py FILE [FILE ...]
+"""
+
+import csv
+import json
+import os
+import posixpath
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+
+JENIS_JISDOR = 'jisdor'
+JENIS_TRADE_ROOT = 'trade_root'
+JENIS_TRADE_WEBTEST = 'trade_webtest'
+JENIS_UNKNOWN = 'unknown'
+
+# Kolom minimal yang harus ada di baris header tiap layout
+HEADER_JISDOR = {'Tanggal', 'Kurs'}
+HEADER_TRADE_ROOT = {'DateTrade', 'Trade ID', 'Contract', 'Acc.Buy', 'Acc.Sell', 'Vol(LOT)'}
+HEADER_TRADE_WEBTEST = {'DateTrade', 'Trade ID', 'Contract', 'Acc', 'Buy Sell', 'Trade Vol'}
+
+# Baris header yang diharapkan process_file / load_jisdor (1-based)
+HEADER_ROW_TRADE = 2   # baris 1 judul laporan, df[1:] membuang baris header
+HEADER_ROW_JISDOR = 5  # load_jisdor: skiprows=4
+
+MAX_ROWS_SNIFF = 10
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _nilai_teks(elem):
+    """Teks <si>/<is>: <t> langsung atau gabungan rich-text run <r><t>."""
+    t = elem.find(f'{NS_MAIN}t')
+    if t is not None:
+        return t.text or ''
+    return ''.join(r.findtext(f'{NS_MAIN}t') or '' for r in elem.findall(f'{NS_MAIN}r'))
+
+
+def _kolom_ke_indeks(ref):
+    """'AB12' → 27 (0-based)."""
+    idx = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        idx = idx * 26 + ord(ch.upper()) - 64
+    return idx - 1
+
+
+def _angka(teks):
+    try:
+        return int(teks)
+    except ValueError:
+        return float(teks)
+
+
+def _baca_baris_xlsx_ringan(file_path, max_rows):
+    """
+    Baca max_rows baris pertama sheet pertama langsung dari XML di dalam
+    xlsx (hanya stdlib, tanpa openpyxl): sheet di-stream sampai baris ke-
+    max_rows, sharedStrings hanya sampai indeks terbesar yang dipakai.
+    Sel tanggal tetap berupa serial Excel (style tidak dibaca); untuk
+    klasifikasi header hasilnya sama dengan _baca_baris_openpyxl.
+    """
+    with zipfile.ZipFile(file_path) as zf:
+        sheet = ET.fromstring(zf.read('xl/workbook.xml')).find(f'{NS_MAIN}sheets/{NS_MAIN}sheet')
+        rid = sheet.get(f'{NS_REL}id')
+        rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        target = next(r.get('Target') for r in rels.iter(f'{NS_PKG_REL}Relationship') if r.get('Id') == rid)
+        path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+        rows = [[] for _ in range(max_rows)]
+        dimension = None
+        with zf.open(path) as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == f'{NS_MAIN}dimension':
+                        dimension = elem.get('ref')
+                    continue
+                if elem.tag != f'{NS_MAIN}row':
+                    continue
+                nomor = int(elem.get('r'))
+                if nomor > max_rows:
+                    break
+                row = rows[nomor - 1]
+                for c in elem.iter(f'{NS_MAIN}c'):
+                    tipe, v = c.get('t'), c.findtext(f'{NS_MAIN}v')
+                    if tipe == 'inlineStr':
+                        nilai = _nilai_teks(c.find(f'{NS_MAIN}is'))
+                    elif v is None:
+                        continue
+                    elif tipe == 's':
+                        nilai = ('s', int(v))
+                    elif tipe in ('str', 'e'):
+                        nilai = v
+                    elif tipe == 'b':
+                        nilai = v == '1'
+                    else:
+                        nilai = _angka(v)
+                    kolom = _kolom_ke_indeks(c.get('r'))
+                    row.extend([None] * (kolom + 1 - len(row)))
+                    row[kolom] = nilai
+                elem.clear()
+                if nomor == max_rows:
+                    break
+
+        dipakai = [n[1] for row in rows for n in row if isinstance(n, tuple)]
+        teks = []
+        if dipakai and 'xl/sharedStrings.xml' in zf.namelist():
+            batas = max(dipakai)
+            with zf.open('xl/sharedStrings.xml') as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == f'{NS_MAIN}si':
+                        teks.append(_nilai_teks(elem))
+                        elem.clear()
+                        if len(teks) > batas:
+                            break
+        rows = [[teks[n[1]] if isinstance(n, tuple) else n for n in row] for row in rows]
+
+    while rows and not rows[-1]:
+        rows.pop()
+    if not dimension:
+        return rows, sheet.get('name'), None, None
+    max_row = int(re.sub(r'^\D+', '', dimension.split(':')[-1]))
+    return rows, sheet.get('name'), max_row, dimension
+
+
+def _baca_baris_excel(file_path, max_rows):
+    try:
+        return _baca_baris_xlsx_ringan(file_path, max_rows)
+    except Exception:
+        # Struktur xlsx tak lazim: serahkan ke openpyxl
+        return _baca_baris_openpyxl(file_path, max_rows)
+
+
+def _baca_baris_openpyxl(file_path, max_rows):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = [list(row) for row in ws.iter_rows(min_row=1, max_row=max_rows, values_only=True)]
+        try:
+            dimension = ws.calculate_dimension(force=False)
+        except ValueError:
+            # Sheet tanpa tag <dimension>: jumlah baris tidak diketahui tanpa scan penuh
+            return rows, ws.title, None, None
+        return rows, ws.title, ws.max_row, dimension
+    finally:
+        wb.close()
+
+
+def _baca_baris_csv(file_path, max_rows):
+    with open(file_path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        rows = []
+        for row in csv.reader(f):
+            rows.append(row)
+            if len(rows) >= max_rows:
+                break
+        dibaca = f.tell() if rows else 0
+
+    # Estimasi jumlah baris dari ukuran file / rata-rata panjang baris sampel
+    ukuran = os.path.getsize(file_path)
+    max_row = int(ukuran / (dibaca / len(rows))) if rows and dibaca else len(rows)
+    return rows, None, max_row, None
+
+
+def _klasifikasi(rows):
+    """Cari baris header pertama yang cocok dengan salah satu layout."""
+    for idx, row in enumerate(rows, start=1):
+        sel = {str(c).strip() for c in row if c is not None and str(c).strip()}
+        if HEADER_TRADE_ROOT <= sel:
+            return JENIS_TRADE_ROOT, idx, row
+        if HEADER_TRADE_WEBTEST <= sel:
+            return JENIS_TRADE_WEBTEST, idx, row
+        if HEADER_JISDOR <= {c.capitalize() for c in sel}:
+            return JENIS_JISDOR, idx, row
+    return JENIS_UNKNOWN, None, None
+
+
+def sniff_file(file_path, max_rows=MAX_ROWS_SNIFF):
+    """
+    Klasifikasikan file dan estimasi jumlah baris data dari dimensi sheet.
+    Hanya max_rows baris pertama yang dibaca: xlsx lewat pembaca zip/XML
+    stdlib (_baca_baris_xlsx_ringan), openpyxl read-only hanya sebagai
+    fallback untuk struktur xlsx tak lazim; csv lewat modul csv.
+    """
+    hasil = {
+        'file': os.path.basename(file_path),
+        'kind': JENIS_UNKNOWN,
+        'header_row': None,
+        'columns': [],
+        'estimated_rows': None,
+        'sheet': None,
+        'dimension': None,
+        'warning': None,
+        'error': None,
+    }
+
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == '.csv':
+            rows, sheet, max_row, dimension = _baca_baris_csv(file_path, max_rows)
+        elif ext in ('.xlsx', '.xlsm'):
+            rows, sheet, max_row, dimension = _baca_baris_excel(file_path, max_rows)
+        else:
+            hasil['error'] = f"Format {ext or '(tanpa ekstensi)'} tidak didukung, gunakan .xlsx"
+            return hasil
+    except Exception as e:
+        hasil['error'] = f"Gagal membaca file: {e}"
+        return hasil
+
+    jenis, header_row, header = _klasifikasi(rows)
+    hasil.update({
+        'kind': jenis,
+        'header_row': header_row,
+        'columns': [str(c).strip() for c in header if c is not None] if header else [],
+        'sheet': sheet,
+        'dimension': dimension,
+    })
+
+    if header_row is not None and max_row:
+        hasil['estimated_rows'] = max(int(max_row) - header_row, 0)
+
+    if jenis == JENIS_UNKNOWN:
+        hasil['error'] = "Header tidak dikenali sebagai file JISDOR maupun trade history"
+    elif jenis == JENIS_JISDOR and header_row != HEADER_ROW_JISDOR:
+        hasil['warning'] = f"Header JISDOR di baris {header_row}, diharapkan baris {HEADER_ROW_JISDOR}"
+    elif jenis != JENIS_JISDOR and header_row != HEADER_ROW_TRADE:
+        hasil['warning'] = f"Header trade history di baris {header_row}, diharapkan baris {HEADER_ROW_TRADE}"
+
+    return hasil
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: sniff.py FILE [FILE ...]", file=sys.stderr)
+        return 2
+
+    hasil = [sniff_file(path) for path in sys.argv[1:]]
+    json.dump(hasil if len(hasil) > 1 else hasil[0], sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
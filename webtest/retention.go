@@ -0,0 +1,351 @@
+package main
+
+import (
+	"encoding/json"
+	"log"
+	"net/http"
+	"os"
+	"path/filepath"
+	"sort"
+	"strings"
+	"sync"
+	"time"
+)
+
+// Byte budgets and idle limits per managed directory. When a directory goes
+// over budget the least recently accessed entries are evicted first; entries
+// pinned by a queued or running job are never evicted.
+const (
+	UploadBudget   = 2 << 30 // 2 GB
+	OutputBudget   = 2 << 30 // 2 GB
+	CacheBudget    = 256 << 20
+	ArtifactBudget = 4 << 30 // 4 GB
+	// Chunked upload sessions reserve their full size up front (see
+	// createUploadSessionHandler), so PartialDir never goes over budget and
+	// only idle sessions are evicted. Two full-size uploads plus their
+	// session.json files fit.
+	PartialBudget = 2*MaxChunkedFileSize + 16<<20
+
+	UploadMaxIdle = 1 * time.Hour
+	OutputMaxIdle = 24 * time.Hour
+	CacheMaxIdle  = 7 * 24 * time.Hour
+
+	RetentionInterval = 1 * time.Minute
+	// /api/cleanup leaves entries accessed within this window alone
+	RetentionGrace = 10 * time.Minute
+)
+
+type retentionDir struct {
+	path    string
+	budget  int64
+	maxIdle time.Duration
+	onEvict func(name string)
+}
+
+type retentionEntry struct {
+	path   string
+	size   int64
+	access time.Time
+}
+
+type RetentionDirStats struct {
+	Path    string `json:"path"`
+	Budget  int64  `json:"budget"`
+	Used    int64  `json:"used"`
+	Entries int    `json:"entries"`
+	Pinned  int    `json:"pinned"`
+}
+
+type RetentionStats struct {
+	Hits         int64               `json:"hits"`
+	Misses       int64               `json:"misses"`
+	Evictions    int64               `json:"evictions"`
+	EvictedBytes int64               `json:"evicted_bytes"`
+	Dirs         []RetentionDirStats `json:"dirs"`
+}
+
+// retentionManager tracks last access and pins per file (or per artifact
+// directory) and keeps each managed directory within its byte budget.
+type retentionManager struct {
+	mu           sync.Mutex
+	dirs         []retentionDir
+	access       map[string]time.Time
+	pins         map[string]int
+	hits         int64
+	misses       int64
+	evictions    int64
+	evictedBytes int64
+	wake         chan struct{}
+}
+
+var retention = &retentionManager{
+	access: make(map[string]time.Time),
+	pins:   make(map[string]int),
+	wake:   make(chan struct{}, 1),
+}
+
+func (m *retentionManager) manage(dir retentionDir) {
+	dir.path = filepath.Clean(dir.path)
+	m.mu.Lock()
+	m.dirs = append(m.dirs, dir)
+	m.mu.Unlock()
+}
+
+// touch records an access without counting it as a hit (e.g. new files)
+func (m *retentionManager) touch(path string) {
+	m.mu.Lock()
+	m.access[filepath.Clean(path)] = time.Now()
+	m.mu.Unlock()
+}
+
+// lookup reports whether path exists, counting a hit (and refreshing its
+// access time) or a miss
+func (m *retentionManager) lookup(path string) bool {
+	_, err := os.Stat(path)
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	if err != nil {
+		m.misses++
+		return false
+	}
+	m.hits++
+	m.access[filepath.Clean(path)] = time.Now()
+	return true
+}
+
+// pin protects paths from eviction until the returned release is called
+func (m *retentionManager) pin(paths ...string) (release func()) {
+	clean := make([]string, len(paths))
+	now := time.Now()
+	m.mu.Lock()
+	for i, p := range paths {
+		clean[i] = filepath.Clean(p)
+		m.pins[clean[i]]++
+		m.access[clean[i]] = now
+	}
+	m.mu.Unlock()
+
+	var once sync.Once
+	return func() {
+		once.Do(func() {
+			m.mu.Lock()
+			for _, p := range clean {
+				if m.pins[p]--; m.pins[p] <= 0 {
+					delete(m.pins, p)
+				}
+			}
+			m.mu.Unlock()
+		})
+	}
+}
+
+// kick schedules a sweep soon (non-blocking)
+func (m *retentionManager) kick() {
+	select {
+	case m.wake <- struct{}{}:
+	default:
+	}
+}
+
+func (m *retentionManager) run() {
+	ticker := time.NewTicker(RetentionInterval)
+	defer ticker.Stop()
+	for {
+		m.sweep()
+		select {
+		case <-ticker.C:
+		case <-m.wake:
+		}
+	}
+}
+
+// scan lists the entries of a managed directory. Hidden entries and nested
+// managed directories are skipped; other subdirectories count as one entry.
+func (m *retentionManager) scan(dir retentionDir) []retentionEntry {
+	items, err := os.ReadDir(dir.path)
+	if err != nil {
+		return nil
+	}
+
+	m.mu.Lock()
+	managed := make(map[string]bool, len(m.dirs))
+	for _, d := range m.dirs {
+		managed[d.path] = true
+	}
+	m.mu.Unlock()
+
+	var entries []retentionEntry
+	for _, item := range items {
+		path := filepath.Join(dir.path, item.Name())
+		if strings.HasPrefix(item.Name(), ".") || managed[path] {
+			continue
+		}
+		info, err := item.Info()
+		if err != nil {
+			continue
+		}
+		entry := retentionEntry{path: path, size: info.Size(), access: info.ModTime()}
+		if item.IsDir() {
+			entry.size = dirSize(path)
+		}
+		entries = append(entries, entry)
+	}
+
+	m.mu.Lock()
+	for i := range entries {
+		if t, ok := m.access[entries[i].path]; ok && t.After(entries[i].access) {
+			entries[i].access = t
+		}
+	}
+	m.mu.Unlock()
+	return entries
+}
+
+func dirSize(path string) int64 {
+	var size int64
+	filepath.Walk(path, func(_ string, info os.FileInfo, err error) error {
+		if err == nil && !info.IsDir() {
+			size += info.Size()
+		}
+		return nil
+	})
+	return size
+}
+
+// evict removes an entry unless it is pinned (checked under the lock)
+func (m *retentionManager) evict(dir retentionDir, entry retentionEntry, reason string) bool {
+	m.mu.Lock()
+	if m.pins[entry.path] > 0 {
+		m.mu.Unlock()
+		return false
+	}
+	if err := os.RemoveAll(entry.path); err != nil {
+		m.mu.Unlock()
+		log.Printf("⚠️  Could not evict %s: %v", entry.path, err)
+		return false
+	}
+	delete(m.access, entry.path)
+	m.evictions++
+	m.evictedBytes += entry.size
+	m.mu.Unlock()
+
+	if dir.onEvict != nil {
+		dir.onEvict(filepath.Base(entry.path))
+	}
+	log.Printf("   🗑️  Evicted %s (%s, %.2f MB)", entry.path, reason, float64(entry.size)/(1024*1024))
+	return true
+}
+
+// sweep drops idle entries, then least recently accessed entries until
+// every managed directory is within its budget
+func (m *retentionManager) sweep() {
+	m.mu.Lock()
+	dirs := append([]retentionDir(nil), m.dirs...)
+	m.mu.Unlock()
+
+	now := time.Now()
+	for _, dir := range dirs {
+		entries := m.scan(dir)
+		sort.Slice(entries, func(i, j int) bool { return entries[i].access.Before(entries[j].access) })
+
+		var used int64
+		for _, e := range entries {
+			used += e.size
+		}
+		for _, e := range entries {
+			idle := dir.maxIdle > 0 && now.Sub(e.access) > dir.maxIdle
+			if !idle && used <= dir.budget {
+				break
+			}
+			reason := "over budget"
+			if idle {
+				reason = "idle " + now.Sub(e.access).Round(time.Second).String()
+			}
+			if m.evict(dir, e, reason) {
+				used -= e.size
+			}
+		}
+	}
+}
+
+// purge evicts every unpinned entry not accessed within RetentionGrace
+// from the given managed directories
+func (m *retentionManager) purge(paths ...string) (deleted, kept int) {
+	wanted := make(map[string]bool, len(paths))
+	for _, p := range paths {
+		wanted[filepath.Clean(p)] = true
+	}
+	m.mu.Lock()
+	dirs := append([]retentionDir(nil), m.dirs...)
+	m.mu.Unlock()
+
+	now := time.Now()
+	for _, dir := range dirs {
+		if !wanted[dir.path] {
+			continue
+		}
+		for _, e := range m.scan(dir) {
+			if now.Sub(e.access) < RetentionGrace || !m.evict(dir, e, "cleanup") {
+				kept++
+				continue
+			}
+			deleted++
+		}
+	}
+	return deleted, kept
+}
+
+func (m *retentionManager) stats() RetentionStats {
+	m.mu.Lock()
+	dirs := append([]retentionDir(nil), m.dirs...)
+	m.mu.Unlock()
+
+	var perDir []RetentionDirStats
+	for _, dir := range dirs {
+		entries := m.scan(dir)
+		s := RetentionDirStats{Path: dir.path, Budget: dir.budget, Entries: len(entries)}
+		m.mu.Lock()
+		for _, e := range entries {
+			s.Used += e.size
+			if m.pins[e.path] > 0 {
+				s.Pinned++
+			}
+		}
+		m.mu.Unlock()
+		perDir = append(perDir, s)
+	}
+
+	m.mu.Lock()
+	defer m.mu.Unlock()
+	return RetentionStats{
+		Hits:         m.hits,
+		Misses:       m.misses,
+		Evictions:    m.evictions,
+		EvictedBytes: m.evictedBytes,
+		Dirs:         perDir,
+	}
+}
+
+// uploadPaths lists the uploads a job reads, for pinning
+func uploadPaths(req ProcessRequest) []string {
+	paths := []string{filepath.Join(UploadDir, filepath.Base(req.JisdorFile))}
+	for _, f := range req.TradeHistoryFiles {
+		paths = append(paths, filepath.Join(UploadDir, filepath.Base(f)))
+	}
+	return paths
+}
+
+// jobPaths lists the files a job reads and writes, for pinning
+func jobPaths(req ProcessRequest, key string, extra ...string) []string {
+	paths := append(uploadPaths(req), summaryPath(key), artifactDir(key))
+	return append(paths, extra...)
+}
+
+// GET /api/retention - disk use per directory and hit/miss/eviction counters
+func retentionStatsHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+	json.NewEncoder(w).Encode(map[string]interface{}{
+		"success": true,
+		"stats":   retention.stats(),
+	})
+}
@@ -1,6 +1,16 @@
 // API Configuration
 const API_BASE = window.location.origin;
 
+// Chunked uploads: chunk size and chunks in flight per file
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const UPLOAD_CHUNK_PARALLEL = 4;
+const UPLOAD_CHUNK_RETRIES = 3;
+
+// Parallel upload pipeline: files (or batches of small files) in flight at
+// once, and small files per /api/upload/batch request
+const UPLOAD_CONCURRENCY = 3;
+const UPLOAD_BATCH_FILES = 4;
+
 // State Management
 let uploadedFiles = {
     jisdor: null,
@@ -31,6 +41,7 @@ function initializeEventListeners() {
     // Buttons
     const uploadBtn = document.getElementById('uploadBtn');
     const processBtn = document.getElementById('processBtn');
+    const summaryBtn = document.getElementById('summaryBtn');
     const refreshFilesBtn = document.getElementById('refreshFilesBtn');
     const refreshOutputsBtn = document.getElementById('refreshOutputsBtn');
     const cleanupFilesBtn = document.getElementById('cleanupFilesBtn');
@@ -38,6 +49,7 @@ function initializeEventListeners() {
     
     if (uploadBtn) uploadBtn.addEventListener('click', uploadFiles);
     if (processBtn) processBtn.addEventListener('click', processData);
+    if (summaryBtn) summaryBtn.addEventListener('click', loadSummary);
     if (refreshFilesBtn) refreshFilesBtn.addEventListener('click', loadUploadedFiles);
     if (refreshOutputsBtn) refreshOutputsBtn.addEventListener('click', loadOutputFiles);
     if (cleanupFilesBtn) cleanupFilesBtn.addEventListener('click', cleanupAllFiles);
@@ -83,7 +95,9 @@ function displayMultipleFilesInfo(elementId, files) {
     `;
 }
 
-// Upload files to server
+// Upload files to server: large files go through chunked sessions, small
+// ones in batches; up to UPLOAD_CONCURRENCY uploads run at the same time
+// and the server validates each file as soon as it arrives
 async function uploadFiles() {
     if (!uploadedFiles.jisdor) {
         showNotification('Please select JISDOR file', 'error');
@@ -95,51 +109,245 @@ async function uploadFiles() {
         return;
     }
 
-    showLoading(true);
+    const uploadBtn = document.getElementById('uploadBtn');
+    if (uploadBtn) uploadBtn.disabled = true;
+
+    const entries = [
+        { file: uploadedFiles.jisdor, kind: 'jisdor' },
+        ...uploadedFiles.tradeHistory.map(file => ({ file, kind: 'trade_webtest' }))
+    ];
+    const results = new Array(entries.length);
+    showUploadProgress(entries);
+
+    const finish = (index, result) => {
+        results[index] = result;
+        const problems = result.success
+            ? describeUploadProblems(result, entries[index].kind)
+            : [result.error || 'Upload failed'];
+        setUploadProgress(index, 1, problems.length > 0 ? '⚠️ ' + problems.join('; ') : '✅ Done');
+    };
 
-    try {
-        // Upload JISDOR file
-        console.log("📁 Uploading JISDOR file...");
-        const jisdorResult = await uploadFile(uploadedFiles.jisdor);
-        selectedFiles.jisdor = jisdorResult.output_file;
-
-        // Upload trade history files
-        selectedFiles.tradeHistory = [];
-        for (const file of uploadedFiles.tradeHistory) {
-            console.log("📁 Uploading trade file:", file.name);
-            const result = await uploadFile(file);
-            selectedFiles.tradeHistory.push(result.output_file);
+    const tasks = [];
+    let batch = [];
+    // A failed request marks only its own files as failed
+    const addBatch = (indices) => tasks.push(async () => {
+        try {
+            const response = await uploadBatch(indices.map(i => entries[i].file), (fractions) => {
+                fractions.forEach((fraction, k) => setUploadProgress(indices[k], fraction));
+            });
+            response.files.forEach((result, k) => finish(indices[k], result));
+        } catch (error) {
+            indices.forEach(i => finish(i, { success: false, error: error.message }));
+        }
+    });
+    entries.forEach((entry, index) => {
+        if (entry.file.size > UPLOAD_CHUNK_SIZE) {
+            tasks.push(async () => {
+                try {
+                    finish(index, await uploadFile(entry.file, fraction => setUploadProgress(index, fraction)));
+                } catch (error) {
+                    finish(index, { success: false, error: error.message });
+                }
+            });
+        } else if (batch.push(index) === UPLOAD_BATCH_FILES) {
+            addBatch(batch);
+            batch = [];
         }
+    });
+    if (batch.length > 0) addBatch(batch);
+
+    try {
+        await runLimited(tasks, UPLOAD_CONCURRENCY);
+
+        const problems = results.flatMap((result, index) => result.success
+            ? describeUploadProblems(result, entries[index].kind)
+            : [`${entries[index].file.name}: ${result.error}`]);
+        const [jisdorResult, ...tradeResults] = results;
+        selectedFiles.jisdor = jisdorResult.success ? jisdorResult.output_file : null;
+        selectedFiles.tradeHistory = tradeResults.filter(r => r.success).map(r => r.output_file);
 
-        showNotification('Files uploaded successfully!', 'success');
+        if (problems.length > 0) {
+            showNotification('Files uploaded with warnings:\n' + problems.join('\n'), 'error');
+        } else {
+            showNotification('Files uploaded successfully!', 'success');
+        }
         loadUploadedFiles();
         updateSelectedFilesInfo();
         
         const processBtn = document.getElementById('processBtn');
         if (processBtn) processBtn.disabled = false;
+        const summaryBtn = document.getElementById('summaryBtn');
+        if (summaryBtn) summaryBtn.disabled = false;
 
     } catch (error) {
         console.error('Upload error:', error);
         showNotification('Upload failed: ' + error.message, 'error');
     } finally {
-        showLoading(false);
+        if (uploadBtn) uploadBtn.disabled = false;
     }
 }
 
-async function uploadFile(file) {
-    const formData = new FormData();
-    formData.append('file', file);
+// Run async task functions with at most `limit` in flight
+async function runLimited(tasks, limit) {
+    const queue = [...tasks];
+    const worker = async () => {
+        while (queue.length > 0) {
+            await queue.shift()();
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(limit, queue.length) }, worker));
+}
 
-    const response = await fetch(`${API_BASE}/api/upload`, {
-        method: 'POST',
-        body: formData
+// Several small files in one multipart request. XHR (not fetch) for upload
+// progress, which is split over the files in request order.
+function uploadBatch(files, onProgress) {
+    return new Promise((resolve, reject) => {
+        const formData = new FormData();
+        files.forEach(file => formData.append('files', file));
+
+        const xhr = new XMLHttpRequest();
+        xhr.open('POST', `${API_BASE}/api/upload/batch`);
+        xhr.responseType = 'json';
+        xhr.upload.onprogress = (e) => {
+            if (!e.lengthComputable) return;
+            let sent = e.loaded / e.total * files.reduce((sum, f) => sum + f.size, 0);
+            onProgress(files.map(file => {
+                const fraction = Math.min(Math.max(sent / file.size, 0), 1);
+                sent -= file.size;
+                return fraction;
+            }));
+        };
+        xhr.onload = () => {
+            if (xhr.status === 200 && xhr.response && xhr.response.success) {
+                resolve(xhr.response);
+            } else {
+                reject(new Error((xhr.response && xhr.response.error) || 'Upload failed: ' + xhr.statusText));
+            }
+        };
+        xhr.onerror = () => reject(new Error('Upload failed: network error'));
+        xhr.send(formData);
     });
+}
+
+function showUploadProgress(entries) {
+    const container = document.getElementById('uploadProgress');
+    if (!container) return;
+
+    container.classList.add('active');
+    container.innerHTML = entries.map((entry, index) => `
+        <div class="upload-progress-item" id="uploadProgress-${index}">
+            <span class="upload-progress-name">${entry.file.name}</span>
+            <progress max="1" value="0"></progress>
+            <span class="upload-progress-status">Queued</span>
+        </div>
+    `).join('');
+}
+
+function setUploadProgress(index, fraction, status) {
+    const row = document.getElementById(`uploadProgress-${index}`);
+    if (!row) return;
 
-    if (!response.ok) {
-        throw new Error('Upload failed: ' + response.statusText);
+    row.querySelector('progress').value = fraction;
+    row.querySelector('.upload-progress-status').textContent =
+        status || (fraction < 1 ? `${Math.round(fraction * 100)}%` : 'Validating...');
+}
+
+// Chunked, resumable upload: chunks go up in parallel and a session that
+// was interrupted (same file) resumes from the chunks the server already has
+async function uploadFile(file, onProgress) {
+    const resumeKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+    let session = null;
+
+    const savedId = localStorage.getItem(resumeKey);
+    if (savedId) {
+        const response = await fetch(`${API_BASE}/api/upload/${savedId}`);
+        if (response.ok) {
+            session = await response.json();
+            console.log(`↩️  Resuming ${file.name} at ${formatFileSize(session.offset)}`);
+        }
     }
 
-    return await response.json();
+    if (!session) {
+        const response = await fetch(`${API_BASE}/api/upload/session`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size, chunk_size: UPLOAD_CHUNK_SIZE })
+        });
+        session = await response.json();
+        if (!session.success) {
+            throw new Error(session.error || 'Upload failed: ' + response.statusText);
+        }
+        localStorage.setItem(resumeKey, session.upload_id);
+    }
+
+    const chunkSize = session.chunk_size;
+    const received = new Set(session.received);
+    const pending = [];
+    let sentBytes = 0;
+    for (let offset = 0; offset < file.size; offset += chunkSize) {
+        if (received.has(offset / chunkSize)) {
+            sentBytes += Math.min(chunkSize, file.size - offset);
+        } else {
+            pending.push(offset);
+        }
+    }
+    if (onProgress) onProgress(sentBytes / file.size);
+
+    const sendChunk = async (offset) => {
+        const blob = file.slice(offset, offset + chunkSize);
+        const headers = {};
+        if (window.crypto && crypto.subtle) {
+            const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+            headers['X-Chunk-SHA256'] = Array.from(new Uint8Array(digest))
+                .map(b => b.toString(16).padStart(2, '0')).join('');
+        }
+
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const response = await fetch(`${API_BASE}/api/upload/${session.upload_id}?offset=${offset}`, {
+                    method: 'PUT',
+                    headers,
+                    body: blob
+                });
+                if (response.ok) break;
+                throw new Error((await response.json()).error || response.statusText);
+            } catch (error) {
+                if (attempt >= UPLOAD_CHUNK_RETRIES) throw error;
+                console.warn(`⚠️  Retrying chunk at ${offset} of ${file.name}:`, error.message);
+            }
+        }
+        sentBytes += blob.size;
+        if (onProgress) onProgress(sentBytes / file.size);
+    };
+
+    const worker = async () => {
+        while (pending.length > 0) {
+            await sendChunk(pending.shift());
+        }
+    };
+    await Promise.all(Array.from({ length: UPLOAD_CHUNK_PARALLEL }, worker));
+
+    const response = await fetch(`${API_BASE}/api/upload/${session.upload_id}/complete`, { method: 'POST' });
+    const result = await response.json();
+    if (!response.ok || !result.success) {
+        throw new Error(result.error || 'Upload failed: ' + response.statusText);
+    }
+    localStorage.removeItem(resumeKey);
+    return result;
+}
+
+// Layout check result from the server-side header sniff
+function describeUploadProblems(result, expectedKind) {
+    const meta = result && result.meta;
+    if (!meta) return [];
+
+    const problems = [];
+    if (meta.kind !== expectedKind) {
+        problems.push(`${meta.file}: expected ${expectedKind}, detected ${meta.kind}`);
+    }
+    if (meta.error) problems.push(`${meta.file}: ${meta.error}`);
+    if (meta.warning) problems.push(`${meta.file}: ${meta.warning}`);
+    return problems;
 }
 
 // Load uploaded files from server
@@ -175,10 +383,12 @@ function displayUploadedFiles(files) {
                 <div class="file-item-meta">
                     Size: ${formatFileSize(file.size)} | 
                     Uploaded: ${formatDate(file.uploaded_at)}
+                    ${file.kind ? `| Type: ${file.kind}` : ''}
+                    ${file.estimated_rows ? `| ~${formatNumber(file.estimated_rows)} rows` : ''}
                 </div>
             </div>
             <div class="file-item-actions">
-                <button class="btn btn-secondary btn-sm" onclick="selectFileForProcess('${file.name}')">
+                <button class="btn btn-secondary btn-sm" onclick="selectFileForProcess('${file.name}', '${file.kind || ''}')">
                     Select
                 </button>
             </div>
@@ -186,11 +396,12 @@ function displayUploadedFiles(files) {
     `).join('');
 }
 
-function selectFileForProcess(filename) {
+function selectFileForProcess(filename, kind) {
     console.log("✅ Selected file:", filename);
     
-    // Simple selection logic
-    if (filename.toLowerCase().includes('jisdor')) {
+    // Use the server-side sniff result when available, else fall back to the filename
+    const isJisdor = kind ? kind === 'jisdor' : filename.toLowerCase().includes('jisdor');
+    if (isJisdor) {
         selectedFiles.jisdor = filename;
     } else {
         if (!selectedFiles.tradeHistory.includes(filename)) {
@@ -200,8 +411,10 @@ function selectFileForProcess(filename) {
     updateSelectedFilesInfo();
     
     const processBtn = document.getElementById('processBtn');
-    if (processBtn && selectedFiles.jisdor && selectedFiles.tradeHistory.length > 0) {
-        processBtn.disabled = false;
+    const summaryBtn = document.getElementById('summaryBtn');
+    if (selectedFiles.jisdor && selectedFiles.tradeHistory.length > 0) {
+        if (processBtn) processBtn.disabled = false;
+        if (summaryBtn) summaryBtn.disabled = false;
     }
 }
 
@@ -226,14 +439,7 @@ async function processData() {
 
     showLoading(true);
 
-    const requestData = {
-        jisdor_file: selectedFiles.jisdor,
-        trade_history_files: selectedFiles.tradeHistory,
-        config: {
-            rate_spot: parseFloat(document.getElementById('rateSpot').value),
-            rate_remote: parseFloat(document.getElementById('rateRemote').value)
-        }
-    };
+    const requestData = buildJobRequest();
 
     console.log("⚙️  Processing with data:", requestData);
 
@@ -252,6 +458,7 @@ async function processData() {
             showNotification('Data processed successfully!', 'success');
             displayProcessLog(result.logs);
             loadOutputFiles();
+            if (result.summary_key) fetchCachedSummary(result.summary_key);
         } else {
             showNotification('Processing failed: ' + result.error, 'error');
             displayProcessLog(result.logs);
@@ -265,6 +472,122 @@ async function processData() {
     }
 }
 
+function buildJobRequest() {
+    return {
+        jisdor_file: selectedFiles.jisdor,
+        trade_history_files: selectedFiles.tradeHistory,
+        config: {
+            rate_spot: parseFloat(document.getElementById('rateSpot').value),
+            rate_remote: parseFloat(document.getElementById('rateRemote').value),
+            split_by: document.getElementById('splitBy').value
+        }
+    };
+}
+
+// Summary JSON (served from the server-side cache, no Excel generated)
+async function loadSummary() {
+    if (!selectedFiles.jisdor || selectedFiles.tradeHistory.length === 0) {
+        showNotification('Please select JISDOR and trade history files', 'error');
+        return;
+    }
+
+    showLoading(true);
+
+    try {
+        const response = await fetch(`${API_BASE}/api/summary`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(buildJobRequest())
+        });
+
+        const result = await response.json();
+
+        if (result.success) {
+            renderSummary(result.summary, result.cached);
+        } else {
+            showNotification('Summary failed: ' + result.error, 'error');
+            displayProcessLog(result.logs);
+        }
+
+    } catch (error) {
+        console.error('Summary error:', error);
+        showNotification('Summary error: ' + error.message, 'error');
+    } finally {
+        showLoading(false);
+    }
+}
+
+async function fetchCachedSummary(key) {
+    try {
+        const response = await fetch(`${API_BASE}/api/summary/${encodeURIComponent(key)}`);
+        const result = await response.json();
+        if (result.success) renderSummary(result.summary, true);
+    } catch (error) {
+        console.error('Failed to load cached summary:', error);
+    }
+}
+
+function renderSummary(summary, cached) {
+    const container = document.getElementById('summarySection');
+    if (!container || !summary) return;
+
+    container.classList.add('active');
+    container.innerHTML = `
+        <p class="summary-meta">
+            Periode ${summary.periode} | ${formatNumber(summary.total_transaksi)} transaksi
+            ${cached ? '| ⚡ cached' : ''}
+        </p>
+        <div class="summary-grid">
+            ${renderBarChart('Volume (Lot)', summary.rekap_volume)}
+            ${renderBarChart('Nilai Transaksi (Rp)', summary.nilai_transaksi_rp)}
+            ${renderBarChart('Nilai Transaksi (USD)', summary.nilai_transaksi_usd)}
+            ${renderBarChart('Margin Transaksi (Rp)', summary.margin_transaksi)}
+            ${renderTable('Breakdown Volume per Jenis Produk', summary.breakdown_volume)}
+        </div>
+    `;
+}
+
+// Horizontal bar chart from a {columns, data} table: label column + value column
+function renderBarChart(title, table) {
+    if (!table || !table.data) return '';
+
+    const rows = table.data.filter(row => row[0] !== 'Total');
+    const max = Math.max(...rows.map(row => Math.abs(row[1] || 0)), 1);
+
+    return `
+        <div class="chart-card">
+            <h4>${title}</h4>
+            ${rows.map(row => `
+                <div class="bar-row">
+                    <span>${row[0]}</span>
+                    <div class="bar-track">
+                        <div class="bar-fill" style="width: ${Math.abs(row[1] || 0) / max * 100}%"></div>
+                    </div>
+                    <span class="bar-value">${formatNumber(row[1])}</span>
+                </div>
+            `).join('')}
+        </div>
+    `;
+}
+
+function renderTable(title, table) {
+    if (!table || !table.data) return '';
+
+    return `
+        <div class="chart-card">
+            <h4>${title}</h4>
+            <table class="summary-table">
+                <tr>${table.columns.map(col => `<th>${col}</th>`).join('')}</tr>
+                ${table.data.map(row => `
+                    <tr>${row.map(cell => `<td>${typeof cell === 'number' ? formatNumber(cell) : cell}</td>`).join('')}</tr>
+                `).join('')}
+            </table>
+        </div>
+    `;
+}
+
 function displayProcessLog(logs) {
     if (!logs || logs.length === 0) return;
 
@@ -338,7 +661,8 @@ async function cleanupAllFiles() {
         const result = await response.json();
 
         if (result.success) {
-            showNotification(`Deleted ${result.deleted} files`, 'success');
+            const kept = result.kept ? ` (${result.kept} in use kept)` : '';
+            showNotification(`Deleted ${result.deleted} files${kept}`, 'success');
             console.log(`✅ Cleanup completed: ${result.deleted} files deleted`);
             
             // Clear selected files
@@ -377,7 +701,8 @@ async function cleanupAllOutputs() {
         const result = await response.json();
 
         if (result.success) {
-            showNotification(`Deleted ${result.deleted} files`, 'success');
+            const kept = result.kept ? ` (${result.kept} in use kept)` : '';
+            showNotification(`Deleted ${result.deleted} files${kept}`, 'success');
             console.log(`✅ Cleanup completed: ${result.deleted} files deleted`);
             loadOutputFiles();
         } else {
@@ -393,6 +718,11 @@ async function cleanupAllOutputs() {
 }
 
 // Utility functions
+function formatNumber(value) {
+    if (value === null || value === undefined) return '-';
+    return Number(value).toLocaleString('id-ID', { maximumFractionDigits: 2 });
+}
+
 function formatFileSize(bytes) {
     if (bytes === 0) return '0 Bytes';
     const k = 1024;
@@ -0,0 +1,224 @@
+package main
+
+import (
+	"crypto/sha256"
+	"encoding/hex"
+	"encoding/json"
+	"fmt"
+	"log"
+	"net/http"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"sort"
+	"strings"
+	"sync"
+
+	"github.com/gorilla/mux"
+)
+
+const CacheDir = "./cache"
+
+type SummaryResponse struct {
+	Success    bool            `json:"success"`
+	Cached     bool            `json:"cached"`
+	SummaryKey string          `json:"summary_key,omitempty"`
+	Summary    json.RawMessage `json:"summary,omitempty"`
+	Error      string          `json:"error,omitempty"`
+	Logs       []string        `json:"logs,omitempty"`
+}
+
+// summaryCache keeps summary JSON produced by processor.py in memory and on
+// disk (CacheDir/<key>.json), so repeat views never start Python again.
+// In-memory entries live only as long as their files: retention evictions
+// in CacheDir and ArtifactDir call forget.
+type summaryCache struct {
+	mu       sync.RWMutex
+	items    map[string][]byte
+	inflight map[string]*summaryCall
+}
+
+type summaryCall struct {
+	done chan struct{}
+	data []byte
+	logs string
+	err  error
+}
+
+var summaries = &summaryCache{
+	items:    make(map[string][]byte),
+	inflight: make(map[string]*summaryCall),
+}
+
+// summaryKey identifies a job by its inputs. Uploaded filenames are unique
+// (timestamp prefix), so the key changes whenever the data changes.
+func summaryKey(req ProcessRequest) string {
+	files := append([]string(nil), req.TradeHistoryFiles...)
+	sort.Strings(files)
+
+	h := sha256.New()
+	fmt.Fprintf(h, "%s\n%.0f\n%.0f\n", req.JisdorFile, req.Config.RateSpot, req.Config.RateRemote)
+	for _, f := range files {
+		fmt.Fprintf(h, "%s\n", f)
+	}
+	return hex.EncodeToString(h.Sum(nil))[:32]
+}
+
+func summaryPath(key string) string {
+	return filepath.Join(CacheDir, key+".json")
+}
+
+func (c *summaryCache) get(key string) ([]byte, bool) {
+	c.mu.RLock()
+	data, ok := c.items[key]
+	c.mu.RUnlock()
+	if ok {
+		return data, true
+	}
+
+	data, err := os.ReadFile(summaryPath(key))
+	if err == nil {
+		retention.touch(summaryPath(key))
+	} else {
+		// Fall back to the summary embedded in the Arrow artifact manifest
+		manifest, merr := readArtifactManifest(key)
+		if merr != nil || len(manifest.Summary) == 0 {
+			return nil, false
+		}
+		data = manifest.Summary
+	}
+	c.put(key, data)
+	return data, true
+}
+
+func (c *summaryCache) put(key string, data []byte) {
+	c.mu.Lock()
+	c.items[key] = data
+	c.mu.Unlock()
+}
+
+// forget is the retention onEvict hook for CacheDir (<key>.json) and
+// ArtifactDir (<key>, whose manifest get falls back to)
+func (c *summaryCache) forget(name string) {
+	c.mu.Lock()
+	delete(c.items, strings.TrimSuffix(name, ".json"))
+	c.mu.Unlock()
+}
+
+// compute runs processor.py in summary-only mode (no Excel). Concurrent
+// requests for the same key share a single Python run.
+func (c *summaryCache) compute(key string, req ProcessRequest) ([]byte, string, error) {
+	c.mu.Lock()
+	if call, ok := c.inflight[key]; ok {
+		c.mu.Unlock()
+		<-call.done
+		return call.data, call.logs, call.err
+	}
+	call := &summaryCall{done: make(chan struct{})}
+	c.inflight[key] = call
+	c.mu.Unlock()
+
+	release := retention.pin(jobPaths(req, key)...)
+	defer release()
+	args := append(processorArgs(req), "--summary-json", summaryPath(key), "--arrow-dir", artifactDir(key))
+	output, err := exec.Command("python", args...).CombinedOutput()
+	call.logs = string(output)
+	if err == nil {
+		call.data, err = os.ReadFile(summaryPath(key))
+	}
+	call.err = err
+	if err == nil {
+		c.put(key, call.data)
+	}
+
+	c.mu.Lock()
+	delete(c.inflight, key)
+	c.mu.Unlock()
+	close(call.done)
+
+	return call.data, call.logs, call.err
+}
+
+// POST /api/summary - summary JSON for a job, computed once then cached
+func summaryHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	var req ProcessRequest
+	if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "Invalid request body: " + err.Error(),
+		})
+		return
+	}
+
+	if req.JisdorFile == "" || len(req.TradeHistoryFiles) == 0 {
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "JISDOR file and at least one trade history file are required",
+		})
+		return
+	}
+
+	if problems := validateJob(req); len(problems) > 0 {
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "Invalid input files: " + strings.Join(problems, "; "),
+		})
+		return
+	}
+
+	key := summaryKey(req)
+	if data, ok := summaries.get(key); ok {
+		log.Printf("⚡ Summary cache hit: %s", key)
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success:    true,
+			Cached:     true,
+			SummaryKey: key,
+			Summary:    data,
+		})
+		return
+	}
+
+	log.Printf("📊 Summary cache miss, running processor: %s", key)
+	data, logs, err := summaries.compute(key, req)
+	if err != nil {
+		log.Printf("❌ Summary error: %v", err)
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   fmt.Sprintf("Summary failed: %v", err),
+			Logs:    []string{logs},
+		})
+		return
+	}
+
+	json.NewEncoder(w).Encode(SummaryResponse{
+		Success:    true,
+		Cached:     false,
+		SummaryKey: key,
+		Summary:    data,
+	})
+}
+
+// GET /api/summary/{key} - cached summary only (e.g. right after /api/process)
+func getSummaryHandler(w http.ResponseWriter, r *http.Request) {
+	w.Header().Set("Content-Type", "application/json")
+
+	key := mux.Vars(r)["key"]
+	data, ok := summaries.get(filepath.Base(key))
+	if !ok {
+		w.WriteHeader(http.StatusNotFound)
+		json.NewEncoder(w).Encode(SummaryResponse{
+			Success: false,
+			Error:   "Summary not found",
+		})
+		return
+	}
+
+	json.NewEncoder(w).Encode(SummaryResponse{
+		Success:    true,
+		Cached:     true,
+		SummaryKey: key,
+		Summary:    data,
+	})
+}
@@ -0,0 +1,154 @@
+package main
+
+import (
+	"encoding/json"
+	"fmt"
+	"log"
+	"os"
+	"os/exec"
+	"path/filepath"
+	"strings"
+	"sync"
+)
+
+// File kinds reported by python/sniff.py
+const (
+	KindJisdor       = "jisdor"
+	KindTradeRoot    = "trade_root"
+	KindTradeWebtest = "trade_webtest"
+	KindUnknown      = "unknown"
+
+	// Layout expected by python/processor.py in this server
+	ExpectedTradeKind = KindTradeWebtest
+
+	MetaDir = UploadDir + "/.meta"
+)
+
+type FileMeta struct {
+	File          string   `json:"file"`
+	Kind          string   `json:"kind"`
+	HeaderRow     int      `json:"header_row,omitempty"`
+	Columns       []string `json:"columns,omitempty"`
+	EstimatedRows int      `json:"estimated_rows,omitempty"`
+	Sheet         string   `json:"sheet,omitempty"`
+	Dimension     string   `json:"dimension,omitempty"`
+	Warning       string   `json:"warning,omitempty"`
+	Error         string   `json:"error,omitempty"`
+}
+
+// uploadMetaStore keeps sniff results per uploaded filename, in memory with
+// a JSON sidecar in MetaDir so they survive restarts.
+type uploadMetaStore struct {
+	mu    sync.RWMutex
+	items map[string]FileMeta
+}
+
+var uploadMeta = &uploadMetaStore{items: make(map[string]FileMeta)}
+
+func metaPath(filename string) string {
+	return filepath.Join(MetaDir, filepath.Base(filename)+".json")
+}
+
+func (s *uploadMetaStore) get(filename string) (FileMeta, bool) {
+	s.mu.RLock()
+	meta, ok := s.items[filename]
+	s.mu.RUnlock()
+	if ok {
+		return meta, true
+	}
+
+	data, err := os.ReadFile(metaPath(filename))
+	if err != nil || json.Unmarshal(data, &meta) != nil {
+		return FileMeta{}, false
+	}
+	s.mu.Lock()
+	s.items[filename] = meta
+	s.mu.Unlock()
+	return meta, true
+}
+
+func (s *uploadMetaStore) put(filename string, meta FileMeta) {
+	s.mu.Lock()
+	s.items[filename] = meta
+	s.mu.Unlock()
+
+	if data, err := json.Marshal(meta); err == nil {
+		os.MkdirAll(MetaDir, 0755)
+		os.WriteFile(metaPath(filename), data, 0644)
+	}
+}
+
+func (s *uploadMetaStore) remove(filename string) {
+	s.mu.Lock()
+	delete(s.items, filename)
+	s.mu.Unlock()
+	os.Remove(metaPath(filename))
+}
+
+// sniffUpload classifies an uploaded file from its first rows only
+// (python/sniff.py: stdlib zip/XML reader, openpyxl as fallback) and stores
+// the result.
+func sniffUpload(filename string) (FileMeta, error) {
+	output, err := exec.Command("python", "python/sniff.py", filepath.Join(UploadDir, filename)).Output()
+	if err != nil {
+		return FileMeta{}, fmt.Errorf("sniff failed: %v", err)
+	}
+
+	var meta FileMeta
+	if err := json.Unmarshal(output, &meta); err != nil {
+		return FileMeta{}, fmt.Errorf("invalid sniff output: %v", err)
+	}
+	meta.File = filename
+	uploadMeta.put(filename, meta)
+
+	log.Printf("🔎 Sniffed %s: kind=%s rows≈%d", filename, meta.Kind, meta.EstimatedRows)
+	return meta, nil
+}
+
+// validateJob rejects jobs whose files were positively detected with the
+// wrong layout, using only stored sniff results. Files without a usable
+// sniff result (none stored, sniff error, or KindUnknown such as .xls or an
+// unrecognised header) are let through: the processor reads columns by
+// position and only warns, like periksa_input in python/processor.py.
+func validateJob(req ProcessRequest) []string {
+	var problems []string
+
+	for _, name := range append([]string{req.JisdorFile}, req.TradeHistoryFiles...) {
+		if _, err := os.Stat(filepath.Join(UploadDir, filepath.Base(name))); err != nil {
+			problems = append(problems, fmt.Sprintf("%s: file not found", name))
+		}
+	}
+	if len(problems) > 0 {
+		return problems
+	}
+
+	jisdorKind, jisdorKnown := sniffedKind(req.JisdorFile)
+	if jisdorKnown && jisdorKind != KindJisdor {
+		problems = append(problems, fmt.Sprintf("%s: expected JISDOR file, got %s", req.JisdorFile, jisdorKind))
+	}
+
+	swapped := jisdorKnown && strings.HasPrefix(jisdorKind, "trade_")
+	for _, name := range req.TradeHistoryFiles {
+		kind, ok := sniffedKind(name)
+		if !ok || kind == ExpectedTradeKind {
+			continue
+		}
+		if kind == KindJisdor && swapped {
+			problems = append(problems, "JISDOR and trade history files appear to be swapped")
+			continue
+		}
+		problems = append(problems, fmt.Sprintf("%s: expected %s layout, got %s", name, ExpectedTradeKind, kind))
+	}
+
+	return problems
+}
+
+// sniffedKind returns the layout stored for an uploaded file, ok=false when
+// sniff.py did not positively detect one
+func sniffedKind(filename string) (string, bool) {
+	meta, ok := uploadMeta.get(filename)
+	if !ok || meta.Error != "" || meta.Kind == KindUnknown {
+		return "", false
+	}
+	return meta.Kind, true
+}